@@ -0,0 +1,853 @@
+import argparse
+import asyncio
+import gzip
+import html
+import http.client
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import partial
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+from src import *
+
+
+def build_nested_tree(depth: int, leaves_per_level: int = 2) -> HtmlDivision:
+    """
+    建立深度為'depth'的巢狀'div'網頁元素樹，每一層皆附加'leaves_per_level'個'p'網頁元素。
+    """
+    with ExitStack() as stack:
+        root = stack.enter_context(HtmlDivision("div_0"))
+        parent = root
+        for level in range(depth):
+            for index in range(leaves_per_level):
+                parent.attach(HtmlParagraph(f"p_{level}_{index}", "benchmark text " * 16))
+            parent = stack.enter_context(HtmlDivision(f"div_{level + 1}", parent_container=parent))
+    return root
+
+
+def legacy_build(element, depth: int = 0) -> str:
+    """
+    模擬原本'Container._encapsulate'的做法：每一層都將子元素的字串再串接一次。
+    """
+    if len(getattr(element, "_element_list", ())) == 0:
+        return element.render(depth=depth)
+    element._generate_attr_string()
+    indent = "\t"*(depth + element.indent_tab)
+    content = "\n".join([legacy_build(child, depth + element._adjust_tab) for child in element._element_list])
+    return "\n".join([
+        indent + element._generate_start_tag(element.all_attr_string),
+        content,
+        indent + element._end_tag
+    ])
+
+
+def measure(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_nesting_depth():
+    print(f"{'depth':>6} {'legacy (ms)':>12} {'renderer (ms)':>14}")
+    for depth in (10, 50, 100, 200, 300):
+        root = build_nested_tree(depth)
+        renderer = HtmlRenderer()
+        assert legacy_build(root) == renderer.render(root)
+        legacy_time = measure(lambda: legacy_build(root))
+        render_time = measure(lambda: renderer.render(root, io.StringIO()))
+        print(f"{depth:>6} {legacy_time*1000:>12.3f} {render_time*1000:>14.3f}")
+
+
+def bench_streaming_memory():
+    """
+    比較'一次串接成完整字串'與'HtmlDocument.stream'分段寫入時的記憶體峰值。
+    """
+    print(f"{'paragraphs':>10} {'join peak (KB)':>15} {'stream peak (KB)':>17}")
+    for count in (1000, 10000, 50000):
+        with HtmlDocument() as doc:
+            with HtmlBody(parent_container=doc) as body:
+                for index in range(count):
+                    body.attach(HtmlParagraph(f"p_{index}", "benchmark text " * 16))
+        with open(os.devnull, "w") as null_file:
+            tracemalloc.start()
+            null_file.write(doc.render())
+            join_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            tracemalloc.start()
+            doc.stream(null_file, 65536)
+            stream_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"{count:>10} {join_peak/1024:>15.1f} {stream_peak/1024:>17.1f}")
+
+
+def bench_lazy_build():
+    """
+    比較退出'with'區塊時立即產生字串(舊有的行為)與延遲到'build'時才產生字串的總耗時。
+
+    立即產生的字串只是'container_content'的快照，渲染時不會使用，故兩者的差距即為舊有行為多出的成本。
+    """
+    print(f"{'depth':>6} {'eager (ms)':>11} {'lazy (ms)':>10}")
+    for depth in (10, 50, 100, 200):
+        results = list()
+        for lazy_build in (False, True):
+            Container.lazy_build = lazy_build
+            results.append(measure(lambda: build_nested_tree(depth).render(io.StringIO())))
+        Container.lazy_build = True
+        print(f"{depth:>6} {results[0]*1000:>11.3f} {results[1]*1000:>10.3f}")
+
+
+def bench_incremental_render():
+    """
+    模擬每次只變更少數'p'網頁元素的文字內容後重新渲染，比較是否啟用'use_cache'的耗時。
+    """
+    print(f"{'paragraphs':>10} {'full (ms)':>10} {'cached (ms)':>12}")
+    for count in (1000, 5000, 20000):
+        paragraphs = list()
+        with HtmlDocument() as doc:
+            with HtmlBody(parent_container=doc) as body:
+                for block_index in range(count // 50):
+                    with HtmlDivision(f"div_{block_index}", parent_container=body) as div:
+                        for index in range(50):
+                            paragraph = HtmlParagraph(f"p_{block_index}_{index}", "status text")
+                            paragraphs.append(paragraph)
+                            div.attach(paragraph)
+        cached_renderer = HtmlRenderer(use_cache=True)
+        doc.render(io.StringIO(), renderer=cached_renderer)
+        tick = [0]
+        def update():
+            tick[0] += 1
+            for paragraph in paragraphs[::count // 5]:
+                paragraph.text = f"status {tick[0]}"
+        full_time = measure(lambda: (update(), doc.render(io.StringIO())))
+        cached_time = measure(lambda: (update(), doc.render(io.StringIO(), renderer=cached_renderer)))
+        print(f"{count:>10} {full_time*1000:>10.3f} {cached_time*1000:>12.3f}")
+
+
+def bench_element_memory():
+    """
+    以'tracemalloc'量測建立100k個網頁元素所使用的記憶體。
+    """
+    factories = (
+        ("HtmlInput", lambda index: HtmlInput(f"input_{index}").set_individual_attr({"value": "value"})),
+        ("HtmlParagraph", lambda index: HtmlParagraph(f"p_{index}", "text")),
+        ("HtmlParagraph+style", lambda index: HtmlParagraph(f"p_{index}", "text").set_global_attr({"style": "color:#f00;"}))
+    )
+    print(f"{'element':>20} {'MB per 100k':>12} {'bytes each':>11}")
+    for name, factory in factories:
+        tracemalloc.start()
+        elements = [factory(index) for index in range(100000)]
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del elements
+        print(f"{name:>20} {current/1024/1024:>12.1f} {current/100000:>11.0f}")
+
+
+def bench_attr_string():
+    """
+    量測每個網頁元素產生屬性字串('_generate_attr_string')所需的時間。
+    """
+    elements = (
+        ("id only", HtmlParagraph("p_id", "text")),
+        ("id+class+style", HtmlParagraph("p_attrs", "text").set_global_attr({"class_attr": "row", "style": "color:#f00;"})),
+        ("input+value", HtmlInput("input_value").set_individual_attr({"value": "value"})),
+        ("form", HtmlForm("form_1", "/submit", HtmlForm.Method.POST))
+    )
+    print(f"{'element':>16} {'ns per call':>12}")
+    for name, element in elements:
+        loops = 100000
+        elapsed = measure(lambda: [element._generate_attr_string() for _ in range(loops)])
+        print(f"{name:>16} {elapsed/loops*1e9:>12.0f}")
+
+
+def build_layout(values: dict) -> HtmlDocument:
+    """
+    建立樣板測試用的網頁：固定的版面加上數個會變動的文字內容及屬性值。
+    """
+    with HtmlDocument() as doc:
+        with HtmlHead(parent_container=doc):
+            pass
+        with HtmlBody(parent_container=doc) as body:
+            body.attach(HtmlHeading("title", values["title"]))
+            for block_index in range(10):
+                with HtmlDivision(f"block_{block_index}", parent_container=body) as div:
+                    div.attach(HtmlParagraph(f"status_{block_index}", values[f"status_{block_index}"]))
+                    for index in range(5):
+                        div.attach(HtmlParagraph(f"p_{block_index}_{index}", "static text"))
+            with HtmlForm("form", parent_container=body) as form:
+                form.attach(HtmlInput("user").set_individual_attr({"value": values["user"]}))
+    return doc
+
+
+def bench_template():
+    """
+    比較每次請求都重新建立網頁元素樹，與使用'HtmlTemplate'填入資料欄位的耗時。
+    """
+    slot_names = ["title", "user"] + [f"status_{index}" for index in range(10)]
+    template = HtmlTemplate(build_layout({name: Slot(name) for name in slot_names}))
+    values = {name: f"value of {name}" for name in slot_names}
+    assert template.render(values) == build_layout(values).render()
+    loops = 200
+    rebuild_time = measure(lambda: [build_layout(values).render() for _ in range(loops)])
+    template_time = measure(lambda: [template.render(values) for _ in range(loops)])
+    print(f"{'rebuild (us/request)':>21} {'template (us/request)':>22}")
+    print(f"{rebuild_time/loops*1e6:>21.1f} {template_time/loops*1e6:>22.1f}")
+
+
+def build_form_rows(count: int) -> HtmlDocument:
+    """
+    建立含有大量表單列、導覽區塊的網頁(所有'id'皆不重複)，用於量測子樹快取的效果。
+    """
+    with HtmlDocument() as doc:
+        with HtmlBody(parent_container=doc) as body:
+            for block_index in range(count):
+                with HtmlDivision(f"nav_{block_index}", parent_container=body) as nav:
+                    nav.set_global_attr({"class_attr": "nav"})
+                    for index in range(5):
+                        nav.attach(HtmlParagraph(f"nav_{block_index}_{index}", "link").text_modify(
+                            HtmlSpan(f"bold_{block_index}_{index}")))
+                with HtmlForm(f"row_{block_index}", "/submit", parent_container=body) as form:
+                    form.attach(HtmlInput(f"name_{block_index}").set_individual_attr({"value": "default"}))
+                    form.attach(HtmlInput(f"submit_{block_index}", HtmlInput.InputType.SUBMIT))
+    return doc
+
+
+def bench_subtree_cache():
+    """
+    比較不使用快取、使用'SubtreeCache'重新渲染未變更的網頁，以及修改其中一列後重新渲染的耗時，並列出命中率。
+
+    所有'id'皆不重複，故命中皆來自重新渲染時未變更的子樹。
+    """
+    print(f"{'blocks':>7} {'nodes':>7} {'plain (ms)':>11} {'unchanged (ms)':>15} {'one edit (ms)':>14} {'hit rate':>9}")
+    for count in (100, 1000, 5000):
+        doc = build_form_rows(count)
+        node_count = sum(1 for _ in doc.select("*")) + 1
+        # 每個區塊有兩個容器，快取需能容納所有容器的字串，否則重新渲染時會依照LRU順序互相淘汰
+        subtree_cache = SubtreeCache(max_entries=count*4, max_size=64*1024*1024)
+        shared_renderer = HtmlRenderer(subtree_cache=subtree_cache)
+        assert doc.render(renderer=shared_renderer) == doc.render()
+        plain_time = measure(lambda: doc.render(io.StringIO()))
+        unchanged_time = measure(lambda: doc.render(io.StringIO(), renderer=shared_renderer))
+        name_input = doc.get_element_by_id(f"name_{count // 2}")
+        edits = iter(range(1000000))
+        def edit_and_render():
+            name_input.value = f"edited {next(edits)}"
+            doc.render(io.StringIO(), renderer=shared_renderer)
+        subtree_cache.hits = subtree_cache.misses = 0
+        edit_time = measure(edit_and_render)
+        hit_rate = subtree_cache.stats["hit_rate"]
+        assert doc.render(renderer=shared_renderer) == doc.render()
+        print(f"{count:>7} {node_count:>7} {plain_time*1000:>11.3f} {unchanged_time*1000:>15.3f} "
+              f"{edit_time*1000:>14.3f} {hit_rate:>9.3f}")
+
+
+def bench_parallel_render():
+    """
+    比較單一行程與'ParallelRenderer'渲染含有大量獨立區塊的網頁的耗時(需在多核心的機器上才能看出加速)。
+    """
+    with HtmlDocument() as doc:
+        with HtmlBody(parent_container=doc) as body:
+            for block_index in range(400):
+                with HtmlDivision(f"section_{block_index}", parent_container=body) as div:
+                    for index in range(250):
+                        div.attach(HtmlParagraph(f"p_{block_index}_{index}", "audit record " * 4))
+    serial_output = doc.render()
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'workers':>8} {'serial (ms)':>12} {'parallel (ms)':>14} {'speedup':>8}")
+    serial_time = measure(lambda: doc.render(), 3)
+    for max_workers in (2, 4, 8):
+        renderer = ParallelRenderer(max_workers)
+        assert doc.render(renderer=renderer) == serial_output
+        parallel_time = measure(lambda: doc.render(renderer=renderer), 3)
+        print(f"{max_workers:>8} {serial_time*1000:>12.1f} {parallel_time*1000:>14.1f} {serial_time/parallel_time:>8.2f}")
+
+
+def build_customer_page(customer_index: int) -> HtmlDocument:
+    """
+    批次建立測試用的單一客戶網頁(模組層級的函式，故可以傳遞給子行程)。
+    """
+    with HtmlDocument() as doc:
+        with HtmlBody(parent_container=doc) as body:
+            body.attach(HtmlHeading("title", f"customer {customer_index}"))
+            for block_index in range(20):
+                with HtmlDivision(f"block_{block_index}", parent_container=body) as div:
+                    for index in range(25):
+                        div.attach(HtmlParagraph(f"p_{block_index}_{index}", "invoice line " * 4))
+    return doc
+
+
+def bench_batch_build():
+    """
+    比較以迴圈逐一呼叫'HtmlDocument.build'與'build_documents'批次建立網頁檔案的耗時。
+    """
+    count = 200
+    jobs = lambda: [(partial(build_customer_page, index), f"batch_{index}.html") for index in range(count)]
+    with tempfile.TemporaryDirectory(prefix="html_batch_") as output_directory:
+        loop_time = measure(lambda: [
+            build_customer_page(index).build(output_directory, f"loop_{index}.html") for index in range(count)], 1)
+        batch_time = measure(lambda: build_documents(jobs(), output_directory), 1)
+        assert all(result.ok for result in build_documents(jobs(), output_directory))
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'documents':>10} {'loop (ms)':>10} {'batch (ms)':>11}")
+    print(f"{count:>10} {loop_time*1000:>10.1f} {batch_time*1000:>11.1f}")
+
+
+def bench_minify():
+    """
+    比較一般格式與壓縮輸出(minify)的渲染耗時及輸出大小。
+    """
+    print(f"{'depth':>6} {'pretty (ms)':>12} {'minify (ms)':>12} {'pretty (KB)':>12} {'minify (KB)':>12}")
+    minify_renderer = HtmlRenderer(minify=True)
+    for depth in (10, 50, 100):
+        root = build_nested_tree(depth, 20)
+        pretty_time = measure(lambda: root.render(io.StringIO()))
+        minify_time = measure(lambda: root.render(io.StringIO(), renderer=minify_renderer))
+        pretty_size = len(root.render())
+        minify_size = len(root.render(renderer=minify_renderer))
+        print(f"{depth:>6} {pretty_time*1000:>12.3f} {minify_time*1000:>12.3f} {pretty_size/1024:>12.1f} {minify_size/1024:>12.1f}")
+
+
+def bench_compressed_build():
+    """
+    比較'先寫出網頁再讀回壓縮'與'build'在渲染時同時產生'.html.gz'的耗時。
+    """
+    with HtmlDocument() as doc:
+        with HtmlBody(parent_container=doc) as body:
+            for index in range(20000):
+                body.attach(HtmlParagraph(f"p_{index}", "compressible text " * 4))
+    def two_pass(output_directory: str):
+        doc.build(output_directory, "two_pass.html")
+        with open(os.path.join(output_directory, "two_pass.html"), "rb") as plain_file:
+            with gzip.open(os.path.join(output_directory, "two_pass.html.gz"), "wb", 6) as compressed_file:
+                compressed_file.write(plain_file.read())
+    print(f"{'two pass (ms)':>14} {'streamed (ms)':>14} {'gzip only (ms)':>15}")
+    with tempfile.TemporaryDirectory(prefix="html_gzip_") as output_directory:
+        two_pass_time = measure(lambda: two_pass(output_directory), 3)
+        streamed_time = measure(lambda: doc.build(output_directory, "streamed.html", compression="gzip", compression_level=6), 3)
+        gzip_only_time = measure(lambda: doc.build(
+            output_directory, "gzip_only.html", compression="gzip", compression_level=6, write_plain=False), 3)
+    print(f"{two_pass_time*1000:>14.1f} {streamed_time*1000:>14.1f} {gzip_only_time*1000:>15.1f}")
+
+
+def find_by_walking(root, id_value: str):
+    stack = [root]
+    while len(stack) > 0:
+        element = stack.pop()
+        if ElementIndex.attr_value(element, "id_attr") == id_value:
+            return element
+        stack.extend(reversed(getattr(element, "_element_list", ())))
+    return None
+
+
+def bench_element_index():
+    """
+    比較走訪整棵樹與透過'ElementIndex'以'id'查詢網頁元素的耗時(第一次查詢包含建立索引的時間)。
+    """
+    doc = build_customer_page(0)
+    targets = [f"p_{block_index}_24" for block_index in range(0, 20, 4)]
+    walk_time = measure(lambda: [find_by_walking(doc, target) for target in targets])
+    start = time.perf_counter()
+    doc.get_element_by_id(targets[0])
+    build_time = time.perf_counter() - start
+    index_time = measure(lambda: [doc.get_element_by_id(target) for target in targets])
+    assert all(find_by_walking(doc, target) is doc.get_element_by_id(target) for target in targets)
+    print(f"{'queries':>8} {'walk (us)':>10} {'index build (us)':>17} {'index (us)':>11}")
+    print(f"{len(targets):>8} {walk_time*1e6:>10.1f} {build_time*1e6:>17.1f} {index_time*1e6:>11.1f}")
+
+
+def bench_selector():
+    """
+    比較以'CssSelector'走訪整棵樹與透過索引查詢的耗時(查詢前已建立索引)。
+    """
+    doc = build_customer_page(0)
+    doc.element_index
+    selectors = ["#block_3 > p", "div p#p_7_12", "h1"]
+    compiled = [CssSelector.compile(selector) for selector in selectors]
+    walk_time = measure(lambda: [list(selector._select_by_walking(doc)) for selector in compiled])
+    index_time = measure(lambda: [list(doc.select(selector)) for selector in selectors])
+    assert all(list(selector._select_by_walking(doc)) == list(doc.select(selector.selector)) for selector in compiled)
+    print(f"{'queries':>8} {'walk (us)':>10} {'index (us)':>11}")
+    print(f"{len(selectors):>8} {walk_time*1e6:>10.1f} {index_time*1e6:>11.1f}")
+
+
+def bench_tree_diff():
+    """
+    比較重新傳送整份網頁與傳送'TreeDiff'產生的差異(只變更一個段落的文字及一個屬性)的大小及耗時。
+    """
+    old_doc = build_customer_page(0)
+    new_doc = build_customer_page(0)
+    new_doc.get_element_by_id("p_7_12").text = "updated line"
+    new_doc.get_element_by_id("block_3").set_global_attr({"style": "color:#f00;"})
+    tree_diff = TreeDiff()
+    render_time = measure(lambda: new_doc.render(renderer=HtmlRenderer(minify=True)))
+    diff_time = measure(lambda: tree_diff.compare(old_doc, new_doc))
+    page_size = len(new_doc.render(renderer=HtmlRenderer(minify=True)))
+    patch_size = len(TreeDiff.to_json(tree_diff.compare(old_doc, new_doc)))
+    print(f"{'page (chars)':>13} {'patch (chars)':>14} {'render (ms)':>12} {'diff (ms)':>10}")
+    print(f"{page_size:>13} {patch_size:>14} {render_time*1000:>12.2f} {diff_time*1000:>10.2f}")
+
+
+def bench_parser():
+    """
+    以數MB的網頁文本測量'parse_html'及分段'feed'的解析速度(MB/s)。
+    """
+    with HtmlDocument() as doc:
+        with HtmlBody(parent_container=doc) as body:
+            for block_index in range(1000):
+                with HtmlDivision(f"block_{block_index}", parent_container=body) as div:
+                    for index in range(25):
+                        div.attach(HtmlParagraph(f"p_{block_index}_{index}", "invoice line " * 4).set_global_attr(
+                            {"class_attr": "row", "data": ("line", str(index))}))
+    text = doc.render()
+    size = len(text.encode("utf-8")) / 1e6
+    parse_time = measure(lambda: parse_html(text), repeat=3)
+    def feed_chunks():
+        parser = HtmlParser()
+        for start in range(0, len(text), 65536):
+            parser.feed(text[start:start + 65536])
+        return parser.close()
+    feed_time = measure(feed_chunks, repeat=3)
+    assert parse_html(text).render() == text
+    print(f"{'size (MB)':>10} {'parse (MB/s)':>13} {'feed (MB/s)':>12}")
+    print(f"{size:>10.2f} {size/parse_time:>13.2f} {size/feed_time:>12.2f}")
+
+
+def bench_bulk_table():
+    """
+    比較以'HtmlBulkTable'直接渲染欄位資料與為每一列建立網頁元素的耗時。
+    """
+    row_count = 100000
+    ids = list(range(row_count))
+    names = [f"customer {index}" for index in ids]
+    totals = [index*1.5 for index in ids]
+    def per_element():
+        div = HtmlDivision("rows")
+        for index in ids:
+            div.attach(HtmlParagraph(f"row_{index}", f"{ids[index]} {names[index]} {totals[index]}").set_global_attr(
+                {"class_attr": "row"}))
+        return div.render()
+    def bulk():
+        table = HtmlBulkTable(
+            "rows", columns={"id": ids, "name": names, "total": totals},
+            column_attrs=[None, None, {"class_attr": "num"}])
+        return table.render()
+    element_time = measure(per_element, repeat=1)
+    bulk_time = measure(bulk, repeat=3)
+    print(f"{'rows':>8} {'elements (ms)':>14} {'bulk (ms)':>10}")
+    print(f"{row_count:>8} {element_time*1000:>14.1f} {bulk_time*1000:>10.1f}")
+
+
+def bench_lazy_children():
+    """
+    比較先建立所有子元素再渲染與以'LazyChildren'逐一產生子元素時，串流輸出至'os.devnull'的耗時及記憶體峰值。
+    """
+    print(f"{'rows':>8} {'attach (ms)':>12} {'lazy (ms)':>10} {'attach (KB)':>12} {'lazy (KB)':>10}")
+    for row_count in (10000, 100000):
+        def attached():
+            with HtmlDocument() as doc:
+                with HtmlBody(parent_container=doc) as body:
+                    for index in range(row_count):
+                        body.attach(HtmlParagraph("", f"log line {index}").set_global_attr({"class_attr": "log"}))
+            with open(os.devnull, "w") as null_file:
+                doc.stream(null_file)
+        def lazy():
+            with HtmlDocument() as doc:
+                with HtmlBody(parent_container=doc) as body:
+                    body.attach(LazyChildren(
+                        (f"log line {index}", {"class_attr": "log"}) for index in range(row_count)))
+            with open(os.devnull, "w") as null_file:
+                doc.stream(null_file)
+        results = list()
+        for func in (attached, lazy):
+            tracemalloc.start()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            results.append((elapsed, tracemalloc.get_traced_memory()[1]))
+            tracemalloc.stop()
+        print(f"{row_count:>8} {results[0][0]*1000:>12.1f} {results[1][0]*1000:>10.1f} "
+              f"{results[0][1]/1024:>12.0f} {results[1][1]/1024:>10.0f}")
+
+
+def bench_escape():
+    """
+    比較'HtmlEscaper'與逐一呼叫'html.escape'跳脫文字內容及屬性值的耗時(各100000個字串)。
+    """
+    value_count = 100000
+    cases = {
+        "plain": [f"invoice line {index}" for index in range(value_count)],
+        "repeated": [f"Q{index % 50} <draft> & notes" for index in range(value_count)],
+        "mixed": [f"line {index} & <b>" if index % 10 == 0 else f"line {index}" for index in range(value_count)],
+    }
+    HtmlEscaper.clear()
+    print(f"{'case':>10} {'html.escape (ms)':>17} {'text (ms)':>10} {'attr (ms)':>10}")
+    for case_name, values in cases.items():
+        naive_time = measure(lambda: [html.escape(value) for value in values])
+        text_time = measure(lambda: [HtmlEscaper.text(value) for value in values])
+        attr_time = measure(lambda: [HtmlEscaper.attr(value) for value in values])
+        assert [HtmlEscaper.attr(value) for value in values] == [html.escape(value, False).replace('"', "&quot;") for value in values]
+        print(f"{case_name:>10} {naive_time*1000:>17.2f} {text_time*1000:>10.2f} {attr_time*1000:>10.2f}")
+
+
+def bench_async_render():
+    """
+    以本機的'asyncio.start_server'作為測試伺服器，比較同步渲染與'stream_async'期間事件迴圈的最長停頓，
+
+    以及含有兩個各需0.1秒的'AsyncFragment'時，同時等待與依序等待的耗時。
+    """
+    def build_page(division_count: int) -> HtmlDocument:
+        with HtmlDocument() as doc:
+            with HtmlBody(parent_container=doc) as body:
+                for index in range(division_count):
+                    with HtmlDivision(f"div_{index}", parent_container=body) as div:
+                        for line in range(5):
+                            div.attach(HtmlParagraph(f"p_{index}_{line}", f"row {index} line {line}"))
+        return doc
+    async def serve(doc: HtmlDocument, use_async: bool) -> tuple[float, float]:
+        gaps = [0.0]
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+        async def handle(reader, writer):
+            if use_async == True:
+                await doc.stream_async(writer)
+            else:
+                writer.write(HtmlRenderer().render(doc).encode())
+                await writer.drain()
+            writer.close()
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        ticker_task = asyncio.ensure_future(ticker())
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await reader.read()
+        elapsed = time.perf_counter() - start
+        writer.close()
+        ticker_task.cancel()
+        server.close()
+        await server.wait_closed()
+        return elapsed, max(gaps)
+    async def slow_fragment(name: str) -> HtmlParagraph:
+        await asyncio.sleep(0.1)
+        return HtmlParagraph(name, "loaded")
+    async def fragments() -> tuple[float, float]:
+        with HtmlBody() as body:
+            body.attach(AsyncFragment(lambda: slow_fragment("first")))
+            body.attach(AsyncFragment(lambda: slow_fragment("second")))
+        start = time.perf_counter()
+        await HtmlRenderer().render_async(body)
+        concurrent_time = time.perf_counter() - start
+        start = time.perf_counter()
+        await slow_fragment("first")
+        await slow_fragment("second")
+        return concurrent_time, time.perf_counter() - start
+    print(f"{'divs':>8} {'sync (ms)':>10} {'sync gap (ms)':>14} {'async (ms)':>11} {'async gap (ms)':>15}")
+    for division_count in (2000, 10000):
+        doc = build_page(division_count)
+        sync_time, sync_gap = asyncio.run(serve(doc, False))
+        async_time, async_gap = asyncio.run(serve(doc, True))
+        print(f"{division_count:>8} {sync_time*1000:>10.1f} {sync_gap*1000:>14.1f} "
+              f"{async_time*1000:>11.1f} {async_gap*1000:>15.1f}")
+    concurrent_time, sequential_time = asyncio.run(fragments())
+    print(f"2 x AsyncFragment(0.1 s): concurrent {concurrent_time*1000:.1f} ms, sequential {sequential_time*1000:.1f} ms")
+
+
+def bench_time_to_first_byte():
+    """
+    以本機的'wsgiref'測試伺服器比較先渲染完整字串再回應與'WsgiResponse'分段回應的首位元組時間(TTFB)及總耗時，
+
+    並以記錄'send'時間的方式測量'AsgiResponse'的首個片段時間。
+    """
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+    def build_page(division_count: int) -> HtmlDocument:
+        with HtmlDocument() as doc:
+            HtmlHead(parent_container=doc)
+            with HtmlBody(parent_container=doc) as body:
+                for index in range(division_count):
+                    with HtmlDivision(f"div_{index}", parent_container=body) as div:
+                        for line in range(5):
+                            div.attach(HtmlParagraph(f"p_{index}_{line}", f"row {index} line {line}"))
+        return doc
+    def request(port: int) -> tuple[float, float]:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        start = time.perf_counter()
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        response.read1()
+        first_byte = time.perf_counter() - start
+        response.read()
+        total = time.perf_counter() - start
+        connection.close()
+        return first_byte, total
+    async def asgi_timing(doc: HtmlDocument) -> tuple[float, float]:
+        times = list()
+        start = time.perf_counter()
+        async def send(message):
+            if message["type"] == "http.response.body":
+                times.append(time.perf_counter() - start)
+        await AsgiResponse(doc)({"type": "http", "method": "GET"}, None, send)
+        return times[0], times[-1]
+    print(f"{'divs':>8} {'full TTFB':>10} {'full total':>11} {'wsgi TTFB':>10} {'wsgi total':>11} "
+          f"{'asgi TTFB':>10} {'asgi total':>11}  (ms)")
+    for division_count in (2000, 20000):
+        doc = build_page(division_count)
+        def full_app(environ, start_response):
+            body = HtmlRenderer().render(doc).encode()
+            start_response("200 OK", [("Content-Type", "text/html; charset=utf-8")])
+            return [body]
+        def streaming_app(environ, start_response):
+            return WsgiResponse(doc)(environ, start_response)
+        results = list()
+        for app in (full_app, streaming_app):
+            server = make_server("127.0.0.1", 0, app, handler_class=QuietHandler)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            results.extend(request(server.server_port))
+            server.shutdown()
+            server.server_close()
+        results.extend(asyncio.run(asgi_timing(doc)))
+        print(f"{division_count:>8} " + " ".join(
+            f"{value*1000:>{width}.1f}" for value, width in zip(results, (10, 11, 10, 11, 10, 11))))
+
+
+##### 基準測試套件 #####
+
+def prepare_construct_paragraph():
+    return lambda: [HtmlParagraph(f"p_{index}", "benchmark text") for index in range(100000)]
+
+
+def prepare_construct_input():
+    return lambda: [
+        HtmlInput(f"input_{index}").set_individual_attr({"value": "value"}) for index in range(100000)
+    ]
+
+
+def prepare_construct_division():
+    def run():
+        with HtmlDivision("root") as root:
+            for index in range(10000):
+                with HtmlDivision(f"div_{index}", parent_container=root) as div:
+                    div.attach(HtmlParagraph(f"p_{index}", "text"))
+        return root
+    return run
+
+
+def prepare_set_global_attr():
+    elements = [HtmlParagraph(f"p_{index}", "text") for index in range(100000)]
+    attr_dict = {"class_attr": "row", "style": "color:#f00;", "title": "title", "tabindex": 1}
+    return lambda: [element.set_global_attr(attr_dict) for element in elements]
+
+
+def prepare_attr_string():
+    elements = [
+        HtmlParagraph(f"p_{index}", "text").set_global_attr({"class_attr": "row", "style": "color:#f00;"})
+        for index in range(100000)
+    ]
+    return lambda: [element._generate_attr_string() for element in elements]
+
+
+def prepare_wide_tree():
+    with HtmlDivision("root") as root:
+        for index in range(10000):
+            root.attach(HtmlParagraph(f"p_{index}", "benchmark text"))
+    return lambda: root.render(io.StringIO())
+
+
+def prepare_deep_tree():
+    root = build_nested_tree(500, 1)
+    return lambda: root.render(io.StringIO())
+
+
+def prepare_deep_attach_tree():
+    """
+    不使用'with'區塊，以'attach'的回傳值逐層建立5000層的網頁元素樹。
+    """
+    root = HtmlDivision("root")
+    node = root
+    for level in range(5000):
+        node = node.attach(HtmlDivision(f"div_{level}"))
+        node.attach(HtmlParagraph(f"p_{level}", "text"))
+    return lambda: root.render(io.StringIO())
+
+
+def prepare_text_modify_chain():
+    modifiers = [HtmlSpan(f"span_{index}").set_global_attr({"class_attr": "em"}) for index in range(20)]
+    return lambda: [HtmlParagraph(f"p_{index}", "text").text_modify(*modifiers) for index in range(5000)]
+
+
+def prepare_document_build():
+    with HtmlDocument() as doc:
+        with HtmlHead(parent_container=doc):
+            pass
+        with HtmlBody(parent_container=doc) as body:
+            for block_index in range(500):
+                with HtmlDivision(f"block_{block_index}", parent_container=body) as div:
+                    div.attach(HtmlHeading(f"title_{block_index}", "heading", 2))
+                    for index in range(20):
+                        div.attach(HtmlParagraph(f"p_{block_index}_{index}", "benchmark text " * 4))
+                    with HtmlForm(f"form_{block_index}", "/submit", parent_container=div) as form:
+                        form.attach(HtmlInput(f"input_{block_index}"))
+    output_directory = tempfile.mkdtemp(prefix="html_bench_")
+    return lambda: doc.build(output_directory, "bench.html")
+
+
+SUITE_CASES = (
+    ("construct_paragraph_100k", prepare_construct_paragraph),
+    ("construct_input_100k", prepare_construct_input),
+    ("construct_division_10k", prepare_construct_division),
+    ("set_global_attr_100k", prepare_set_global_attr),
+    ("attr_string_100k", prepare_attr_string),
+    ("render_wide_10k", prepare_wide_tree),
+    ("render_deep_500", prepare_deep_tree),
+    ("render_deep_attach_5000", prepare_deep_attach_tree),
+    ("text_modify_chain_5k", prepare_text_modify_chain),
+    ("document_build_to_disk", prepare_document_build)
+)
+
+
+def run_case(prepare, repeat: int) -> dict:
+    """
+    執行單一測試項目：先以'repeat'次量測耗時，再另外執行一次以'tracemalloc'量測記憶體峰值。
+
+    若測試項目拋出例外，則記錄於'error'而不中斷整個套件。
+    """
+    try:
+        run = prepare()
+        timings = list()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    except Exception as error:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {"error": f"{type(error).__name__}: {error}"}
+    return {
+        "best_ms": min(timings)*1000,
+        "mean_ms": sum(timings)/len(timings)*1000,
+        "peak_kb": peak/1024
+    }
+
+
+def get_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(output_path: str | None = None, repeat: int = 5, only: str | None = None) -> dict:
+    """
+    執行'SUITE_CASES'中的所有測試項目(或名稱包含'only'的項目)，並將結果以JSON格式存於'output_path'。
+
+    未指定'output_path'時，存於'bench_results/<commit>.json'。
+    """
+    commit = get_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cases": dict()
+    }
+    print(f"{'case':>26} {'best (ms)':>10} {'mean (ms)':>10} {'peak (KB)':>11}")
+    for name, prepare in SUITE_CASES:
+        if only != None and only not in name:
+            continue
+        case_result = run_case(prepare, repeat)
+        results["cases"][name] = case_result
+        if "error" in case_result:
+            print(f"{name:>26} {case_result['error']}")
+        else:
+            print(f"{name:>26} {case_result['best_ms']:>10.3f} {case_result['mean_ms']:>10.3f} {case_result['peak_kb']:>11.1f}")
+    if output_path == None:
+        output_path = os.path.join("bench_results", f"{commit or 'unknown'}.json")
+    if os.path.dirname(output_path) != "":
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"results saved to {output_path}")
+    return results
+
+
+def compare_results(baseline_path: str, results: dict):
+    """
+    將本次結果與先前存下的JSON結果比較，列出耗時及記憶體峰值的比例(大於1表示變慢或變大)。
+    """
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"compared with {baseline.get('commit')}:")
+    print(f"{'case':>26} {'time ratio':>11} {'peak ratio':>11}")
+    for name, case_result in results["cases"].items():
+        base_result = baseline["cases"].get(name)
+        if base_result == None or "error" in base_result or "error" in case_result:
+            print(f"{name:>26} {'n/a':>11} {'n/a':>11}")
+            continue
+        time_ratio = case_result["best_ms"] / base_result["best_ms"]
+        peak_ratio = case_result["peak_kb"] / base_result["peak_kb"] if base_result["peak_kb"] > 0 else float("nan")
+        print(f"{name:>26} {time_ratio:>11.2f} {peak_ratio:>11.2f}")
+
+
+def run_features():
+    bench_nesting_depth()
+    bench_streaming_memory()
+    bench_lazy_build()
+    bench_incremental_render()
+    bench_element_memory()
+    bench_attr_string()
+    bench_template()
+    bench_subtree_cache()
+    bench_parallel_render()
+    bench_batch_build()
+    bench_minify()
+    bench_compressed_build()
+    bench_element_index()
+    bench_selector()
+    bench_tree_diff()
+    bench_parser()
+    bench_bulk_table()
+    bench_lazy_children()
+    bench_escape()
+    bench_async_render()
+    bench_time_to_first_byte()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="html builder benchmarks")
+    parser.add_argument("target", nargs="?", choices=("all", "suite", "features"), default="all")
+    parser.add_argument("--output", help="JSON file for suite results (default: bench_results/<commit>.json)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="only run suite cases whose name contains this string")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+    if args.target in ("all", "features"):
+        run_features()
+    if args.target in ("all", "suite"):
+        suite_results = run_suite(args.output, args.repeat, args.only)
+        if args.compare != None:
+            compare_results(args.compare, suite_results)
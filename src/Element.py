@@ -1,13 +1,17 @@
 from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
 from enum import Enum
-from typing import Any
+from typing import Any, Callable, Iterable
 import os
+import sys
 from .base import *
 
 ##### 檔案輸出 #####
 
 class HtmlDocument(SectionElement):
     _tag_symbol = "html"
+    __slots__ = ()
     def __init__(self, indent_tab: int = 0) -> None:
         SectionElement.__init__(self, indent_tab, None)
         self._element_list: list[SectionElement] = list()
@@ -18,30 +22,237 @@ class HtmlDocument(SectionElement):
             self.container_content,
             self._end_tag
         ]
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        write("<!DOCTYPE html>" + newline + self._start_tag + newline)
+        return self._element_list
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        write(newline + self._end_tag)
     def attach(self, element: SectionElement):
         """
         會將接受到的元素儲存於'_element_list'列表裡。
         """
         if isinstance(element, SectionElement):
-            self._element_list.append(element)
+            return SectionElement.attach(self, element)
         else:
             raise TypeError
-    def build(self, output_directory: str, html_name: str = "default.html") -> str:
+    def build(
+            self, output_directory: str, html_name: str = "default.html",
+            buffer_size: int = 65536, encoding: str = "utf-8",
+            renderer: HtmlRenderer | None = None, compression: str | tuple[str, ...] | None = None,
+            compression_level: int = 9, write_plain: bool = True) -> list[str]:
+        """
+        將網頁文本寫入'output_directory'資料夾裡名為'html_name'的檔案。
+
+        buffer_size: 每次寫入檔案的字元數量上限，文本會在走訪網頁元素時分段寫入。
+
+        encoding: 檔案的編碼方式。
+
+        renderer: 指定渲染時使用的'HtmlRenderer'實例。
+
+        compression: 'gzip'、'zlib'、'deflate'或其組成的'tuple'，會在渲染的同時另外產生'html_name'加上對應副檔名的壓縮檔
+
+        (例如'default.html.gz')，不需要再讀回文本壓縮。
+
+        compression_level: 壓縮等級，0~9。
+
+        write_plain: 若為'False'，則只產生壓縮檔。
+
+        回傳所有寫入的檔案路徑。
+        """
         # 檢查資料夾是否存在
         if os.path.isdir(output_directory) == False:
             raise NotADirectoryError
+        if compression == None:
+            compression = ()
+        elif isinstance(compression, str):
+            compression = (compression,)
+        if write_plain == False and len(compression) == 0:
+            raise ValueError
+        # 先取得副檔名，以免不支援的壓縮方式在開啟檔案後才拋出例外
+        suffixes = [CompressedWriter.suffix(method) for method in compression]
         full_file_path = os.path.join(output_directory, html_name)
-        # 建立文本
-        self._generate_pattern()
-        with open(full_file_path, "w") as output_file:
-            html_string = "\n".join(self.element_pattern)
-            output_file.write(html_string)
+        file_paths = list()
+        # 建立文本，在走訪網頁元素的同時分段寫入檔案(及壓縮器)
+        with ExitStack() as stack:
+            writables = list()
+            if write_plain == True:
+                writables.append(stack.enter_context(open(full_file_path, "w", encoding=encoding)))
+                file_paths.append(full_file_path)
+            for method, suffix in zip(compression, suffixes):
+                compressed_path = full_file_path + suffix
+                compressed_file = stack.enter_context(open(compressed_path, "wb"))
+                writables.append(stack.enter_context(
+                    CompressedWriter(compressed_file, method, compression_level, encoding)))
+                file_paths.append(compressed_path)
+            writable = writables[0] if len(writables) == 1 else TeeWriter(*writables)
+            self.stream(writable, buffer_size, renderer=renderer)
+        return file_paths
+    def stream(
+            self, writable: Any, buffer_size: int = 65536, encoding: str | None = None,
+            renderer: HtmlRenderer | None = None):
+        """
+        在走訪網頁元素的同時，將文本以不超過'buffer_size'個字元為單位分段寫入'writable'。
+
+        writable: 具有'write'方法的物件，或具有'sendall'方法的'socket'。
+
+        encoding: 若'writable'只接受'bytes'(例如'socket'、以'wb'開啟的檔案)，則需設置編碼方式。
+
+        renderer: 指定渲染時使用的'HtmlRenderer'實例。
+        """
+        with ChunkWriter(writable, buffer_size, encoding) as chunk_writer:
+            self.render(chunk_writer, renderer=renderer)
+        return writable
+    async def stream_async(
+            self, writer: Any, buffer_size: int = 65536, encoding: str | None = "utf-8",
+            renderer: HtmlRenderer | None = None, yield_every: int = 256):
+        """
+        在事件迴圈中將文本分段寫入'writer'(例如'asyncio.StreamWriter')，期間會定期交出執行權(見'HtmlRenderer.iter_chunks')。
+
+        encoding: 若'writer'接受字串，則設為'None'。
+        """
+        if renderer == None:
+            renderer = HtmlRenderer()
+        return await renderer.write_async(self, writer, buffer_size, yield_every, encoding)
+
+
+class BuildResult:
+    """
+    'build_documents'中單一檔案的建立結果。
+
+    html_name ---> 檔案名稱。
+
+    path ---> 完整的檔案路徑。
+
+    error ---> 渲染或寫入時拋出的例外，成功時為'None'。
+
+    size ---> 寫入的位元組數量。
+    """
+    __slots__ = ("index", "html_name", "path", "error", "size")
+    def __init__(self, index: int, html_name: str, path: str) -> None:
+        self.index = index
+        self.html_name = html_name
+        self.path = path
+        self.error: BaseException | None = None
+        self.size = 0
+    def __repr__(self) -> str:
+        status = "ok" if self.error == None else f"error={self.error!r}"
+        return f"BuildResult({self.html_name!r}, {status})"
+
+    @property
+    def ok(self) -> bool:
+        return self.error == None
+
+
+def build_documents(
+        jobs: Iterable[tuple[HtmlDocument | Callable[[], HtmlDocument], str]], output_directory: str,
+        max_workers: int | None = None, io_workers: int = 4, max_in_flight: int | None = None,
+        encoding: str = "utf-8", renderer: HtmlRenderer | None = None, executor: Executor | None = None,
+        progress: Callable[[BuildResult, int], Any] | None = None) -> list[BuildResult]:
+    """
+    批次建立多個網頁檔案：以行程池渲染文本，同時以執行緒池將已完成的文本寫入'output_directory'。
+
+    jobs: '(HtmlDocument 或 回傳HtmlDocument的函式, 檔案名稱)'的可迭代物件，會依序取用，不會一次全部載入。
+
+    max_workers: 渲染用的行程數量，預設為CPU核心數。
+
+    io_workers: 寫入檔案用的執行緒數量。
+
+    max_in_flight: 同時處於渲染或寫入中的網頁數量上限，用於限制記憶體用量，預設為'max_workers'的4倍。
+
+    encoding: 檔案的編碼方式，文本會在渲染的行程中完成編碼。
+
+    renderer: 渲染時使用的'HtmlRenderer'實例。
+
+    executor: 自行提供的渲染用'Executor'(例如'ThreadPoolExecutor')，由呼叫者負責關閉。
+
+    progress: 每完成(或失敗)一個檔案時，以'(BuildResult, 已完成的數量)'呼叫的函式。
+
+    回傳依照'jobs'順序排列的'BuildResult'列表；單一檔案失敗時不會中斷其他檔案，例外會記錄於'BuildResult.error'。
+
+    備註：
+
+    使用預設的行程池時，'HtmlDocument'或產生它的函式需要可以被'pickle'(例如模組層級的函式、'functools.partial')，
+
+    由函式在子行程中建立網頁可以避免序列化整棵網頁元素樹。
+    """
+    if os.path.isdir(output_directory) == False:
+        raise NotADirectoryError
+    if max_workers == None:
+        max_workers = os.cpu_count() or 1
+    if max_in_flight == None:
+        max_in_flight = max_workers*4
+    if max_in_flight <= 0 or io_workers <= 0:
+        raise ValueError
+    render_executor = executor if executor != None else ProcessPoolExecutor(max_workers)
+    results: list[BuildResult] = list()
+    # 'Future ---> (BuildResult, 是否為寫入階段)'
+    in_flight: dict[Future, tuple[BuildResult, bool]] = dict()
+    completed_count = 0
+    def finish(result: BuildResult, error: BaseException | None = None):
+        nonlocal completed_count
+        result.error = error
+        completed_count += 1
+        if progress != None:
+            progress(result, completed_count)
+    def collect(return_when: str):
+        # 渲染完成的網頁會轉交給寫入用的執行緒池，寫入完成後才算完成
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            result, is_writing = in_flight.pop(future)
+            error = future.exception()
+            if error != None:
+                finish(result, error)
+            elif is_writing == False:
+                in_flight[io_executor.submit(_write_document, result.path, future.result())] = (result, True)
+            else:
+                result.size = future.result()
+                finish(result)
+    try:
+        with ThreadPoolExecutor(io_workers) as io_executor:
+            for index, (document, html_name) in enumerate(jobs):
+                while len(in_flight) >= max_in_flight:
+                    collect(FIRST_COMPLETED)
+                result = BuildResult(index, html_name, os.path.join(output_directory, html_name))
+                results.append(result)
+                try:
+                    future = render_executor.submit(_render_document, document, encoding, renderer)
+                except Exception as error:
+                    finish(result, error)
+                    continue
+                in_flight[future] = (result, False)
+            while len(in_flight) > 0:
+                collect(FIRST_COMPLETED)
+    finally:
+        if executor == None:
+            render_executor.shutdown()
+    return results
+
+
+def _render_document(
+        document: HtmlDocument | Callable[[], HtmlDocument], encoding: str, renderer: HtmlRenderer | None) -> bytes:
+    """
+    在渲染用的行程(或執行緒)中建立並渲染網頁，回傳編碼後的文本。
+    """
+    if isinstance(document, HtmlDocument) == False:
+        document = document()
+        if isinstance(document, HtmlDocument) == False:
+            raise TypeError
+    return document.render(renderer=renderer).encode(encoding)
+
+
+def _write_document(path: str, data: bytes) -> int:
+    with open(path, "wb") as output_file:
+        output_file.write(data)
+    return len(data)
 
 
 ##### 網頁元素 #####
 
 class HtmlBody(SectionElement):
     _tag_symbol = "body"
+    __slots__ = ()
+    # 先送出'<!DOCTYPE html>'及'head'，瀏覽器可以在'body'渲染完成前開始載入樣式表及腳本
+    _flush_before = True
     def __init__(
             self, indent_tab: int = 0, parent_container: Container | None = None) -> None:
         """
@@ -56,6 +267,7 @@ class HtmlBody(SectionElement):
 
 class HtmlHead(SectionElement):
     _tag_symbol = "head"
+    __slots__ = ()
     def __init__(
             self, indent_tab: int = 0, parent_container: Container | None = None) -> None:
         """
@@ -70,6 +282,7 @@ class HtmlHead(SectionElement):
 
 class HtmlDivision(ContainerElement):
     _tag_symbol = "div"
+    __slots__ = ()
     def __init__(
             self, id_attr: str, indent_tab: int = 0,
             parent_container: Container | None = None) -> None:
@@ -87,6 +300,12 @@ class HtmlDivision(ContainerElement):
 
 class HtmlHeading(NormalElement):
     _tag_symbol = "h"
+    __slots__ = ("_style_number",)
+    # 'h0'~'h6'的標籤片段：(_start_prefix, _start_tag, _end_tag)，由所有實例共用。
+    _heading_tags = {
+        number: (sys.intern(f"<h{number}"), sys.intern(f"<h{number}>"), sys.intern(f"</h{number}>"))
+        for number in range(7)
+    }
     def __init__(self, id_attr: str, text: str = "", style_number: int = 1, indent_tab: int = 0) -> None:
         """
         Html的'h1~h6'元素。
@@ -101,8 +320,16 @@ class HtmlHeading(NormalElement):
         """
         NormalElement.__init__(self, id_attr, text, indent_tab)
         self.style_number = style_number
-        self._start_tag = f"<{self._tag_symbol}{str(self.style_number)} #AttrContent#>"
-        self._end_tag = f"</{self._tag_symbol}{str(self.style_number)}>"
+
+    @property
+    def _start_prefix(self):
+        return self._heading_tags[self.style_number][0]
+    @property
+    def _start_tag(self):
+        return self._heading_tags[self.style_number][1]
+    @property
+    def _end_tag(self):
+        return self._heading_tags[self.style_number][2]
 
     @property
     def style_number(self):
@@ -111,15 +338,23 @@ class HtmlHeading(NormalElement):
     def style_number(self, new_val: int):
         if isinstance(new_val, int):
             if 0 <= new_val <= 6:
+                if self._dirty == False:
+                    self._mark_dirty()
+                old_tag = self._start_prefix[1:] if hasattr(self, "_style_number") else None
                 self._style_number = new_val
+                if old_tag != None:
+                    element_index = ElementIndex.find(self)
+                    if element_index != None:
+                        element_index.update_tag(self, old_tag)
             else:
                 raise ValueError
         else:
-            TypeError
+            raise TypeError
 
 
 class HtmlParagraph(ContainerTextElement):
     _tag_symbol = "p"
+    __slots__ = ()
     def __init__(
             self, id_attr: str, text: str = "",
             indent_tab: int = 0, parent_container: Container | None = None) -> None:
@@ -140,6 +375,7 @@ class HtmlParagraph(ContainerTextElement):
 
 class HtmlSpan(ModifyElement):
     _tag_symbol = "span"
+    __slots__ = ()
     def __init__(self, id_attr: str, indent_tab: int = 0) -> None:
         """
         Html的'span'元素。
@@ -153,6 +389,7 @@ class HtmlSpan(ModifyElement):
 
 class HtmlForm(ContainerElement):
     _tag_symbol = "form"
+    __slots__ = ()
     _individual_attrs = ("action", "method")
 
     class Method(Enum):
@@ -197,24 +434,25 @@ class HtmlForm(ContainerElement):
     
     @property
     def action(self):
-        return f'action="{self._action}"'
+        return f'action="{self._get_attr_value("action")}"'
     @action.setter
     def action(self, new_val: str):
         if isinstance(new_val, str):
-            self._action = new_val
+            self._set_attr_value("action", new_val)
         else:
             raise TypeError
 
     @property
     def method(self):
-        return f'method="{self._method}"'
+        return f'method="{self._get_attr_value("method")}"'
     @method.setter
     def method(self, new_val: Method):
-        self._method = new_val.value
+        self._set_attr_value("method", new_val.value)
 
 
 class HtmlInput(VoidElement):
     _tag_symbol = "input"
+    __slots__ = ()
     _individual_attrs = ("input_type", "value")
 
     class InputType(Enum):
@@ -267,17 +505,17 @@ class HtmlInput(VoidElement):
 
     @property
     def input_type(self):
-        return f'type="{self._input_type}"'
+        return f'type="{self._get_attr_value("input_type")}"'
     @input_type.setter
     def input_type(self, new_val: InputType):
-        self._input_type = new_val.value
+        self._set_attr_value("input_type", new_val.value)
     
     @property
     def value(self):
-        return self.__value
+        return self._get_attr_value("value")
     @value.setter
     def value(self, new_val: str):
         if isinstance(new_val, str):
-            self.__value = new_val
+            self._set_attr_value("value", new_val)
         else:
             raise TypeError
@@ -1 +1,7 @@
-from .Element import *
\ No newline at end of file
+from .Element import *
+from .template import *
+from .diff import *
+from .parser import *
+from .bulk import *
+from .aio import *
+from .web import *
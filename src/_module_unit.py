@@ -2,22 +2,183 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import Any
+import sys
 
 
 ##### 基本元件 #####
 
-class HtmlGlobalAttr:
+class Markup(str):
+    """
+    標記已經跳脫(或可信任)的字串，渲染時不會再次跳脫。
+
+    example:
+
+    HtmlParagraph("notice", Markup("<b>重要</b>公告"))
+
+    備註：
+
+    'TextModifier.generate_modify_string'回傳的字串即為'Markup'，故'text_modify'不會跳脫修飾用的標籤。
+    """
+    __slots__ = ()
+
+
+class HtmlEscaper:
+    """
+    渲染時跳脫文字內容及屬性值的工具類別。
+
+    不含特殊字元的字串(大部分的情況)只需檢查一次即原樣回傳；需要跳脫的字串會快取其結果，重複出現時不需再次替換。
+
+    text ---> 跳脫'&'、'<'、'>'，用於文字內容。
+
+    attr ---> 另外跳脫'"'，用於以雙引號包住的屬性值。
+
+    'Markup'的實例會原樣回傳；非字串的值會先轉換成字串。
+    """
+    _text_cache: dict[str, str] = dict()
+    _attr_cache: dict[str, str] = dict()
+    cache_limit = 4096
+    @classmethod
+    def text(cls, value: Any) -> str:
+        if type(value) is not str:
+            if isinstance(value, Markup):
+                return value
+            value = str(value)
+        if "&" not in value and "<" not in value and ">" not in value:
+            return value
+        escaped = cls._text_cache.get(value)
+        if escaped == None:
+            escaped = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            if len(cls._text_cache) >= cls.cache_limit:
+                cls._text_cache.clear()
+            cls._text_cache[value] = escaped
+        return escaped
+    @classmethod
+    def attr(cls, value: Any) -> str:
+        if type(value) is not str:
+            if isinstance(value, Markup):
+                return value
+            value = str(value)
+        if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+            return value
+        escaped = cls._attr_cache.get(value)
+        if escaped == None:
+            escaped = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+            if len(cls._attr_cache) >= cls.cache_limit:
+                cls._attr_cache.clear()
+            cls._attr_cache[value] = escaped
+        return escaped
+    @classmethod
+    def clear(cls):
+        cls._text_cache.clear()
+        cls._attr_cache.clear()
+
+
+class AttrTable:
+    """
+    以稀疏的屬性表'_attr_table'儲存網頁元素的屬性值，只有'已設置'的屬性才會佔用空間。
+
+    '_attr_table'為扁平的數組：(屬性名稱1, 屬性值1, 屬性名稱2, 屬性值2, ...)，未設置任何屬性時為空數組。
+
+    屬性表會依照'_attr_order'(先'獨特'屬性，後'全域'屬性)排序，故產生屬性字串時只需依序走訪已設置的屬性。
+
+    '_attr_table'、'_dirty'由實作類別(例如'BaseElement')透過'__slots__'提供並初始化；'_dirty'為'True'時設置屬性不會再呼叫'_mark_dirty'。
+    """
+    __slots__ = ()
+    _attr_order: dict[str, int] = dict()
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        依照子類別的'_individual_attrs'、'_global_attrs'產生屬性的排列順序'_attr_order'。
+        """
+        super().__init_subclass__(**kwargs)
+        attr_order = dict()
+        for attr_name in getattr(cls, "_individual_attrs", ()) + getattr(cls, "_global_attrs", ()):
+            attr_order.setdefault(attr_name, len(attr_order))
+        cls._attr_order = attr_order
+    def _get_attr_value(self, attr_name: str) -> Any:
+        """
+        取得已設置的屬性值，若該屬性尚未設置則拋出'AttributeError'。
+
+        該方法供屬性的'getter'產生輸出字串使用，故字串值會經過'HtmlEscaper.attr'跳脫；原始的值請直接讀取'_attr_table'。
+        """
+        attr_table = self._attr_table
+        for index in range(0, len(attr_table), 2):
+            if attr_table[index] == attr_name:
+                value = attr_table[index + 1]
+                return HtmlEscaper.attr(value) if isinstance(value, str) else value
+        raise AttributeError(attr_name)
+    def _set_attr_value(self, attr_name: str, new_val: Any):
+        """
+        設置屬性值並將網頁元素標記為需要重新渲染，若'new_val'為'None'則移除該屬性。
+
+        新增的屬性會依照'_attr_order'插入對應的位置。
+        """
+        if attr_name in ElementIndex.indexed_attrs:
+            element_index = ElementIndex.find(self)
+            if element_index != None:
+                element_index.update(self, attr_name, ElementIndex.attr_value(self, attr_name), new_val)
+        attr_table = self._attr_table
+        index = attr_table.index(attr_name) if attr_name in attr_table else -1
+        if index > 0 and index % 2 == 1:
+            # 找到的是恰好與屬性名稱相同的屬性值，改為只比對屬性名稱(偶數索引)
+            attr_names = attr_table[0::2]
+            index = attr_names.index(attr_name) * 2 if attr_name in attr_names else -1
+        if index >= 0:
+            if attr_table[index + 1] is new_val:
+                # 設置相同的值不需要重建屬性表，也不需要重新渲染
+                return
+            attr_list = list(attr_table)
+            if new_val is None:
+                del attr_list[index:index + 2]
+            else:
+                attr_list[index + 1] = new_val
+            self._attr_table = tuple(attr_list)
+        elif new_val is None:
+            return
+        elif len(attr_table) == 0:
+            self._attr_table = (attr_name, new_val)
+        else:
+            attr_order = self._attr_order
+            default_rank = len(attr_order)
+            attr_rank = attr_order.get(attr_name, default_rank)
+            if attr_order.get(attr_table[-2], default_rank) <= attr_rank:
+                # 依照'_attr_order'的順序設置屬性時，新增的屬性直接附加於最後
+                self._attr_table = attr_table + (attr_name, new_val)
+            else:
+                index = 0
+                while attr_order.get(attr_table[index], default_rank) <= attr_rank:
+                    index += 2
+                self._attr_table = attr_table[:index] + (attr_name, new_val) + attr_table[index:]
+        if self._dirty == False:
+            self._mark_dirty()
+    def generate_attr_string(self) -> str:
+        """
+        依照'_attr_order'將所有已設置的屬性轉化為一串彼此以空格相連的字串形式，不會走訪未設置的屬性。
+
+        回傳字串格式:
+
+        individual_attr1=value ... global_attr1=value ...
+        """
+        attr_table = self._attr_table
+        exist_attr_list = list()
+        for index in range(0, len(attr_table), 2):
+            exist_attr_list.append(getattr(self, attr_table[index]))
+        return " ".join(exist_attr_list)
+
+
+class HtmlGlobalAttr(AttrTable):
     """
     包含Html所擁有的全域屬性及其設置的條件。
     
     大部分的Html元素都該繼承此類別。
     """
+    __slots__ = ()
     _global_attrs = (
         "accesskey", "class_attr", "contenteditable", "data", "dir_attr",
         "draggable", "enterkeyhint", "hidden", "id_attr", "inert",
         "inputmode", "lang", "popover", "spellcheck", "style",
         "tabindex", "title"
     )
+    _global_attr_set = frozenset(_global_attrs)
     class Dir(Enum):
         """
         Html的'Dir'屬性。決定元素所包含的文字顯示方向。
@@ -94,37 +255,37 @@ class HtmlGlobalAttr:
         
         'tabindex', 'title'
         """
-        error_messenge = f"您提供的屬性名稱#AttributeName#並不在屬性列表裡。請確認符合其中的名稱：\n{self._global_attrs}"
         for html_attr, new_val in attr_dict.items():
-            if html_attr not in self._global_attrs:
-                raise AttributeError(error_messenge.replace("#AttributeName#", html_attr))
+            if html_attr not in self._global_attr_set:
+                # 錯誤訊息只在需要時產生
+                raise AttributeError(f"您提供的屬性名稱{html_attr}並不在屬性列表裡。請確認符合其中的名稱：\n{self._global_attrs}")
             setattr(self, html_attr, new_val)
         return self
     def generate_global_attr_string(self) -> str:
         """
         該方法會將已設置好的'全域'屬性轉化為一串彼此以空格相連的字串形式。
 
-        每種'全域'屬性都是透過'getter'來獲得對應的屬性字串格式。
+        每種'全域'屬性都是透過'getter'來獲得對應的屬性字串格式，且只會走訪已設置的屬性。
 
         回傳字串格式:
 
         attr1=value attr2=value ...
         """
+        attr_table = self._attr_table
         exist_attr_list = list()
-        for attr_name in self._global_attrs:
-            val = getattr(self, attr_name, None)
-            if val != None:
-                exist_attr_list.append(val)
+        for index in range(0, len(attr_table), 2):
+            if attr_table[index] in self._global_attr_set:
+                exist_attr_list.append(getattr(self, attr_table[index]))
         return " ".join(exist_attr_list)
 
     @property
     def accesskey(self):
-        return f'accesskey="{self.__accesskey}"'
+        return f'accesskey="{self._get_attr_value("accesskey")}"'
     @accesskey.setter
     def accesskey(self, new_val: str):
         if isinstance(new_val, str):
             if len(new_val) == 1:
-                self.__accesskey = new_val
+                self._set_attr_value("accesskey", new_val)
             else:
                 raise ValueError
         else:
@@ -132,172 +293,176 @@ class HtmlGlobalAttr:
 
     @property
     def class_attr(self):
-        return f'class="{self.__class_attr}"'
+        return f'class="{self._get_attr_value("class_attr")}"'
     @class_attr.setter
     def class_attr(self, new_val: str):
         if isinstance(new_val, str):
-            self.__class_attr = new_val
+            self._set_attr_value("class_attr", new_val)
         else:
             raise TypeError
         
     @property
     def contenteditable(self):
-        return f'contenteditable="{str(self.__contenteditable).lower()}"'
+        return f'contenteditable="{str(self._get_attr_value("contenteditable")).lower()}"'
     @contenteditable.setter
     def contenteditable(self, new_val: bool):
         if isinstance(new_val, bool):
-            self.__contenteditable = new_val
+            self._set_attr_value("contenteditable", new_val)
         else:
             raise TypeError
         
     @property
     def data(self):
-        return f'data-{self.__data[0]}="{self.__data[1]}"'
+        data_name, data_value = self._get_attr_value("data")
+        return f'data-{HtmlEscaper.attr(data_name)}="{HtmlEscaper.attr(data_value)}"'
     @data.setter
     def data(self, new_val: tuple[str, str]):
         if (isinstance(new_val[0], str) and
             isinstance(new_val[1], str)):
-            self.__data = new_val
+            self._set_attr_value("data", new_val)
         else:
             raise TypeError
         
     @property
     def dir_attr(self):
-        return f'dir="{self.__dir_attr}"'
+        return f'dir="{self._get_attr_value("dir_attr")}"'
     @dir_attr.setter
     def dir_attr(self, new_val: Dir):
-        self.__dir_attr = new_val.value
+        self._set_attr_value("dir_attr", new_val.value)
             
     @property
     def draggable(self):
-        return f'draggable="{self.__draggable}"'
+        return f'draggable="{self._get_attr_value("draggable")}"'
     @draggable.setter
     def draggable(self, new_val: Draggable):
-        self.__draggable = new_val.value
+        self._set_attr_value("draggable", new_val.value)
 
     @property
     def enterkeyhint(self):
-        return f'enterkeyhint="{self.__enterkeyhint}"'
+        return f'enterkeyhint="{self._get_attr_value("enterkeyhint")}"'
     @enterkeyhint.setter
     def enterkeyhint(self, new_val: Enterkeyhint):
-        self.__enterkeyhint = new_val.value
+        self._set_attr_value("enterkeyhint", new_val.value)
     
     @property
     def hidden(self):
-        return self.__hidden
+        return self._get_attr_value("hidden")
     @hidden.setter
     def hidden(self, new_val: bool):
         if isinstance(new_val, bool):
             if new_val == True:
-                self.__hidden = "hidden"
+                self._set_attr_value("hidden", "hidden")
             else:
-                self.__hidden = None
+                self._set_attr_value("hidden", None)
         else:
             raise TypeError
     
     @property
     def id_attr(self):
-        return f'id="{self.__id}"'
+        return f'id="{self._get_attr_value("id_attr")}"'
     @id_attr.setter
     def id_attr(self, new_val: str):
         if isinstance(new_val, str):
-            self.__id = new_val
+            self._set_attr_value("id_attr", new_val)
         else:
             raise TypeError
 
     @property
     def inert(self):
-        return self.__inert
+        return self._get_attr_value("inert")
     @inert.setter
     def inert(self, new_val: bool):
         if isinstance(new_val, bool):
             if new_val == True:
-                self.__inert = "inert"
+                self._set_attr_value("inert", "inert")
             else:
-                self.__inert = None
+                self._set_attr_value("inert", None)
         else:
             raise TypeError
 
     @property
     def inputmode(self):
-        return f'inputmode="{self.__inputmode}"'
+        return f'inputmode="{self._get_attr_value("inputmode")}"'
     @inputmode.setter
     def inputmode(self, new_val: Inputmode):
-        self.__inputmode = new_val.value
+        self._set_attr_value("inputmode", new_val.value)
     
     @property
     def lang(self):
-        return f'lang="{self.__lang}"'
+        return f'lang="{self._get_attr_value("lang")}"'
     @lang.setter
     def lang(self, new_val: Lang):
-        self.__lang = new_val.value
+        self._set_attr_value("lang", new_val.value)
 
     @property
     def popover(self):
-        return self.__popover
+        return self._get_attr_value("popover")
     @popover.setter
     def popover(self, new_val: bool):
         if isinstance(new_val, bool):
             if new_val == True:
-                self.__popover = "popover"
+                self._set_attr_value("popover", "popover")
             else:
-                self.__popover = None
+                self._set_attr_value("popover", None)
         else:
             raise TypeError
 
     @property
     def spellcheck(self):
-        return f'spellcheck="{str(self.__spellcheck).lower()}"'
+        return f'spellcheck="{str(self._get_attr_value("spellcheck")).lower()}"'
     @spellcheck.setter
     def spellcheck(self, new_val: bool):
         if isinstance(new_val, bool):
-            self.__spellcheck = new_val
+            self._set_attr_value("spellcheck", new_val)
         else:
             raise TypeError
 
     @property
     def style(self):
-        return f'style="{self.__style}"'
+        return f'style="{self._get_attr_value("style")}"'
     @style.setter
     def style(self, new_val: str):
         if isinstance(new_val, str):
-            self.__style = new_val
+            self._set_attr_value("style", new_val)
         else:
             raise TypeError
 
     @property
     def tabindex(self):
-        return f'tabindex="{str(self.__tabindex)}"'
+        return f'tabindex="{str(self._get_attr_value("tabindex"))}"'
     @tabindex.setter
     def tabindex(self, new_val: int):
         if isinstance(new_val, int):
-            self.__tabindex = new_val
+            self._set_attr_value("tabindex", new_val)
         else:
             raise TypeError
 
     @property
     def title(self):
-        return f'title="{self.__title}"'
+        return f'title="{self._get_attr_value("title")}"'
     @title.setter
     def title(self, new_val: str):
         if isinstance(new_val, str):
-            self.__title = new_val
+            self._set_attr_value("title", new_val)
         else:
             TypeError
 
 
-class IndividualAttr:
+class IndividualAttr(AttrTable):
     """
     部分的Html元素會具備自己獨有的屬性。
     
     如果繼承該類別，則需要注意將'特有屬性'設置於'_individual_attrs'數組裡並設置對應的'@property'。
 
+    '@property'應透過'_get_attr_value'、'_set_attr_value'存取'_attr_table'裡的屬性值。
+
     該類別不與'HtmlGlobalAttr'類別衝突。
 
     備註：
 
     設置於'_individual_attrs'裡的字串必須符合變數的命名方式。(如不能有空白鍵、不能以數字做為開頭...)，
     """
+    __slots__ = ()
     _individual_attrs: tuple[str] = ()
     def set_individual_attr(self, attr_dict: dict[str, Any] = dict()):
         """
@@ -309,27 +474,27 @@ class IndividualAttr:
 
         未定義
         """
-        error_messenge = f"您提供的屬性名稱#AttributeName#並不在屬性列表裡。請確認符合其中的名稱：\n{self._individual_attrs}"
         for html_attr, new_val in attr_dict.items():
             if html_attr not in self._individual_attrs:
-                raise AttributeError(error_messenge.replace("#AttributeName#", html_attr))
+                # 錯誤訊息只在需要時產生
+                raise AttributeError(f"您提供的屬性名稱{html_attr}並不在屬性列表裡。請確認符合其中的名稱：\n{self._individual_attrs}")
             setattr(self, html_attr, new_val)
         return self
     def generate_individual_attr_string(self):
         """
         該方法會將已設置好的'獨特'屬性'轉化為一串彼此以空格相連的字串形式。
 
-        每種'獨特'屬性都是透過'getter'來獲得對應的屬性字串格式。
+        每種'獨特'屬性都是透過'getter'來獲得對應的屬性字串格式，且只會走訪已設置的屬性。
 
         回傳字串格式:
 
         attr1=value attr2=value ...
         """
+        attr_table = self._attr_table
         exist_attr_list = list()
-        for attr_name in self._individual_attrs:
-            val = getattr(self, attr_name, None)
-            if val != None:
-                exist_attr_list.append(val)
+        for index in range(0, len(attr_table), 2):
+            if attr_table[index] in self._individual_attrs:
+                exist_attr_list.append(getattr(self, attr_table[index]))
         return " ".join(exist_attr_list)
 
 
@@ -339,6 +504,7 @@ class IBaseElement(ABC):
 
     需要額外實作'all_attr_string'、'element_pattern'、'indent_tab'屬性。
     """
+    __slots__ = ()
     @abstractmethod
     def __init__(self, indent_tab: int = 0) -> None:
         """
@@ -363,6 +529,24 @@ class IBaseElement(ABC):
         未實作。該方法規範如何產生完整的網頁元素字串。
         """
         raise NotImplementedError
+    @abstractmethod
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        """
+        未實作。該方法將網頁元素'開頭'的字串片段寫入'write'。
+
+        'depth'為上級容器所決定的縮排數量，實際的縮排為'tab*(depth + indent_tab)'。
+
+        'tab'、'newline'為縮排及換行所使用的字串，壓縮輸出(minify)時兩者皆為空字串。
+
+        若該網頁元素具有需要渲染的子元素，則回傳子元素列表；否則回傳'None'。
+        """
+        raise NotImplementedError
+    @abstractmethod
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        """
+        未實作。該方法將網頁元素'結尾'的字串片段寫入'write'，僅在'_render_open'回傳子元素列表時使用。
+        """
+        raise NotImplementedError
 
     @property
     @abstractmethod
@@ -391,20 +575,48 @@ class Tag:
     建立元素所對應之標籤。
     
     欲設定標籤之文字，請變更'_tag_symbol'的值。
+
+    標籤的片段會在定義子類別時產生一次(並透過'sys.intern'共用)，由該類別的所有實例共用：
+
+    _start_prefix ---> '<tag'
+
+    _start_tag ---> '<tag>'(不具有屬性時的開始標籤)
+
+    _end_tag ---> '</tag>'
     """
+    __slots__ = ()
     _tag_symbol = ""
+    _start_prefix = "<"
+    _start_tag = "<>"
+    _end_tag = "</>"
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        依照子類別的'_tag_symbol'產生共用的標籤片段。
+
+        若子類別自行定義了'_start_prefix'或'_end_tag'(例如'@property')，則不會覆蓋。
+        """
+        super().__init_subclass__(**kwargs)
+        if "_start_prefix" not in cls.__dict__:
+            cls._start_prefix = sys.intern(f"<{cls._tag_symbol}")
+            cls._start_tag = sys.intern(f"<{cls._tag_symbol}>")
+        if "_end_tag" not in cls.__dict__:
+            cls._end_tag = sys.intern(f"</{cls._tag_symbol}>")
     def __init__(self, has_attrs: bool = True) -> None:
         """
-        可以透過參數'has_attrs'來產生是否具有可以填入屬性的標籤。
+        參數'has_attrs'表示是否具有可以填入屬性的標籤，例如'body'元素不具有任何屬性。
 
-        例如'body'元素不具有任何屬性
+        由於開始標籤直接由'_start_prefix'與屬性字串串接而成，不具有屬性時不會留下多餘的空格，故該參數僅為相容而保留。
         """
-        if has_attrs == True:
-            self._start_tag = f"<{self._tag_symbol} #AttrContent#>"
-            self._end_tag = f"</{self._tag_symbol}>"
-        else:
-            self._start_tag = f"<{self._tag_symbol}>"
-            self._end_tag = f"</{self._tag_symbol}>"
+        pass
+    def _generate_start_tag(self, attr_string: str) -> str:
+        """
+        串接'_start_prefix'、屬性字串及'>'，產生完整的開始標籤。
+
+        若屬性字串為空字串，則回傳'<tag>'。
+        """
+        if attr_string == "":
+            return self._start_prefix + ">"
+        return self._start_prefix + " " + attr_string + ">"
 
 
 class Container:
@@ -414,7 +626,20 @@ class Container:
     該類別也新增對於其他繼承該類別的上下級設定。
 
     實例化該類別的方式必須使用'with class as varible: ...'
+
+    備註：
+
+    'lazy_build'為'True'(預設)時，退出'with'區塊只會記錄上下級關係，網頁元素的字串會延遲到最上層呼叫'build'時才一次產生。
+
+    若設為'False'，則會在退出'with'區塊時立即產生'container_content'的快照(舊有的行為)。該快照只供'container_content'的'getter'使用，
+
+    'HtmlRenderer'(即'build'、'render'、'stream')不會讀取，故不影響輸出，只會增加建構的成本，且不會反映退出後的變更。
+
+    由於多重繼承時只能有一個上級類別具有非空的'__slots__'，實作類別需自行於'__slots__'宣告'_container_slots'。
     """
+    __slots__ = ()
+    _container_slots = ("_element_list", "_parent_container", "_adjust_tab", "_container_content", "_index")
+    lazy_build: bool = True
     def __init__(self, parent_container: Container | None) -> None:
         """
         在建構此類別的實例時，需確認其是否具有上級'Container'。
@@ -435,49 +660,293 @@ class Container:
         """
         self._element_list: list[IBaseElement] = list()
         self._parent_container = parent_container
-        # '_adjust_tab'用於調整當其他元素儲存於該'Container'時，應該縮排多少個'tab'。
+        # '_adjust_tab'用於調整當其他元素儲存於該'Container'時，相對於上級容器應該多縮排多少個'tab'。
+        # 實際的縮排會在渲染時依照元素所在的深度計算，不會修改元素本身的'indent_tab'。
         self._adjust_tab: int = 1
-        self.container_content: str
+        self._container_content: str | None = None
+        # 樹在查詢過後，其中的每個容器都會指向同一個'ElementIndex'
+        self._index: ElementIndex | None = None
     def attach(self, element: IBaseElement):
-        """會將接受到的元素儲存於'_element_list'列表裡。"""
+        """
+        會將接受到的元素儲存於'_element_list'列表裡。
+
+        同時記錄該元素的上級容器，並將該容器標記為需要重新渲染。
+
+        該方法會回傳'element'本身，故不使用'with'區塊也能以程式建立任意深度的樹：
+
+        child = parent.attach(HtmlDivision("child"))
+        """
         if isinstance(element, IBaseElement):
             self._element_list.append(element)
+            element._parent = self
+            self._mark_dirty()
+            element_index = self._index
+            if isinstance(element, Container) and element._index != None and element._index is not element_index:
+                # 被附加的子樹原本所屬的索引不再適用，改由所在樹的索引維護
+                if element._index._root is element:
+                    element._index.release()
+                if element_index == None:
+                    ElementIndex.unlink(element)
+            if element_index != None:
+                element_index.add_subtree(element)
+            return element
         else:
             raise TypeError
+    def get_element_by_id(self, id_value: str) -> IBaseElement | None:
+        """
+        透過索引取得該容器(含自身)中'id'為'id_value'的網頁元素，若有重複則回傳最先加入的網頁元素。
+        """
+        for element in self.element_index.get_all_by_id(id_value):
+            if self._contains(element):
+                return element
+        return None
+    def get_elements_by_class(self, class_name: str) -> list[IBaseElement]:
+        """
+        透過索引取得該容器(含自身)中'class'含有'class_name'的所有網頁元素。
+        """
+        return [element for element in self.element_index.get_by_class(class_name) if self._contains(element)]
+    def _contains(self, element: IBaseElement) -> bool:
+        """
+        判斷'element'是否為該容器本身或其子孫。
+        """
+        if self._parent == None:
+            return True
+        while element != None:
+            if element is self:
+                return True
+            element = element._parent
+        return False
     def _encapsulate(self):
         """
-        將所儲存的'所有'元素轉換成字串並串聯在一起的方法。
-        
-        主要透過'IBaseElement.build()'達成每個元素的字串轉換。
+        將目前所儲存的元素渲染成字串並存為'container_content'的快照，縮排以該'Container'為最上層計算。
 
-        該方法應只能在退出'with class as varible: ...'時使用。
+        僅在'lazy_build'為'False'且退出'with class as varible: ...'時使用；'HtmlRenderer'不會讀取該快照。
         """
-        container_content_list = list()
-        for element in self._element_list:
-            element.indent_tab += self._adjust_tab
-            container_content_list.append(element.build())
-        self.container_content = "\n".join(container_content_list)
+        self._container_content = None
+        self.container_content = self.container_content
     def __enter__(self):
         """用於該語法'with class as varible: ...'並建立'Container'的上下級關係"""
         if self._parent_container != None:
             if isinstance(self._parent_container, Container):
-                self._parent_container._element_list.append(self)
-                self._adjust_tab = self._adjust_tab + self._parent_container._adjust_tab
+                self._parent_container.attach(self)
                 return self
             else:
                 raise TypeError
         return self
     def __exit__(self, exc_type, exc_value, exc_traceback):
-        self._encapsulate()
+        if self.lazy_build == False:
+            self._encapsulate()
+
+    @property
+    def element_index(self) -> ElementIndex:
+        """
+        該容器所在的樹的'ElementIndex'，由樹中所有容器共用；第一次取得時才會走訪整棵樹建立。
+        """
+        if self._index != None:
+            return self._index
+        root = self
+        while root._parent != None:
+            root = root._parent
+        if root._index == None:
+            root._index = ElementIndex(root)
+        return root._index
+    @property
+    def duplicate_ids(self) -> dict[str, list[IBaseElement]]:
+        """
+        該容器所在的樹中重複的'id'及具有該'id'的網頁元素。
+        """
+        return self.element_index.duplicate_ids
+
+    @property
+    def container_content(self) -> str:
+        """
+        所儲存的'所有'元素的字串，彼此以換行符號相連。
+
+        若未在退出'with'區塊時產生快照(見'lazy_build')，則每次取得時都會重新產生，故能反映退出後的變更；
+
+        快照則不會隨之更新。渲染網頁時不會使用該屬性。
+        """
+        if self._container_content != None:
+            return self._container_content
+        container_content_list = list()
+        for element in self._element_list:
+            container_content_list.append(element.render(depth=self._adjust_tab))
+        return "\n".join(container_content_list)
+    @container_content.setter
+    def container_content(self, new_val: str):
+        if isinstance(new_val, str):
+            self._container_content = new_val
+        else:
+            raise TypeError
+
+
+class ElementIndex:
+    """
+    以'id'、'class'及標籤名稱為鍵值的網頁元素索引，由樹中所有容器的'_index'共用(見'Container.element_index')。
+
+    建立時會走訪整棵樹一次，之後在'attach'及'id_attr'、'class_attr'變更時增量更新，查詢皆為O(1)。
+
+    'id'對應到網頁元素列表，故重複的'id'不會覆蓋彼此，可透過'duplicate_ids'取得。
+
+    備註：
+
+    'attach'及屬性變更只需檢查所在容器的'_index'，不需走訪至最上層容器，故未建立索引的樹不會因其他樹的索引而增加建構的成本。
+    """
+    indexed_attrs = frozenset(("id_attr", "class_attr"))
+    def __init__(self, root: IBaseElement) -> None:
+        self._ids: dict[str, list[IBaseElement]] = dict()
+        # 以'id(網頁元素)'為鍵值，使移除為O(1)且保留加入的順序
+        self._classes: dict[str, dict[int, IBaseElement]] = dict()
+        self._tags: dict[str, dict[int, IBaseElement]] = dict()
+        # 'id(網頁元素) ---> 在文件中的順序'，於查詢時才產生，'attach'後失效
+        self._order: dict[int, int] | None = None
+        self._root = root
+        self.add_subtree(root)
+    @staticmethod
+    def find(element: IBaseElement) -> ElementIndex | None:
+        """
+        取得'element'所在的樹的索引，若尚未建立則回傳'None'。
+
+        樹中的每個容器都指向同一個索引，故只需檢查上級容器(或最上層容器本身)。
+        """
+        parent = element._parent
+        if parent != None:
+            return parent._index
+        return element._index if isinstance(element, Container) else None
+    @staticmethod
+    def unlink(element: IBaseElement):
+        """
+        清除'element'及其所有子容器的'_index'(子樹被附加到尚未建立索引的樹時使用)。
+        """
+        stack = [element]
+        while len(stack) > 0:
+            node = stack.pop()
+            children = getattr(node, "_element_list", None)
+            if children != None:
+                node._index = None
+                stack.extend(children)
+    @staticmethod
+    def attr_value(element: IBaseElement, attr_name: str) -> Any:
+        """
+        取得屬性表中的原始屬性值，未設置(或不具有屬性)時回傳'None'。
+        """
+        attr_table = element._attr_table
+        for index in range(0, len(attr_table), 2):
+            if attr_table[index] == attr_name:
+                return attr_table[index + 1]
+        return None
+    @staticmethod
+    def tag_name(element: IBaseElement) -> str:
+        """
+        網頁元素的標籤名稱(例如'div'、'h2')。
+        """
+        return element._start_prefix[1:]
+    def add_subtree(self, element: IBaseElement):
+        """
+        將'element'及其所有子元素加入索引。
+        """
+        self._order = None
+        stack = [element]
+        while len(stack) > 0:
+            node = stack.pop()
+            if node._is_streaming == True:
+                # 串流的子元素(例如'LazyChildren')只是渲染時的佔位元素，不是實際的網頁元素
+                continue
+            self._add_value(node, "id_attr", self.attr_value(node, "id_attr"))
+            self._add_value(node, "class_attr", self.attr_value(node, "class_attr"))
+            self._tags.setdefault(self.tag_name(node), dict())[id(node)] = node
+            children = getattr(node, "_element_list", None)
+            if children != None:
+                node._index = self
+                stack.extend(reversed(children))
+    def update_tag(self, element: IBaseElement, old_tag: str):
+        """
+        網頁元素的標籤名稱改變時(例如'HtmlHeading.style_number')更新索引。
+        """
+        elements = self._tags.get(old_tag)
+        if elements != None:
+            elements.pop(id(element), None)
+            if len(elements) == 0:
+                del self._tags[old_tag]
+        self._tags.setdefault(self.tag_name(element), dict())[id(element)] = element
+    def document_order(self) -> dict[int, int]:
+        """
+        回傳'id(網頁元素) ---> 在文件中的順序'，用於將查詢結果依照文件順序排列。
+        """
+        if self._order == None:
+            order = dict()
+            stack = [self._root]
+            while len(stack) > 0:
+                node = stack.pop()
+                order[id(node)] = len(order)
+                stack.extend(reversed(getattr(node, "_element_list", ())))
+            self._order = order
+        return self._order
+    def update(self, element: IBaseElement, attr_name: str, old_value: Any, new_value: Any):
+        """
+        屬性值由'old_value'變更為'new_value'時更新索引('None'表示未設置)。
+        """
+        self._remove_value(element, attr_name, old_value)
+        self._add_value(element, attr_name, new_value)
+    def _add_value(self, element: IBaseElement, attr_name: str, value: Any):
+        if value == None:
+            return
+        if attr_name == "id_attr":
+            self._ids.setdefault(value, list()).append(element)
+        else:
+            for class_name in value.split():
+                self._classes.setdefault(class_name, dict())[id(element)] = element
+    def _remove_value(self, element: IBaseElement, attr_name: str, value: Any):
+        if value == None:
+            return
+        if attr_name == "id_attr":
+            elements = self._ids.get(value, ())
+            for index in range(len(elements)):
+                if elements[index] is element:
+                    del elements[index]
+                    break
+            if len(elements) == 0:
+                self._ids.pop(value, None)
+        else:
+            for class_name in value.split():
+                elements = self._classes.get(class_name)
+                if elements != None:
+                    elements.pop(id(element), None)
+                    if len(elements) == 0:
+                        del self._classes[class_name]
+    def release(self):
+        """
+        清空索引(最上層容器被附加到其他容器時使用)。
+        """
+        self._ids.clear()
+        self._classes.clear()
+        self._tags.clear()
+        self._order = None
+    def get_all_by_id(self, id_value: str) -> list[IBaseElement]:
+        return list(self._ids.get(id_value, ()))
+    def get_by_id(self, id_value: str) -> IBaseElement | None:
+        elements = self._ids.get(id_value)
+        return elements[0] if elements else None
+    def get_by_class(self, class_name: str) -> list[IBaseElement]:
+        return list(self._classes.get(class_name, dict()).values())
+    def get_by_tag(self, tag_name: str) -> list[IBaseElement]:
+        return list(self._tags.get(tag_name, dict()).values())
+
+    @property
+    def duplicate_ids(self) -> dict[str, list[IBaseElement]]:
+        return {id_value: list(elements) for id_value, elements in self._ids.items() if len(elements) > 1}
 
 
 class TextModifier:
     """
     和'HtmlText'類別相對應的類別，用於區分可修飾的對象。
     """
+    __slots__ = ()
     def generate_modify_string(self, text: str) -> str:
         """
         該方法將'HtmlText'實例中的'text'修飾成符合預期的字串。
+
+        回傳的字串應以'Markup'標記，並自行跳脫'text'，以免修飾用的標籤在渲染時被跳脫。
         """
         raise NotImplementedError
 
@@ -485,12 +954,17 @@ class TextModifier:
 class HtmlText:
     """
     和'TextModifier'類別相對應的類別，當網頁元素可以具有文字內容(夾在'tag'之間的那段字串)時，需要繼承此類別。
+
+    文字內容儲存於'_text'，需由實作類別於'__slots__'宣告。
+
+    文字內容以原始的字串儲存，渲染時才透過'HtmlEscaper.text'跳脫(見'escaped_text')；已跳脫的字串請以'Markup'標記。
     """
+    __slots__ = ()
     def __init__(self, text: str = "") -> None:
         """
         建立一個名為'self.text'的變數。
         """
-        self.text: str = text
+        self.text = text
     def text_modify(self, *modifiers: TextModifier):
         """
         該方法透過'TextModifier'的實例來修飾文字內容。
@@ -498,3 +972,19 @@ class HtmlText:
         for modifier in modifiers:
             self.text = modifier.generate_modify_string(self.text)
         return self
+
+    @property
+    def text(self) -> str:
+        return self._text
+    @text.setter
+    def text(self, new_val: str):
+        if self._dirty == False:
+            self._mark_dirty()
+        self._text = new_val
+
+    @property
+    def escaped_text(self) -> str:
+        """
+        渲染時輸出的文字內容。
+        """
+        return HtmlEscaper.text(self._text)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+from itertools import count
+from typing import Awaitable, Callable
+from .base import *
+
+##### 非同步 #####
+
+class AsyncFragment(BaseElement):
+    """
+    BaseElement類別子類，其內容是一個非同步的結果(例如查詢資料庫後建立的網頁元素)，可以附加於任何'Container'。
+
+    繼承自'BaseElement'。
+
+    -------------------------------
+
+    只能透過'HtmlRenderer.iter_chunks'、'render_async'、'write_async'(或'HtmlDocument.stream_async')渲染：
+
+    樹中所有的'AsyncFragment'會在開始渲染時同時啟動，輪到它們時才等待結果，故多個較慢的片段所需的時間為最慢的一個，而非總和。
+
+    結果需為網頁元素或'None'(不輸出任何內容)，並與該網頁元素位於相同的縮排層級。
+
+    example:
+
+    async def load_orders():
+
+        rows = await database.fetch(...)
+
+        return HtmlBulkTable("orders", rows=rows)
+
+    body.attach(AsyncFragment(load_orders))
+
+    備註：
+
+    若'source'為協程物件(而非回傳協程的函式)，則只能渲染一次。該網頁元素不會被渲染引擎快取，其上級容器也不會。
+    """
+    __slots__ = ("_source", "_content_key", "_adjust_tab")
+    _is_streaming = True
+    _is_async = True
+    _content_serial = count()
+    def __init__(self, source: Awaitable | Callable[[], Awaitable], indent_tab: int = 0) -> None:
+        """
+        source: 回傳網頁元素的協程函式(或其他回傳'Awaitable'的函式)，或是'Awaitable'本身。
+
+        indent_tab: 結果在轉換成字串時，需要額外縮排'多少'個tab。
+        """
+        BaseElement.__init__(self, indent_tab, False)
+        self._source = source
+        self._content_key = ("async", next(self._content_serial))
+        self._adjust_tab = indent_tab
+    def _start(self) -> Awaitable:
+        """
+        取得此次渲染所要等待的'Awaitable'。
+        """
+        # 結果的深度為該網頁元素的深度加上'indent_tab'
+        self._adjust_tab = self.indent_tab
+        source = self._source
+        return source() if callable(source) else source
+    def _generate_pattern(self):
+        self.element_pattern = ["\t"*self.indent_tab]
+    def build(self) -> str:
+        return self.render()
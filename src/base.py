@@ -1,4 +1,6 @@
 from ._module_unit import *
+from .render import *
+from .selector import *
 
 ##### 已組合元件 #####
 
@@ -13,13 +15,66 @@ class BaseElement(IBaseElement, Tag):
     IBaseElement ---> 規範網頁元素的基本建構行為。
 
     Tag ---> 使該類別具有'tag'可以使用。
+
+    備註：
+
+    '_dirty'表示網頁元素在上次渲染後是否有變更，'_render_cache'則儲存上次渲染的結果'(depth, 字串)'。
+
+    所有網頁元素都以'__slots__'儲存欄位，屬性值則存放於稀疏的屬性表'_attr_table'，不會為每個實例建立'__dict__'。
+
+    子類別的'__init__'應優先呼叫此類別的'__init__'，其他上級類別的初始化方法才能使用這些欄位。
     """
+    __slots__ = (
+        "_attr_table", "_parent", "_dirty", "_render_cache",
+        "__indent_tab", "__all_attr_string", "__element_pattern"
+    )
     def __init__(self, indent_tab: int = 0, has_attrs: bool = True) -> None:
         """
         實作繼承的類別的初始化方法。
         """
+        self._attr_table: tuple = ()
+        self._parent: Container | None = None
+        self._dirty = True
+        self._render_cache: tuple[int, str] | None = None
         Tag.__init__(self, has_attrs)
         self.indent_tab = indent_tab
+    # 序列化(pickle)時不保存的欄位：上級容器會在還原時重新連結，快取則不需要傳遞。
+    _transient_slots = frozenset(("_parent", "_parent_container", "_render_cache", "_index"))
+    # 子元素是否在渲染時才逐一產生(見'LazyChildren')，渲染引擎不會快取這類網頁元素
+    _is_streaming = False
+    # 子元素是否需要等待非同步的結果(見'AsyncFragment')
+    _is_async = False
+    # 分段輸出(見'HtmlRenderer.iter_chunks')時，是否在渲染該網頁元素前先送出已累積的文本(見'HtmlBody')
+    _flush_before = False
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        以'__slots__'的欄位建立序列化狀態，並略過'_transient_slots'。
+
+        由於不保存上級容器，序列化子樹時不會連帶序列化整棵網頁元素樹(例如傳遞給其他行程渲染時)。
+        """
+        state = dict()
+        for cls in type(self).__mro__:
+            for slot_name in cls.__dict__.get("__slots__", ()):
+                if slot_name in self._transient_slots:
+                    continue
+                if slot_name.startswith("__") and slot_name.endswith("__") == False:
+                    slot_name = f"_{cls.__name__.lstrip('_')}{slot_name}"
+                if hasattr(self, slot_name):
+                    state[slot_name] = getattr(self, slot_name)
+        return state
+    def __setstate__(self, state: dict[str, Any]):
+        """
+        還原'__getstate__'保存的欄位，並重新連結子元素的上級容器。
+        """
+        self._parent = None
+        self._render_cache = None
+        for slot_name, value in state.items():
+            object.__setattr__(self, slot_name, value)
+        if isinstance(self, Container):
+            self._parent_container = None
+            self._index = None
+            for element in self._element_list:
+                element._parent = self
     def _generate_attr_string(self):
         """
         由於此類別並未繼承'HtmlGlobalAttr'或'IndividualAttr'類別，故該方法僅設置'all_attr_string'為空字串。
@@ -42,11 +97,48 @@ class BaseElement(IBaseElement, Tag):
         """
         該方法為產生完整的網頁元素。
         """
-        if hasattr(self, "all_attr_string") == False:
+        self._refresh_pattern()
+        return "".join(self.element_pattern)
+    def _refresh_pattern(self):
+        """
+        僅在網頁元素有變更(或尚未產生)時，重新產生'all_attr_string'及'element_pattern'。
+        """
+        if self._dirty == True or hasattr(self, "element_pattern") == False:
             self._generate_attr_string()
-        if hasattr(self, "element_pattern") == False:
             self._generate_pattern()
-        return "".join(self.element_pattern)
+            self._render_cache = None
+            self._dirty = False
+    def _mark_dirty(self):
+        """
+        將該網頁元素及其所有上級容器標記為需要重新渲染。
+
+        若遇到已被標記的網頁元素則停止，因為其上級容器必定也已被標記。
+        """
+        element = self
+        while element != None and element._dirty == False:
+            element._dirty = True
+            element = element._parent
+    def render(self, sink: Any = None, depth: int = 0, renderer: HtmlRenderer | None = None) -> Any:
+        """
+        透過'HtmlRenderer'將網頁元素渲染至'sink'，若未提供'sink'則回傳完整的字串。
+
+        depth: 額外的縮排數量，預設視該網頁元素為最上層。
+
+        renderer: 指定渲染時使用的'HtmlRenderer'實例(例如'HtmlRenderer(use_cache=True)')。
+        """
+        if renderer == None:
+            renderer = HtmlRenderer()
+        return renderer.render(self, sink, depth)
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        """
+        不具有子元素的網頁元素，先寫入'depth + indent_tab'個'tab'，再寫入'element_pattern'其餘的字串。
+
+        'element_pattern'的第一個字串為'indent_tab'個'\\t'，故改由'tab'產生縮排，使壓縮輸出時不會有縮排。
+        """
+        self._refresh_pattern()
+        write(tab*(depth + self.indent_tab) + "".join(self.element_pattern[1:]))
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        pass
     
     @property
     def all_attr_string(self) -> str:
@@ -74,6 +166,8 @@ class BaseElement(IBaseElement, Tag):
     @indent_tab.setter
     def indent_tab(self, new_val: int):
         if isinstance(new_val, int):
+            if self._dirty == False:
+                self._mark_dirty()
             self.__indent_tab = new_val
         else:
             raise TypeError
@@ -95,20 +189,18 @@ class NormalElement(BaseElement, HtmlGlobalAttr, IndividualAttr, HtmlText):
 
     HtmlText ---> 使該類別具有'文字內容'可以設置且該文字內容可以被'TextModifier'修飾。
     """
+    __slots__ = ("_text",)
     def __init__(self, id_attr: str, text: str = "", indent_tab: int = 0, has_attrs: bool = True) -> None:
-        HtmlGlobalAttr.__init__(self, id_attr)
         BaseElement.__init__(self, indent_tab, has_attrs)
+        HtmlGlobalAttr.__init__(self, id_attr)
         HtmlText.__init__(self, text)
     def _generate_attr_string(self):
         """
         該方法會將對應之'全域'、'獨特'屬性轉化成字串並存於'self.__all_attr_string'。
+
+        屬性表已依照'先獨特、後全域'的順序排列，故只需走訪一次已設置的屬性。
         """
-        global_attr_string = self.generate_global_attr_string()
-        individual_attr_string = self.generate_individual_attr_string()
-        if individual_attr_string == "":
-            self.all_attr_string = global_attr_string
-        else:
-            self.all_attr_string = individual_attr_string + " " + global_attr_string
+        self.all_attr_string = self.generate_attr_string()
     def _generate_pattern(self):
         """
         該方法設置'element_pattern'為大部分網頁元素適用的格式。
@@ -119,8 +211,8 @@ class NormalElement(BaseElement, HtmlGlobalAttr, IndividualAttr, HtmlText):
         """
         self.element_pattern = [
             "\t"*self.indent_tab,
-            self._start_tag.replace("#AttrContent#", self.all_attr_string),
-            self.text,
+            self._generate_start_tag(self.all_attr_string),
+            self.escaped_text,
             self._end_tag
         ]
 
@@ -147,19 +239,17 @@ class ModifyElement(BaseElement, HtmlGlobalAttr, IndividualAttr, TextModifier):
 
     雖然無法設置其文字內容，但取而代之的是可以對繼承'HtmlText'類別的網頁元素類別的文字內容作修飾。
     """
+    __slots__ = ()
     def __init__(self, id_attr: str, indent_tab: int = 0) -> None:
-        HtmlGlobalAttr.__init__(self, id_attr)
         BaseElement.__init__(self, indent_tab, True)
+        HtmlGlobalAttr.__init__(self, id_attr)
     def _generate_attr_string(self):
         """
         該方法會將對應之'全域'、'獨特'屬性轉化成字串並存於'self.__all_attr_string'。
+
+        屬性表已依照'先獨特、後全域'的順序排列，故只需走訪一次已設置的屬性。
         """
-        global_attr_string = self.generate_global_attr_string()
-        individual_attr_string = self.generate_individual_attr_string()
-        if individual_attr_string == "":
-            self.all_attr_string = global_attr_string
-        else:
-            self.all_attr_string = individual_attr_string + " " + global_attr_string
+        self.all_attr_string = self.generate_attr_string()
     def _generate_pattern(self):
         """
         該方法設置'element_pattern'為少部分網頁元素適用的格式。
@@ -170,17 +260,20 @@ class ModifyElement(BaseElement, HtmlGlobalAttr, IndividualAttr, TextModifier):
         """
         self.element_pattern = [
             "\t"*self.indent_tab,
-            self._start_tag.replace("#AttrContent#", self.all_attr_string),
+            self._generate_start_tag(self.all_attr_string),
             self._end_tag
         ]
     def generate_modify_string(self, text: str) -> str:
+        """
+        以該網頁元素的標籤包住已跳脫的'text'，並回傳'Markup'，故修飾後的文字內容不會再被跳脫。
+        """
         self._generate_attr_string()
         modify_pattern = [
-            self._start_tag.replace("#AttrContent#", self.all_attr_string),
-            text,
+            self._generate_start_tag(self.all_attr_string),
+            HtmlEscaper.text(text),
             self._end_tag
         ]
-        return "".join(modify_pattern)
+        return Markup("".join(modify_pattern))
 
 
 class VoidElement(BaseElement, HtmlGlobalAttr, IndividualAttr):
@@ -197,19 +290,17 @@ class VoidElement(BaseElement, HtmlGlobalAttr, IndividualAttr):
 
     IndividualAttr ---> 使該類別具有網頁元素'獨特'屬性可以設置。
     """
+    __slots__ = ()
     def __init__(self, id_attr: str, indent_tab: int = 0, has_attrs: bool = True) -> None:
-        HtmlGlobalAttr.__init__(self, id_attr)
         BaseElement.__init__(self, indent_tab, has_attrs)
+        HtmlGlobalAttr.__init__(self, id_attr)
     def _generate_attr_string(self):
         """
         該方法會將對應之'全域'、'獨特'屬性轉化成字串並存於'self.__all_attr_string'。
+
+        屬性表已依照'先獨特、後全域'的順序排列，故只需走訪一次已設置的屬性。
         """
-        global_attr_string = self.generate_global_attr_string()
-        individual_attr_string = self.generate_individual_attr_string()
-        if individual_attr_string == "":
-            self.all_attr_string = global_attr_string
-        else:
-            self.all_attr_string = individual_attr_string + " " + global_attr_string
+        self.all_attr_string = self.generate_attr_string()
     def _generate_pattern(self):
         """
         該方法設置'element_pattern'為少部分網頁元素適用的格式。
@@ -220,22 +311,25 @@ class VoidElement(BaseElement, HtmlGlobalAttr, IndividualAttr):
         """
         self.element_pattern = [
             "\t"*self.indent_tab,
-            self._start_tag.replace("#AttrContent#", self.all_attr_string)
+            self._generate_start_tag(self.all_attr_string)
         ]
 
 
-class SectionElement(BaseElement, Container):
+class SectionElement(BaseElement, Container, Selectable):
     """
     BaseElement類別子類，該類別僅適用於'html'、'head'、'body'。
 
-    繼承自'BaseElement'、'Container'。
+    繼承自'BaseElement'、'Container'、'Selectable'。
 
     -------------------------------
 
     BaseElement ---> 已實作網頁元素的基本建構行為。
 
     Container ---> 使該類別可以包含其他類別。
+
+    Selectable ---> 使該類別可以透過CSS選擇器查詢其子孫。
     """
+    __slots__ = Container._container_slots
     def __init__(
             self, indent_tab: int = 0, 
             parent_container: Container | None = None) -> None:
@@ -268,15 +362,22 @@ class SectionElement(BaseElement, Container):
                 "\t"*self.indent_tab + self._end_tag
             ]
     def build(self) -> str:
-        self._generate_pattern()
-        return "\n".join(self.element_pattern)
-
-
-class ContainerElement(BaseElement, Container, HtmlGlobalAttr, IndividualAttr):
+        return self.render()
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        if len(self._element_list) == 0:
+            write(tab*(depth + self.indent_tab) + self._start_tag + self._end_tag)
+            return None
+        write(tab*(depth + self.indent_tab) + self._start_tag + newline)
+        return self._element_list
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        write(newline + tab*(depth + self.indent_tab) + self._end_tag)
+
+
+class ContainerElement(BaseElement, Container, Selectable, HtmlGlobalAttr, IndividualAttr):
     """
     BaseElement類別子類，容器類型的網頁元素(div...)可以繼承此類。
 
-    繼承自'BaseElement'、'Container'、'HtmlGlobalAttr'、'IndividualAttr'。
+    繼承自'BaseElement'、'Container'、'Selectable'、'HtmlGlobalAttr'、'IndividualAttr'。
 
     -------------------------------
 
@@ -284,10 +385,13 @@ class ContainerElement(BaseElement, Container, HtmlGlobalAttr, IndividualAttr):
 
     Container ---> 使該類別可以包含其他類別。
 
+    Selectable ---> 使該類別可以透過CSS選擇器查詢其子孫。
+
     HtmlGlobalAttr ---> 使該類別具有網頁元素'全域'屬性可以設置。
 
     IndividualAttr ---> 使該類別具有網頁元素'獨特'屬性可以設置。
     """
+    __slots__ = Container._container_slots
     def __init__(
             self, id_attr: str, indent_tab: int = 0, 
             parent_container: Container | None = None) -> None:
@@ -299,13 +403,10 @@ class ContainerElement(BaseElement, Container, HtmlGlobalAttr, IndividualAttr):
     def _generate_attr_string(self):
         """
         該方法會將對應之'全域'、'獨特'屬性轉化成字串並存於'self.__all_attr_string'。
+
+        屬性表已依照'先獨特、後全域'的順序排列，故只需走訪一次已設置的屬性。
         """
-        global_attr_string = self.generate_global_attr_string()
-        individual_attr_string = self.generate_individual_attr_string()
-        if individual_attr_string == "":
-            self.all_attr_string = global_attr_string
-        else:
-            self.all_attr_string = individual_attr_string + " " + global_attr_string
+        self.all_attr_string = self.generate_attr_string()
     def _generate_pattern(self):
         """
         該方法設置'element_pattern'為容器類型的網頁元素適用的格式。
@@ -319,21 +420,25 @@ class ContainerElement(BaseElement, Container, HtmlGlobalAttr, IndividualAttr):
         </tag>
         """
         self.element_pattern = [
-            "\t"*self.indent_tab + self._start_tag.replace("#AttrContent#", self.all_attr_string),
+            "\t"*self.indent_tab + self._generate_start_tag(self.all_attr_string),
             self.container_content,
             "\t"*self.indent_tab + self._end_tag
         ]
     def build(self) -> str:
+        return self.render()
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
         self._generate_attr_string()
-        self._generate_pattern()
-        return "\n".join(self.element_pattern)
+        write(tab*(depth + self.indent_tab) + self._generate_start_tag(self.all_attr_string) + newline)
+        return self._element_list
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        write(newline + tab*(depth + self.indent_tab) + self._end_tag)
 
 
-class ContainerTextElement(BaseElement, Container, HtmlGlobalAttr, IndividualAttr, HtmlText):
+class ContainerTextElement(BaseElement, Container, Selectable, HtmlGlobalAttr, IndividualAttr, HtmlText):
     """
     BaseElement類別子類，目前專為'paragraph'開設的類別，未來可能會做調整。
 
-    繼承自'BaseElement'、'Container'、'HtmlGlobalAttr'、'IndividualAttr'、'HtmlText'。
+    繼承自'BaseElement'、'Container'、'Selectable'、'HtmlGlobalAttr'、'IndividualAttr'、'HtmlText'。
 
     -------------------------------
 
@@ -341,31 +446,31 @@ class ContainerTextElement(BaseElement, Container, HtmlGlobalAttr, IndividualAtt
 
     Container ---> 使該類別可以包含其他類別。
 
+    Selectable ---> 使該類別可以透過CSS選擇器查詢其子孫。
+
     HtmlGlobalAttr ---> 使該類別具有網頁元素'全域'屬性可以設置。
 
     IndividualAttr ---> 使該類別具有網頁元素'獨特'屬性可以設置。
 
     HtmlText ---> 使該類別具有'文字內容'可以設置且該文字內容可以被'TextModifier'修飾。
     """
+    __slots__ = Container._container_slots + ("_text",)
     def __init__(
             self, id_attr: str, text: str = "",
             indent_tab: int = 0, parent_container: Container | None = None) -> None:
-        HtmlGlobalAttr.__init__(self, id_attr)
         BaseElement.__init__(self, indent_tab, True)
         Container.__init__(self, parent_container)
+        HtmlGlobalAttr.__init__(self, id_attr)
         HtmlText.__init__(self, text)
         # 以下的陳述式是微調縮排：
         self._adjust_tab += self.indent_tab
     def _generate_attr_string(self):
         """
         該方法會將對應之'全域'、'獨特'屬性轉化成字串並存於'self.__all_attr_string'。
+
+        屬性表已依照'先獨特、後全域'的順序排列，故只需走訪一次已設置的屬性。
         """
-        global_attr_string = self.generate_global_attr_string()
-        individual_attr_string = self.generate_individual_attr_string()
-        if individual_attr_string == "":
-            self.all_attr_string = global_attr_string
-        else:
-            self.all_attr_string = individual_attr_string + " " + global_attr_string
+        self.all_attr_string = self.generate_attr_string()
     def _generate_pattern(self):
         """
         該方法設置'element_pattern'為容器類型的網頁元素適用的格式。
@@ -378,22 +483,30 @@ class ContainerTextElement(BaseElement, Container, HtmlGlobalAttr, IndividualAtt
         
         </tag>
         """
-        if hasattr(self, "container_content") == False:
+        if len(self._element_list) == 0:
             self.element_pattern = [
-                "\t"*self.indent_tab + self._start_tag.replace("#AttrContent#", self.all_attr_string),
-                self.text,
+                "\t"*self.indent_tab + self._generate_start_tag(self.all_attr_string),
+                self.escaped_text,
                 self._end_tag
             ]
         else:
             self.element_pattern = [
-                "\t"*self.indent_tab + self._start_tag.replace("#AttrContent#", self.all_attr_string),
+                "\t"*self.indent_tab + self._generate_start_tag(self.all_attr_string),
                 self.container_content,
                 "\t"*self.indent_tab + self._end_tag
             ]
     def build(self) -> str:
+        return self.render()
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        """
+        不具有子元素時，與'NormalElement'相同，僅輸出文字內容。
+        """
         self._generate_attr_string()
-        self._generate_pattern()
-        if hasattr(self, "container_content") == False:
-            return "".join(self.element_pattern)
-        else:
-            return "\n".join(self.element_pattern)
\ No newline at end of file
+        start_tag = tab*(depth + self.indent_tab) + self._generate_start_tag(self.all_attr_string)
+        if len(self._element_list) == 0:
+            write(start_tag + self.escaped_text + self._end_tag)
+            return None
+        write(start_tag + newline)
+        return self._element_list
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        write(newline + tab*(depth + self.indent_tab) + self._end_tag)
\ No newline at end of file
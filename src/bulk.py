@@ -0,0 +1,386 @@
+from __future__ import annotations
+from itertools import chain, count, islice
+from typing import Any, Callable, Iterable, Sequence
+from .Element import *
+
+##### 大量資料 #####
+
+# 轉換成字串後不會含有需要跳脫的字元的型別
+_numeric_types = frozenset((int, float, bool))
+
+class _CellAttr(HtmlGlobalAttr):
+    """
+    同一欄(或所有清單項目)共用的'全域'屬性，只用於產生一次屬性字串，不會成為網頁元素。
+    """
+    __slots__ = ("_attr_table", "_parent")
+    # 不會被渲染引擎快取，故永遠視為需要重新渲染
+    _dirty = True
+    def __init__(self, attr_dict: dict[str, Any]) -> None:
+        self._attr_table: tuple = ()
+        self._parent = None
+        self.set_global_attr(attr_dict)
+    def _mark_dirty(self):
+        pass
+
+
+class BulkElement(BaseElement, HtmlGlobalAttr, IndividualAttr):
+    """
+    BaseElement類別子類，以整欄(或整個可迭代物件)的資料直接渲染大量的列，不會為每個儲存格建立網頁元素。
+
+    繼承自'BaseElement'、'HtmlGlobalAttr'、'IndividualAttr'。
+
+    -------------------------------
+
+    每一列的字串由預先產生的格式字串填入資料而成，渲染時每'batch_size'列寫入一次輸出目標。
+
+    資料可以是'list'、'tuple'、'array.array'或'numpy.ndarray'(具有'tolist'方法的序列會在渲染時先轉換成'list')。
+
+    備註：
+
+    '_content_key'會在資料被重新設置時改變，'SubtreeCache'及'TreeDiff'以此區分屬性相同但資料不同的網頁元素；
+
+    直接修改傳入的序列(而非重新設置)時，需自行呼叫'content_changed'(只呼叫'_mark_dirty'無法更新'_content_key')。
+
+    若資料為迭代器(例如產生器)，則只能渲染一次。
+    """
+    __slots__ = ("_content_key",)
+    _content_serial = count()
+    batch_size = 1024
+    def __init__(self, id_attr: str, indent_tab: int = 0) -> None:
+        BaseElement.__init__(self, indent_tab, True)
+        HtmlGlobalAttr.__init__(self, id_attr)
+        self._content_key = next(self._content_serial)
+    def _generate_attr_string(self):
+        self.all_attr_string = self.generate_attr_string()
+    def _generate_pattern(self):
+        """
+        資料列是在'_render_open'時直接寫入輸出目標，故'element_pattern'僅包含開始及結束標籤。
+        """
+        self.element_pattern = [
+            "\t"*self.indent_tab,
+            self._generate_start_tag(self.all_attr_string),
+            self._end_tag
+        ]
+    def build(self) -> str:
+        return self.render()
+    def content_changed(self):
+        """
+        通知資料已被直接修改(例如'table.columns[0][3] = 5'、'items.append(...)')，使渲染引擎的快取及'TreeDiff'得知資料已變更。
+
+        重新設置資料(例如'table.columns = ...')時會自動呼叫，不需要另外呼叫。
+        """
+        self._content_key = next(self._content_serial)
+        self._mark_dirty()
+        return self
+    @staticmethod
+    def _as_list(values: Iterable) -> Iterable:
+        tolist = getattr(values, "tolist", None)
+        return tolist() if callable(tolist) else values
+    @staticmethod
+    def _cell_tag(tag_symbol: str, attr_dict: dict[str, Any] | None) -> str:
+        """
+        產生共用的開始標籤，並跳脫格式字串使用的大括號。
+        """
+        if attr_dict == None or len(attr_dict) == 0:
+            return f"<{tag_symbol}>"
+        return f"<{tag_symbol} {_CellAttr(attr_dict).generate_attr_string()}>".replace("{", "{{").replace("}", "}}")
+    @staticmethod
+    def _escape_column(column: Sequence) -> Sequence:
+        """
+        跳脫整欄的字串值：先將整欄串接成一個字串檢查是否含有特殊字元，不含時(大部分的情況)直接回傳原本的序列。
+
+        數值不含特殊字元，會保留原本的型別交給'format'轉換。
+        """
+        escape = HtmlEscaper.text
+        try:
+            joined = "".join(column)
+        except TypeError:
+            if set(map(type, column)) <= _numeric_types:
+                return column
+            return [value if type(value) in _numeric_types else escape(value) for value in column]
+        if "&" not in joined and "<" not in joined and ">" not in joined:
+            return column
+        return [escape(value) for value in column]
+    def _write_rows(self, write, row_template: str, rows: Iterable[Sequence], is_escaped: bool = False):
+        """
+        以'row_template.format(*row)'產生每一列，並每'batch_size'列寫入一次。
+
+        is_escaped: 資料是否已經過'_escape_column'跳脫；否則會逐一以'HtmlEscaper.text'跳脫每一列的字串值。
+        """
+        row_format = row_template.format
+        escape = HtmlEscaper.text
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if len(batch) == 0:
+                break
+            if is_escaped == True:
+                write("".join([row_format(*row) for row in batch]))
+                continue
+            write("".join([
+                row_format(*[value if type(value) in _numeric_types else escape(value) for value in row])
+                for row in batch
+            ]))
+
+
+class HtmlBulkTable(BulkElement):
+    """
+    Html的'table'元素，以欄位資料(columns)或列的可迭代物件(rows)建立。
+
+    example:
+
+    body.attach(HtmlBulkTable("orders", columns={"id": ids, "total": totals}, column_attrs=[None, {"class_attr": "num"}]))
+
+    body.attach(HtmlBulkTable("orders", rows=cursor, headers=("id", "total")))
+    """
+    _tag_symbol = "table"
+    __slots__ = ("_columns", "_rows", "_headers", "_cell_tags")
+    def __init__(
+            self, id_attr: str, columns: Sequence[Sequence] | dict[str, Sequence] | None = None,
+            rows: Iterable[Sequence] | None = None, headers: Sequence[str] | None = None,
+            column_attrs: Sequence[dict[str, Any] | None] | None = None, indent_tab: int = 0) -> None:
+        """
+        Html的'table'元素。
+
+        id_attr: 該元素的'id'。
+
+        columns: 每一欄的資料；若為'dict'，則以其鍵值作為未指定的'headers'。
+
+        rows: 每一列的資料(可迭代物件)，與'columns'只能擇一設置。
+
+        headers: 表頭的文字，不設置則不產生'thead'。
+
+        column_attrs: 每一欄的儲存格('td')共用的'全域'屬性(例如'{"class_attr": "num"}')，會在此時產生一次屬性字串。
+
+        indent_tab: 該元素在轉換成字串時，需要縮排'多少'個tab。
+        """
+        BulkElement.__init__(self, id_attr, indent_tab)
+        if isinstance(columns, dict):
+            if headers == None:
+                headers = list(columns.keys())
+            columns = list(columns.values())
+        # 'numpy.ndarray'不能以'=='與'None'比較
+        if (columns is None) == (rows is None):
+            raise ValueError("'columns'與'rows'需設置其中一個")
+        self._headers = tuple(headers) if headers != None else None
+        self._columns = None
+        self._rows = None
+        if columns is not None:
+            self.columns = columns
+        else:
+            self.rows = rows
+        self.column_attrs = column_attrs
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        """
+        依序寫入'table'、'thead'、'tbody'，每一列以預先產生的格式字串填入資料。
+        """
+        self._generate_attr_string()
+        indent = tab*(depth + self.indent_tab)
+        write(indent + self._generate_start_tag(self.all_attr_string))
+        if self._headers != None:
+            header_cells = "".join([f"<th>{HtmlEscaper.text(header)}</th>" for header in self._headers])
+            write(newline + indent + tab + "<thead>" + newline + indent + tab*2 + "<tr>" + header_cells + "</tr>"
+                  + newline + indent + tab + "</thead>")
+        if self._columns != None:
+            columns = [self._escape_column(self._as_list(column)) for column in self._columns]
+            column_count = len(columns)
+            rows = zip(*columns)
+        else:
+            # 以第一列的長度決定欄位數量
+            rows = iter(self._rows)
+            first_row = next(rows, None)
+            column_count = len(first_row) if first_row is not None else 0
+            rows = chain((first_row,), rows) if first_row is not None else ()
+        write(newline + indent + tab + "<tbody>")
+        self._write_rows(
+            write, self._row_template(column_count, newline + indent + tab*2), rows, self._columns != None)
+        write(newline + indent + tab + "</tbody>" + newline + indent + self._end_tag)
+    def _row_template(self, column_count: int, prefix: str) -> str:
+        """
+        產生一列的格式字串，未設置'column_attrs'的欄位使用'<td>'。
+        """
+        cell_tags = self._cell_tags
+        cells = list()
+        for index in range(column_count):
+            cell_tag = cell_tags[index] if index < len(cell_tags) and cell_tags[index] != None else "<td>"
+            cells.append(cell_tag + "{" + str(index) + "}</td>")
+        return prefix + "<tr>" + "".join(cells) + "</tr>"
+
+    @property
+    def columns(self) -> list[Sequence] | None:
+        return self._columns
+    @columns.setter
+    def columns(self, new_val: Sequence[Sequence]):
+        new_val = list(new_val)
+        lengths = set([len(column) for column in new_val])
+        if len(lengths) > 1:
+            raise ValueError("每一欄的資料數量需相同")
+        self._columns = new_val
+        self._rows = None
+        self.content_changed()
+
+    @property
+    def rows(self) -> Iterable[Sequence] | None:
+        return self._rows
+    @rows.setter
+    def rows(self, new_val: Iterable[Sequence]):
+        self._rows = new_val
+        self._columns = None
+        self.content_changed()
+
+    @property
+    def column_attrs(self) -> tuple[str | None, ...]:
+        """
+        每一欄儲存格的開始標籤(已跳脫大括號)，設置時接受'全域'屬性的'dict'。
+        """
+        return self._cell_tags
+    @column_attrs.setter
+    def column_attrs(self, new_val: Sequence[dict[str, Any] | None] | None):
+        if new_val == None:
+            new_val = ()
+        self._cell_tags = tuple([self._cell_tag("td", attr_dict) for attr_dict in new_val])
+        self.content_changed()
+
+
+class HtmlBulkList(BulkElement):
+    """
+    Html的'ul'元素，以可迭代物件的每個值產生一個'li'。
+
+    example:
+
+    body.attach(HtmlBulkList("names", names, item_attrs={"class_attr": "name"}))
+    """
+    _tag_symbol = "ul"
+    __slots__ = ("_items", "_item_tag")
+    def __init__(
+            self, id_attr: str, items: Iterable, item_attrs: dict[str, Any] | None = None,
+            indent_tab: int = 0) -> None:
+        """
+        Html的'ul'元素。
+
+        id_attr: 該元素的'id'。
+
+        items: 清單項目的資料。
+
+        item_attrs: 所有清單項目('li')共用的'全域'屬性。
+
+        indent_tab: 該元素在轉換成字串時，需要縮排'多少'個tab。
+        """
+        BulkElement.__init__(self, id_attr, indent_tab)
+        self.items = items
+        self.item_attrs = item_attrs
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        self._generate_attr_string()
+        indent = tab*(depth + self.indent_tab)
+        write(indent + self._generate_start_tag(self.all_attr_string))
+        row_template = newline + indent + tab + self._item_tag + "{}</li>"
+        items = self._as_list(self._items)
+        if hasattr(items, "__len__"):
+            self._write_rows(write, row_template, zip(self._escape_column(items)), True)
+        else:
+            self._write_rows(write, row_template, zip(items))
+        write(newline + indent + self._end_tag)
+
+    @property
+    def items(self) -> Iterable:
+        return self._items
+    @items.setter
+    def items(self, new_val: Iterable):
+        self._items = new_val
+        self.content_changed()
+
+    @property
+    def item_attrs(self) -> str:
+        """
+        清單項目的開始標籤(已跳脫大括號)，設置時接受'全域'屬性的'dict'。
+        """
+        return self._item_tag
+    @item_attrs.setter
+    def item_attrs(self, new_val: dict[str, Any] | None):
+        self._item_tag = self._cell_tag("li", new_val)
+        self.content_changed()
+
+
+class HtmlBulkOrderedList(HtmlBulkList):
+    """
+    Html的'ol'元素，用法與'HtmlBulkList'相同。
+    """
+    _tag_symbol = "ol"
+    __slots__ = ()
+
+
+class LazyChildren(BaseElement):
+    """
+    BaseElement類別子類，在渲染時才從可迭代物件逐一產生子元素，可以附加於任何'Container'。
+
+    繼承自'BaseElement'。
+
+    -------------------------------
+
+    每個子元素只在輪到它渲染時建立，渲染完成後即被丟棄，故記憶體用量與子元素的數量無關(例如逐行讀取數GB的記錄檔)。
+
+    可迭代物件的值可以是：
+
+    網頁元素 ---> 直接渲染。
+
+    字串、'(文字內容, 屬性)' ---> 以'element_type'建立網頁元素，'屬性'為'全域'或'獨特'屬性的'dict'。
+
+    example:
+
+    body.attach(LazyChildren(lambda: ((line, {"class_attr": "log"}) for line in open("app.log"))))
+
+    備註：
+
+    子元素與該網頁元素位於相同的縮排層級，該網頁元素本身不會輸出任何標籤。
+
+    子元素不會加入'_element_list'，故不會被'ElementIndex'、'select'或'TreeDiff'走訪，也不會被渲染引擎快取。
+
+    若'source'為迭代器(例如產生器)，則只能渲染一次；需要重複渲染時，請傳入回傳可迭代物件的函式。
+
+    'ParallelRenderer'的子行程無法共用同一個迭代器，故不支援平行渲染。
+    """
+    __slots__ = ("_source", "_element_type", "_content_key", "_adjust_tab")
+    _is_streaming = True
+    def __init__(
+            self, source: Iterable | Callable[[], Iterable],
+            element_type: Callable[[str, str], IBaseElement] = HtmlParagraph, indent_tab: int = 0) -> None:
+        """
+        source: 子元素的可迭代物件，或每次渲染時呼叫以取得可迭代物件的函式。
+
+        element_type: 以'element_type("", 文字內容)'建立網頁元素的類別，預設為'HtmlParagraph'。
+
+        indent_tab: 子元素在轉換成字串時，需要額外縮排'多少'個tab。
+        """
+        BaseElement.__init__(self, indent_tab, False)
+        self._source = source
+        self._element_type = element_type
+        self._content_key = next(BulkElement._content_serial)
+        self._adjust_tab = indent_tab
+    def _generate_pattern(self):
+        self.element_pattern = ["\t"*self.indent_tab]
+    def build(self) -> str:
+        return self.render()
+    def _render_open(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        # 子元素的深度為該網頁元素的深度加上'indent_tab'
+        self._adjust_tab = self.indent_tab
+        source = self._source
+        if callable(source):
+            source = source()
+        return self._generate_children(source)
+    def _render_close(self, write, depth: int, tab: str = "\t", newline: str = "\n"):
+        pass
+    def _generate_children(self, source: Iterable):
+        element_type = self._element_type
+        for item in source:
+            if isinstance(item, IBaseElement) == False:
+                text, attrs = (item, None) if isinstance(item, str) else item
+                item = element_type("", text)
+                # 不保留建立時所需的空白'id'
+                item._set_attr_value("id_attr", None)
+                if attrs != None:
+                    for attr_name, new_val in attrs.items():
+                        if attr_name in item._global_attr_set:
+                            item.set_global_attr({attr_name: new_val})
+                        else:
+                            item.set_individual_attr({attr_name: new_val})
+            yield item
@@ -0,0 +1,189 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Any
+import html
+import json
+from .base import *
+
+##### 差異比對 #####
+
+class TreeDiff:
+    """
+    比較同一份網頁的兩個版本(兩棵網頁元素樹)，產生將舊版本轉換成新版本的最小操作列表。
+
+    子元素優先以'id'配對，不具有'id'的子元素則依照標籤名稱及出現的順序配對；
+
+    結構編號(見'StructureTable')相同的子樹視為未變更，不會再往下比對，故大部分未變更的網頁只需線性的時間。
+
+    產生的操作皆為可以直接轉換成JSON的'dict'，'path'為由最上層網頁元素開始的子元素索引列表：
+
+    {"op": "remove", "path": [...]} ---> 移除該位置的網頁元素。
+
+    {"op": "insert", "path": [...], "html": "..."} ---> 插入網頁元素，使其位於該位置。
+
+    {"op": "replace", "path": [...], "html": "..."} ---> 以新的網頁元素取代該位置的網頁元素。
+
+    {"op": "set_attr", "path": [...], "name": "...", "value": "..." | None} ---> 設置屬性(未跳脫的值)，'None'表示移除該屬性。
+
+    {"op": "set_text", "path": [...], "text": "..."} ---> 設置文字內容，其值為已跳脫的Html(可能含有'text_modify'產生的標籤)。
+
+    資料不同的'BulkElement'(見'_content_key')，以及在文字內容與子元素之間切換的網頁元素(例如'p')，會以'replace'整個網頁元素處理。
+
+    操作需依序套用：上級容器的'remove'(由後往前)及'insert'(由前往後)會先於其子孫的操作，
+
+    故'path'皆以套用前面的操作後的樹為準。
+
+    example:
+
+    patch = TreeDiff().compare(old_doc, new_doc)
+
+    socket.sendall(TreeDiff.to_json(patch).encode())
+    """
+    def __init__(self, renderer: HtmlRenderer | None = None) -> None:
+        """
+        renderer: 產生'insert'、'replace'的網頁字串時使用的'HtmlRenderer'實例，預設為壓縮輸出。
+        """
+        if renderer == None:
+            renderer = HtmlRenderer(minify=True)
+        self.renderer = renderer
+    def compare(self, old: IBaseElement, new: IBaseElement) -> list[dict[str, Any]]:
+        """
+        回傳將'old'轉換成'new'的操作列表，兩者相同時回傳空列表。
+        """
+        # 兩棵樹共用同一個不會淘汰的結構編號表，結構編號相同表示子樹完全相同
+        structures = StructureTable()
+        old_ids = structures.structure_ids(old)
+        new_ids = structures.structure_ids(new)
+        patch: list[dict[str, Any]] = list()
+        stack: list[tuple[IBaseElement, IBaseElement, list[int]]] = [(old, new, [])]
+        while len(stack) > 0:
+            old_node, new_node, path = stack.pop()
+            old_id = old_ids[id(old_node)]
+            if old_id >= 0 and old_id == new_ids[id(new_node)]:
+                continue
+            if (type(old_node) is not type(new_node) or old_node._start_prefix != new_node._start_prefix
+                    or getattr(old_node, "_content_key", None) != getattr(new_node, "_content_key", None)):
+                patch.append({"op": "replace", "path": path, "html": self.renderer.render(new_node)})
+                continue
+            old_children = getattr(old_node, "_element_list", ())
+            new_children = getattr(new_node, "_element_list", ())
+            if isinstance(new_node, HtmlText) and (len(old_children) == 0) != (len(new_children) == 0):
+                # 具有文字內容的容器(例如'p')只有在沒有子元素時才輸出文字內容，在兩種內容之間切換時取代整個網頁元素
+                patch.append({"op": "replace", "path": path, "html": self.renderer.render(new_node)})
+                continue
+            self._compare_attrs(old_node, new_node, path, patch)
+            if len(old_children) == 0 and len(new_children) == 0:
+                old_text = getattr(old_node, "_text", None)
+                new_text = getattr(new_node, "_text", None)
+                if old_text != new_text or type(old_text) is not type(new_text):
+                    patch.append({"op": "set_text", "path": path, "text": new_node.escaped_text})
+                continue
+            pairs = self._match_children(old_children, new_children)
+            kept_old = set([old_index for old_index, _ in pairs])
+            kept_new = set([new_index for _, new_index in pairs])
+            for old_index in range(len(old_children) - 1, -1, -1):
+                if old_index not in kept_old:
+                    patch.append({"op": "remove", "path": path + [old_index]})
+            for new_index, child in enumerate(new_children):
+                if new_index not in kept_new:
+                    patch.append({"op": "insert", "path": path + [new_index], "html": self.renderer.render(child)})
+            # 反向加入堆疊，使子元素的操作依照文件順序產生
+            for old_index, new_index in reversed(pairs):
+                stack.append((old_children[old_index], new_children[new_index], path + [new_index]))
+        return patch
+    # 值為屬性名稱本身且輸出時不帶值的布林屬性(例如'hidden')
+    _boolean_attrs = frozenset(("hidden", "inert", "popover"))
+    @classmethod
+    def html_attributes(cls, element: IBaseElement) -> dict[str, str]:
+        """
+        將網頁元素已設置的屬性轉換成'Html屬性名稱 ---> 屬性值'，布林屬性(例如'hidden')的值為空字串。
+
+        直接由屬性表及'CssSelector._html_attr_names'產生，不解析屬性的'getter'輸出(部分屬性輸出時不含屬性名稱，例如'HtmlInput.value')；
+
+        'Markup'的值會原樣輸出，故還原其跳脫字元以對應瀏覽器中的屬性值。
+        """
+        attributes = dict()
+        attr_table = element._attr_table
+        html_attr_names = CssSelector._html_attr_names
+        for index in range(0, len(attr_table), 2):
+            attr_name = attr_table[index]
+            value = attr_table[index + 1]
+            if attr_name == "data":
+                attr_name, value = "data-" + value[0], value[1]
+            elif attr_name in cls._boolean_attrs:
+                attributes[attr_name] = ""
+                continue
+            elif isinstance(value, bool):
+                value = str(value).lower()
+            else:
+                attr_name = html_attr_names.get(attr_name, attr_name)
+            if isinstance(value, Markup):
+                value = html.unescape(value)
+            attributes[attr_name] = str(value)
+        return attributes
+    def _compare_attrs(self, old: IBaseElement, new: IBaseElement, path: list[int], patch: list[dict[str, Any]]):
+        # 'str'與'Markup'的值相等但輸出不同(只有前者會被跳脫)，故也需比較型別
+        if old._attr_table == new._attr_table and tuple(map(type, old._attr_table)) == tuple(map(type, new._attr_table)):
+            return
+        old_attrs = self.html_attributes(old)
+        new_attrs = self.html_attributes(new)
+        for html_name in old_attrs:
+            if html_name not in new_attrs:
+                patch.append({"op": "set_attr", "path": path, "name": html_name, "value": None})
+        for html_name, value in new_attrs.items():
+            if old_attrs.get(html_name) != value:
+                patch.append({"op": "set_attr", "path": path, "name": html_name, "value": value})
+    @staticmethod
+    def _child_keys(children: list[IBaseElement]) -> list[tuple]:
+        """
+        產生每個子元素的配對鍵值：具有'id'時為'("#", id, 出現次數)'，否則為'(標籤名稱, 出現次數)'。
+        """
+        keys = list()
+        counts: dict[tuple, int] = dict()
+        for child in children:
+            id_value = ElementIndex.attr_value(child, "id_attr")
+            base_key = ("#", id_value) if id_value != None else (ElementIndex.tag_name(child),)
+            count = counts.get(base_key, 0)
+            counts[base_key] = count + 1
+            keys.append(base_key + (count,))
+        return keys
+    def _match_children(self, old_children: list[IBaseElement], new_children: list[IBaseElement]) -> list[tuple[int, int]]:
+        """
+        以鍵值配對新舊子元素，並保留順序不變的最大配對集合(最長遞增子序列，O(n log n))。
+
+        回傳依照順序排列的'(舊索引, 新索引)'；順序改變的子元素會以'remove'及'insert'處理。
+        """
+        old_positions = dict()
+        for old_index, key in enumerate(self._child_keys(old_children)):
+            old_positions[key] = old_index
+        candidates = list()
+        for new_index, key in enumerate(self._child_keys(new_children)):
+            old_index = old_positions.get(key)
+            if old_index != None:
+                candidates.append((old_index, new_index))
+        # 'tails[k]'為長度'k + 1'的遞增子序列的最小結尾(舊索引)，'tail_positions'為其在'candidates'的位置
+        tails: list[int] = list()
+        tail_positions: list[int] = list()
+        previous: list[int] = list()
+        for position, (old_index, _) in enumerate(candidates):
+            length = bisect_left(tails, old_index)
+            if length == len(tails):
+                tails.append(old_index)
+                tail_positions.append(position)
+            else:
+                tails[length] = old_index
+                tail_positions[length] = position
+            previous.append(tail_positions[length - 1] if length > 0 else -1)
+        pairs = list()
+        position = tail_positions[-1] if len(tail_positions) > 0 else -1
+        while position != -1:
+            pairs.append(candidates[position])
+            position = previous[position]
+        pairs.reverse()
+        return pairs
+    @staticmethod
+    def to_json(patch: list[dict[str, Any]]) -> str:
+        """
+        將操作列表轉換成精簡的JSON字串。
+        """
+        return json.dumps(patch, ensure_ascii=False, separators=(",", ":"))
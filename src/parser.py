@@ -0,0 +1,235 @@
+from __future__ import annotations
+from typing import Any, Callable
+import html
+import re
+from .Element import *
+
+##### 網頁解析 #####
+
+class HtmlParser:
+    """
+    將網頁文本解析回網頁元素樹(例如'HtmlDocument'、'HtmlDivision'、'HtmlParagraph'、'HtmlForm'、'HtmlInput')，並還原其'全域'及'獨特'屬性。
+
+    以單一的正規表示式逐一比對標籤及文字(不經過'html.parser')，可以透過'feed'分段輸入文本(可以在任意位置切分)，最後呼叫'close'取得結果：
+
+    parser = HtmlParser()
+
+    for chunk in chunks:
+
+        parser.feed(chunk)
+
+    doc = parser.close()
+
+    備註：
+
+    '文字內容'網頁元素('p'、'h1'~'h6')中的其他標籤(例如以'text_modify'產生的'span')會原封不動地保留在文字內容裡，
+
+    容器中的'span'則會建立'HtmlSpan'。僅由空白字元組成且含有換行的文字視為排版用的縮排，會被忽略。
+
+    文字內容以'Markup'保存原文，屬性值則會還原跳脫字元，故重新渲染時不會重複跳脫。
+
+    不支援的標籤或屬性、無法對應的結束標籤會拋出'ValueError'。
+    """
+    _token_pattern = re.compile(r"""
+        (?P<text>[^<]+) |
+        (?P<comment><!--.*?-->) |
+        (?P<declaration><![^>]*>) |
+        </(?P<end>[A-Za-z][\w-]*)\s*> |
+        <(?P<start>[A-Za-z][\w-]*)(?P<attrs>(?:[^>"']|"[^"]*"|'[^']*')*)>
+    """, re.VERBOSE | re.DOTALL)
+    _attr_pattern = re.compile(r"""
+        ([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?
+    """, re.VERBOSE)
+    # 標籤名稱 ---> 建立網頁元素的函式(不帶任何屬性，屬性於解析後再還原)
+    element_factories: dict[str, Callable[[], IBaseElement]] = {
+        "html": HtmlDocument,
+        "head": HtmlHead,
+        "body": HtmlBody,
+        "div": lambda: HtmlDivision(""),
+        "p": lambda: HtmlParagraph(""),
+        "form": lambda: HtmlForm(""),
+        "input": lambda: HtmlInput(""),
+        "span": lambda: HtmlSpan(""),
+        **{f"h{number}": (lambda number=number: HtmlHeading("", "", number)) for number in range(7)}
+    }
+    # 文字內容中的修飾用標籤，不會建立網頁元素
+    _inline_tags = frozenset(("span",))
+    _void_tags = frozenset((
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"
+    ))
+    # 與屬性表名稱相同的Html屬性不需要列出
+    _attr_names = {html_name: attr_name for attr_name, html_name in CssSelector._html_attr_names.items()}
+    _bool_attrs = frozenset(("contenteditable", "spellcheck"))
+    _flag_attrs = frozenset(("hidden", "inert", "popover"))
+    def __init__(self) -> None:
+        self._buffer = ""
+        # 每個開啟中的網頁元素為'[網頁元素, 標籤名稱, 文字片段列表 | None, 文字內容中尚未結束的標籤]'
+        self._stack: list[list[Any]] = list()
+        self.roots: list[IBaseElement] = list()
+        self._is_closed = False
+    def feed(self, data: str):
+        """
+        輸入一段文本，已完整的標籤及文字會立即轉換成網頁元素，不完整的部分會保留到下一次輸入。
+        """
+        if self._is_closed == True:
+            raise ValueError("已呼叫'close'的HtmlParser無法再輸入文本")
+        if isinstance(data, str) == False:
+            raise TypeError
+        self._buffer += data
+        self._parse(False)
+        return self
+    def close(self) -> IBaseElement:
+        """
+        處理剩餘的文本並回傳最上層的網頁元素；若不是恰好一個最上層網頁元素，則拋出'ValueError'(可改由'roots'取得)。
+        """
+        if self._is_closed == False:
+            self._parse(True)
+            self._is_closed = True
+            if len(self._stack) > 0:
+                raise ValueError(f"標籤'{self._stack[-1][1]}'沒有對應的結束標籤")
+        if len(self.roots) != 1:
+            raise ValueError(f"解析結果有{len(self.roots)}個最上層網頁元素")
+        return self.roots[0]
+    def _parse(self, is_final: bool):
+        buffer = self._buffer
+        match = self._token_pattern.match
+        position = 0
+        length = len(buffer)
+        while position < length:
+            # 尚未結束的註解可能含有'>'，會被誤認為完整的宣告，故留待下一次輸入
+            if is_final == False and buffer.startswith("<!--", position) and buffer.find("-->", position + 4) == -1:
+                break
+            token = match(buffer, position)
+            if token == None:
+                if is_final == True:
+                    raise ValueError(f"無法解析的文本：{buffer[position:position + 40]!r}")
+                break
+            kind = token.lastgroup
+            # 位於結尾的文字可能尚未完整，留待下一次輸入
+            if kind == "text" and token.end() == length and is_final == False:
+                break
+            position = token.end()
+            if kind == "text":
+                self._handle_text(token.group("text"))
+            elif kind == "end":
+                self._handle_end(token.group("end").lower(), token.group())
+            elif kind == "attrs":
+                self._handle_start(token.group("start").lower(), token.group("attrs"), token.group())
+        self._buffer = buffer[position:]
+    def _handle_text(self, text: str):
+        if len(self._stack) == 0:
+            if text.strip() != "":
+                raise ValueError(f"最上層不能有文字：{text[:40]!r}")
+            return
+        frame = self._stack[-1]
+        if len(frame[3]) == 0 and text.strip() == "" and ("\n" in text or frame[2] == None):
+            return
+        if frame[2] == None:
+            raise ValueError(f"'{frame[1]}'不能有文字內容：{text[:40]!r}")
+        frame[2].append(text)
+    def _handle_start(self, tag_name: str, attr_source: str, source: str):
+        if len(self._stack) > 0:
+            frame = self._stack[-1]
+            # 文字內容中的標籤(或'h1'~'h6'中的任何標籤)原封不動地保留
+            if len(frame[3]) > 0 or (frame[2] != None and (
+                    tag_name not in self.element_factories or tag_name in self._inline_tags
+                    or isinstance(frame[0], Container) == False)):
+                frame[2].append(source)
+                if tag_name not in self._void_tags and source.endswith("/>") == False:
+                    frame[3].append(tag_name)
+                return
+        factory = self.element_factories.get(tag_name)
+        if factory == None:
+            raise ValueError(f"不支援的標籤：{tag_name}")
+        element = factory()
+        self._restore_attrs(element, attr_source)
+        if len(self._stack) > 0:
+            parent = self._stack[-1][0]
+            if isinstance(parent, Container) == False:
+                raise ValueError(f"'{self._stack[-1][1]}'不能包含'{tag_name}'")
+            parent.attach(element)
+        else:
+            self.roots.append(element)
+        if tag_name not in self._void_tags:
+            text_parts = list() if isinstance(element, HtmlText) else None
+            self._stack.append([element, tag_name, text_parts, list()])
+    def _handle_end(self, tag_name: str, source: str):
+        if len(self._stack) == 0:
+            raise ValueError(f"沒有對應的開始標籤：{source}")
+        frame = self._stack[-1]
+        if len(frame[3]) > 0:
+            if frame[3][-1] != tag_name:
+                raise ValueError(f"沒有對應的開始標籤：{source}")
+            frame[3].pop()
+            frame[2].append(source)
+            return
+        if frame[1] != tag_name:
+            raise ValueError(f"沒有對應的開始標籤：{source}")
+        self._stack.pop()
+        if frame[2] != None and len(frame[2]) > 0:
+            # 文字內容是Html原文(可能含有'span'等標籤)，故以'Markup'保存，渲染時不會再次跳脫
+            frame[0].text = Markup("".join(frame[2]))
+    def _restore_attrs(self, element: IBaseElement, attr_source: str):
+        """
+        以解析出的屬性取代網頁元素建立時的預設屬性(例如'id'、'HtmlForm'的'action')。
+
+        屬性值直接存入屬性表，其格式與各屬性的'setter'存入的格式相同(例如'Enum'存入其'value')；
+
+        新建立的網頁元素尚未加入任何樹，故不需要經過'_set_attr_value'，收集完後依照'_attr_order'一次產生屬性表。
+        """
+        attr_order = getattr(element, "_attr_order", dict())
+        attrs: dict[str, Any] = dict()
+        bare_words = list()
+        for attr_match in self._attr_pattern.finditer(attr_source):
+            raw_name, double, single, bare = attr_match.groups()
+            html_name = raw_name.lower()
+            value = double if double != None else single if single != None else bare
+            if value != None and "&" in value:
+                value = html.unescape(value)
+            if html_name.startswith("data-") and "data" in attr_order:
+                attrs["data"] = (html_name[5:], value if value != None else "")
+                continue
+            attr_name = self._attr_names.get(html_name, html_name)
+            if attr_name not in attr_order or (attr_name == "value" and value == None):
+                if isinstance(element, HtmlInput) and value == None:
+                    # 'HtmlInput.value'輸出時不帶屬性名稱，故無法對應的單字即為其值
+                    bare_words.append(raw_name)
+                    continue
+                raise ValueError(f"'{ElementIndex.tag_name(element)}'不支援的屬性：{raw_name}")
+            if attr_name in self._flag_attrs:
+                value = attr_name
+            elif attr_name in self._bool_attrs:
+                value = value != None and value.lower() != "false"
+            elif attr_name == "tabindex":
+                value = int(value)
+            elif value == None:
+                value = ""
+            attrs[attr_name] = value
+        if len(bare_words) > 0:
+            attrs["value"] = html.unescape(" ".join(bare_words))
+        attr_table = list()
+        for attr_name in sorted(attrs, key=attr_order.__getitem__):
+            attr_table.append(attr_name)
+            attr_table.append(attrs[attr_name])
+        element._attr_table = tuple(attr_table)
+
+
+def parse_html(text: str) -> IBaseElement:
+    """
+    解析整段網頁文本，回傳最上層的網頁元素(通常是'HtmlDocument')。
+    """
+    return HtmlParser().feed(text).close()
+
+
+def parse_file(path: str, encoding: str = "utf-8", chunk_size: int = 65536) -> IBaseElement:
+    """
+    以每次'chunk_size'個字元的方式讀取並解析網頁檔案，不需要一次載入整個檔案。
+    """
+    parser = HtmlParser()
+    with open(path, "r", encoding=encoding) as input_file:
+        while True:
+            chunk = input_file.read(chunk_size)
+            if chunk == "":
+                break
+            parser.feed(chunk)
+    return parser.close()
@@ -0,0 +1,821 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from typing import Any, AsyncIterator, Callable, Iterator
+import asyncio
+import codecs
+import multiprocessing
+import os
+import zlib
+from ._module_unit import *
+
+##### 渲染引擎 #####
+
+class HtmlRenderer:
+    """
+    將網頁元素樹'一次走訪'並把字串片段依序寫入同一個輸出目標(sink)的渲染引擎。
+
+    與'Container._encapsulate'逐層串接子元素字串的方式不同，每個字元只會被產生一次。
+
+    走訪時使用明確的堆疊而非遞迴，故可以渲染任意深度的網頁元素樹(例如以'attach'逐層建立的數千層巢狀結構)。
+
+    可接受的輸出目標：
+
+    list ---> 透過'append'加入字串片段。
+
+    io.StringIO、檔案物件... ---> 任何具有'write'方法的物件。
+
+    use_cache ---> 若為'True'，每個網頁元素會保留上次渲染的字串，重新渲染時只會重新產生有變更(dirty)的子樹。
+
+    subtree_cache ---> 'SubtreeCache'實例，結構相同的容器子樹只會渲染一次，之後重用其字串；對容器而言優先於'use_cache'。
+
+    minify ---> 若為'True'，輸出不含縮排及標籤之間的換行的壓縮網頁；同一棵樹可以用不同的渲染引擎分別輸出兩種格式。
+    """
+    def __init__(
+            self, use_cache: bool = False, subtree_cache: SubtreeCache | None = None,
+            minify: bool = False) -> None:
+        self.use_cache = use_cache
+        self.subtree_cache = subtree_cache
+        self.minify = minify
+
+    @property
+    def minify(self) -> bool:
+        return self._minify
+    @minify.setter
+    def minify(self, new_val: bool):
+        if isinstance(new_val, bool):
+            self._minify = new_val
+            # 縮排及換行所使用的字串
+            self._tab = "" if new_val == True else "\t"
+            self._newline = "" if new_val == True else "\n"
+        else:
+            raise TypeError
+
+    def render(self, element: IBaseElement, sink: Any = None, depth: int = 0) -> Any:
+        """
+        將'element'及其所有子元素渲染至'sink'。
+
+        縮排是依照網頁元素在樹狀結構中的深度於渲染時計算，不會修改任何網頁元素，故同一棵樹可以重複渲染。
+
+        若未提供'sink'，則回傳完整的字串；否則回傳'sink'本身。
+        """
+        structure_ids = self._structure_ids(element)
+        if sink is None:
+            buffer: list[str] = list()
+            self._render_element(element, buffer.append, depth, structure_ids)
+            return "".join(buffer)
+        self._render_element(element, self._get_write(sink), depth, structure_ids)
+        return sink
+    def iter_chunks_sync(self, element: IBaseElement, chunk_size: int = 65536, depth: int = 0) -> Iterator[str]:
+        """
+        以產生器逐一產生渲染結果的字串片段(每個約'chunk_size'個字元)，供WSGI等同步的伺服器邊渲染邊傳送。
+
+        '_flush_before'為'True'的網頁元素(例如'HtmlBody')渲染前，會先產生已累積的字串，
+
+        故'<!DOCTYPE html>'及'head'不需等待'body'渲染完成就能送出。網頁元素樹含有'AsyncFragment'時拋出'TypeError'。
+        """
+        # 同步的走訪不需要交出執行權，只需依照累積的字元數量暫停
+        chunks = _ChunkBuffer(chunk_size, chunk_size)
+        walker = self._walk(element, chunks.write, depth, self._structure_ids(element), None, chunks.should_yield)
+        try:
+            for request in walker:
+                if request is not None:
+                    raise TypeError("網頁元素樹含有'AsyncFragment'，需使用'render_async'或'iter_chunks'渲染")
+                if chunks.is_ready() == True:
+                    yield chunks.take()
+            if chunks.size > 0:
+                yield chunks.take()
+        finally:
+            walker.close()
+    async def iter_chunks(
+            self, element: IBaseElement, chunk_size: int = 65536, yield_every: int = 256,
+            depth: int = 0) -> AsyncIterator[str]:
+        """
+        以非同步產生器逐一產生渲染結果的字串片段，供事件迴圈(asyncio)中的伺服器使用。
+
+        chunk_size: 累積超過此字元數量時產生一個片段。
+
+        yield_every: 每走訪此數量的網頁元素(或累積超過'chunk_size'個字元)，就以'asyncio.sleep(0)'交出一次執行權。
+
+        樹中所有的'AsyncFragment'會在開始渲染時同時啟動，輪到它們時才等待其結果，
+
+        故較慢的片段不會延後其他片段的執行；等待前會先產生已累積的字串，使客戶端可以先收到前面的內容。
+
+        與'iter_chunks_sync'相同，'HtmlBody'等網頁元素渲染前也會先產生已累積的字串。
+        """
+        chunks = _ChunkBuffer(chunk_size, yield_every)
+        tasks: dict[int, asyncio.Future] = dict()
+        walker = self._walk(element, chunks.write, depth, self._structure_ids(element), None, chunks.should_yield)
+        # 搜尋'AsyncFragment'與走訪同時進行，故'head'等前面的內容不需等待整棵樹搜尋完成
+        scan = asyncio.ensure_future(self._start_async_fragments(element, tasks, yield_every))
+        try:
+            result = None
+            while True:
+                try:
+                    request = walker.send(result)
+                except StopIteration:
+                    break
+                result = None
+                if request is None:
+                    if chunks.is_ready() == True:
+                        yield chunks.take()
+                    await asyncio.sleep(0)
+                    continue
+                if chunks.size > 0:
+                    yield chunks.take()
+                await scan
+                task = tasks.pop(id(request), None)
+                if task == None:
+                    # 由'LazyChildren'等在渲染時才產生的片段
+                    task = asyncio.ensure_future(request._start())
+                result = await task
+                if result is not None:
+                    if isinstance(result, IBaseElement) == False:
+                        raise TypeError("'AsyncFragment'的結果需為網頁元素或'None'")
+                    await self._start_async_fragments(result, tasks, yield_every)
+            if chunks.size > 0:
+                yield chunks.take()
+        finally:
+            walker.close()
+            scan.cancel()
+            for task in tasks.values():
+                task.cancel()
+    async def render_async(self, element: IBaseElement, depth: int = 0, yield_every: int = 256) -> str:
+        """
+        以非同步的方式渲染並回傳完整的字串，期間會定期交出執行權。
+        """
+        chunks = list()
+        async for chunk in self.iter_chunks(element, 65536, yield_every, depth):
+            chunks.append(chunk)
+        return "".join(chunks)
+    async def write_async(
+            self, element: IBaseElement, writer: Any, chunk_size: int = 65536, yield_every: int = 256,
+            encoding: str | None = "utf-8") -> Any:
+        """
+        將渲染結果分段寫入'writer'(例如'asyncio.StreamWriter')，每次寫入後若'writer'具有'drain'則等待其完成。
+
+        encoding: 寫入前的編碼方式；若'writer'接受字串，則設為'None'。
+        """
+        drain = getattr(writer, "drain", None)
+        encode = codecs.getincrementalencoder(encoding)().encode if encoding != None else None
+        async for chunk in self.iter_chunks(element, chunk_size, yield_every):
+            writer.write(encode(chunk) if encode != None else chunk)
+            if drain != None:
+                await drain()
+        return writer
+    @staticmethod
+    async def _start_async_fragments(
+            element: IBaseElement, tasks: dict[int, asyncio.Future], yield_every: int) -> dict[int, asyncio.Future]:
+        """
+        找出'element'中所有的'AsyncFragment'並同時啟動，回傳'id(網頁元素) ---> Task'。
+
+        每走訪'yield_every'個網頁元素交出一次執行權，故大型網頁的搜尋也不會長時間佔用事件迴圈。
+        """
+        stack = [element]
+        count = 0
+        while len(stack) > 0:
+            node = stack.pop()
+            if node._is_async == True and id(node) not in tasks:
+                tasks[id(node)] = asyncio.ensure_future(node._start())
+            stack.extend(getattr(node, "_element_list", ()))
+            count += 1
+            if count >= yield_every:
+                count = 0
+                await asyncio.sleep(0)
+        return tasks
+    def _structure_ids(self, element: IBaseElement) -> dict[int, int] | None:
+        if self.subtree_cache == None:
+            return None
+        return self.subtree_cache.structure_ids(element)
+    def _get_write(self, sink: Any) -> Callable[[str], Any]:
+        """
+        取得輸出目標用於寫入字串片段的方法。
+        """
+        if isinstance(sink, list):
+            return sink.append
+        write = getattr(sink, "write", None)
+        if callable(write):
+            return write
+        raise TypeError
+    def _render_element(
+            self, element: IBaseElement, write: Callable[[str], Any], depth: int,
+            structure_ids: dict[int, int] | None = None, fragments: dict[int, str] | None = None):
+        """
+        同步地完成'_walk'的走訪；網頁元素樹含有'AsyncFragment'時拋出'TypeError'。
+        """
+        for request in self._walk(element, write, depth, structure_ids, fragments):
+            if request is not None:
+                raise TypeError("網頁元素樹含有'AsyncFragment'，需使用'render_async'或'iter_chunks'渲染")
+    def _walk(
+            self, element: IBaseElement, write: Callable[[str], Any], depth: int,
+            structure_ids: dict[int, int] | None = None, fragments: dict[int, str] | None = None,
+            should_yield: Callable[[IBaseElement], bool] | None = None):
+        """
+        以明確的堆疊(而非遞迴)走訪網頁元素樹，故樹的深度不受Python遞迴上限的限制，且每個網頁元素只會被走訪一次。
+
+        堆疊中的每一層為'[容器, depth, 子元素迭代器, 子元素的depth, 快取鍵值, 是否為第一個子元素]'，
+
+        子元素之間會以換行符號相隔，且子元素的深度為'depth + _adjust_tab'。
+
+        若啟用'subtree_cache'且該網頁元素為具有子元素的容器，則以'(結構編號, depth)'查詢共用的子樹快取。
+
+        若啟用'use_cache'且該網頁元素在上次以相同深度渲染後沒有變更，則直接寫入上次的結果。
+
+        壓縮輸出(minify)與深度無關，故快取時以'-1'代替'depth'，也能藉此與一般格式的快取區分。
+
+        需要存入快取的網頁元素，其字串片段會先寫入'buffers'最上層的暫存列表，完成後再寫入外層的輸出目標。
+
+        fragments ---> 'id(網頁元素) ---> 已渲染的字串'，遇到這些網頁元素時直接寫入該字串(由'ParallelRenderer'使用)，
+
+        這些子樹在主行程中沒有被標記為已渲染，故其上級容器正在進行的快取也會被放棄。
+
+        '_is_streaming'為'True'的網頁元素(例如'LazyChildren')不會被快取，其上級容器正在進行的快取也會被放棄，
+
+        已暫存的字串片段會依序寫入輸出目標，故記憶體用量不會隨著串流的子元素數量增加。
+
+        該方法為產生器，供同步及非同步的渲染共用：
+
+        should_yield ---> 每走訪一個網頁元素前以該網頁元素呼叫，回傳'True'時產生'None'，讓呼叫者有機會送出字串或交出執行權。
+
+        '_is_async'為'True'的網頁元素(見'AsyncFragment')會被產生給呼叫者，呼叫者需以'send'傳回其結果(網頁元素或'None')，
+
+        結果會被視為該網頁元素唯一的子元素渲染。
+        """
+        sink_write = write
+        tab = self._tab
+        newline = self._newline
+        buffers: list[list[str]] = list()
+        stack: list[list] = list()
+        pending: IBaseElement | None = element
+        pending_is_first = True
+        while True:
+            if pending is None:
+                if len(stack) == 0:
+                    break
+                frame = stack[-1]
+                child = next(frame[2], None)
+                write = buffers[-1].append if len(buffers) > 0 else sink_write
+                if child is None:
+                    stack.pop()
+                    frame[0]._render_close(write, frame[1], tab, newline)
+                    if frame[4] != None:
+                        self._store(frame[0], frame[1], frame[4], buffers, sink_write)
+                    if frame[0]._is_streaming == True and len(stack) > 0:
+                        # 串流的子元素沒有產生任何子元素時，上級容器的下一個子元素仍視為第一個子元素
+                        stack[-1][5] = frame[5]
+                    continue
+                is_first = frame[5]
+                frame[5] = False
+                if child._is_streaming == True:
+                    # 串流的子元素可能不會產生任何子元素，換行改由其第一個子元素寫入
+                    pending_is_first = is_first
+                elif is_first == False and newline != "":
+                    write(newline)
+                pending = child
+                depth = frame[3]
+                continue
+            if should_yield is not None and should_yield(pending) == True:
+                yield None
+            element = pending
+            pending = None
+            write = buffers[-1].append if len(buffers) > 0 else sink_write
+            if fragments != None and id(element) in fragments:
+                # 預先渲染的子樹在主行程中仍標記為需要重新渲染，若上級容器存入快取並被標記為已渲染，
+                # 之後子樹中的變更將無法傳遞至上級容器，故同樣放棄所有上級容器的快取
+                if len(buffers) > 0:
+                    write = self._flush_buffers(stack, buffers, sink_write)
+                write(fragments[id(element)])
+                continue
+            capture_key = None
+            cache_depth = depth if newline != "" else -1
+            if element._is_streaming == True:
+                # 串流的子元素不能暫存於記憶體，放棄所有上級容器的快取並直接寫入輸出目標
+                if len(buffers) > 0:
+                    write = self._flush_buffers(stack, buffers, sink_write)
+            elif structure_ids != None and len(getattr(element, "_element_list", ())) > 0 and id(element) in structure_ids:
+                # 串流或非同步產生的網頁元素不在結構編號表中，不使用子樹快取
+                capture_key = (structure_ids[id(element)], cache_depth)
+                element_string = self.subtree_cache.get(capture_key)
+                if element_string != None:
+                    write(element_string)
+                    continue
+            elif self.use_cache == True:
+                render_cache = element._render_cache
+                if element._dirty == False and render_cache != None and render_cache[0] == cache_depth:
+                    write(render_cache[1])
+                    continue
+                capture_key = _ELEMENT_CACHE
+            if element._is_async == True:
+                resolved = yield element
+                children = (resolved,) if resolved is not None else ()
+                stack.append([element, depth, iter(children), depth + element._adjust_tab, None, pending_is_first])
+                pending_is_first = True
+                continue
+            if capture_key != None:
+                buffers.append(list())
+                write = buffers[-1].append
+            children = element._render_open(write, depth, tab, newline)
+            if children is None:
+                if capture_key != None:
+                    self._store(element, depth, capture_key, buffers, sink_write)
+                continue
+            stack.append([element, depth, iter(children), depth + element._adjust_tab, capture_key, pending_is_first])
+            pending_is_first = True
+    @staticmethod
+    def _flush_buffers(
+            stack: list[list], buffers: list[list[str]], sink_write: Callable[[str], Any]) -> Callable[[str], Any]:
+        """
+        放棄所有上級容器正在進行的快取，將已暫存的字串片段依序寫入輸出目標後回傳'sink_write'。
+        """
+        for frame in stack:
+            frame[4] = None
+        for buffer in buffers:
+            sink_write("".join(buffer))
+        buffers.clear()
+        return sink_write
+    def _store(
+            self, element: IBaseElement, depth: int, capture_key: Any,
+            buffers: list[list[str]], sink_write: Callable[[str], Any]):
+        """
+        將最上層暫存列表的字串片段串接後存入對應的快取，並寫入外層的輸出目標。
+        """
+        element_string = "".join(buffers.pop())
+        if capture_key is _ELEMENT_CACHE:
+            element._render_cache = (depth if self._newline != "" else -1, element_string)
+            element._dirty = False
+        else:
+            self.subtree_cache.put(capture_key, element_string)
+        if len(buffers) > 0:
+            buffers[-1].append(element_string)
+        else:
+            sink_write(element_string)
+
+
+# 表示渲染結果應存入網頁元素本身的'_render_cache'(use_cache)
+_ELEMENT_CACHE = object()
+
+
+class _ChunkBuffer:
+    """
+    'iter_chunks'、'iter_chunks_sync'暫存字串片段的緩衝區，並決定走訪時何時需要暫停(產生片段或交出執行權)。
+    """
+    __slots__ = ("parts", "size", "chunk_size", "yield_every", "count", "flush_requested")
+    def __init__(self, chunk_size: int, yield_every: int) -> None:
+        if chunk_size <= 0 or yield_every <= 0:
+            raise ValueError
+        self.parts: list[str] = list()
+        self.size = 0
+        self.chunk_size = chunk_size
+        self.yield_every = yield_every
+        self.count = 0
+        self.flush_requested = False
+    def write(self, fragment: str):
+        self.parts.append(fragment)
+        self.size += len(fragment)
+    def should_yield(self, element: IBaseElement) -> bool:
+        self.count += 1
+        if element._flush_before == True and self.size > 0:
+            self.flush_requested = True
+            return True
+        if self.count >= self.yield_every or self.size >= self.chunk_size:
+            self.count = 0
+            return True
+        return False
+    def is_ready(self) -> bool:
+        return self.size >= self.chunk_size or (self.flush_requested == True and self.size > 0)
+    def take(self) -> str:
+        chunk = "".join(self.parts)
+        self.parts.clear()
+        self.size = 0
+        self.flush_requested = False
+        return chunk
+
+
+class ParallelRenderer(HtmlRenderer):
+    """
+    將網頁元素樹在指定的容器層級切分，並以'ProcessPoolExecutor'平行渲染各個子樹的渲染引擎。
+
+    各子樹的字串會依照原本的順序及深度接回主行程渲染的骨架，故輸出與'HtmlRenderer'逐字元相同。
+
+    max_workers ---> 行程數量，預設為CPU核心數。
+
+    split_depth ---> 切分的層級，最上層為0；預設為2，即'HtmlDocument' ---> 'HtmlBody' ---> 各個區塊。
+
+    min_subtrees ---> 可切分的子樹少於此數量時，直接在主行程渲染。
+
+    tasks_per_worker ---> 每個行程分配到的工作數量，相鄰的子樹會合併成同一個工作以減少行程間的傳輸次數。
+
+    mp_context ---> 'multiprocessing'的啟動方式，預設在支援時使用'fork'，子行程可以直接沿用主行程的網頁元素樹而不需序列化。
+
+    備註：
+
+    使用'spawn'等方式時，網頁元素樹會透過'pickle'傳遞給子行程(見'BaseElement.__getstate__')。
+    """
+    def __init__(
+            self, max_workers: int | None = None, split_depth: int = 2, min_subtrees: int = 2,
+            tasks_per_worker: int = 4, use_cache: bool = False, subtree_cache: SubtreeCache | None = None,
+            minify: bool = False, mp_context: Any = None) -> None:
+        HtmlRenderer.__init__(self, use_cache, subtree_cache, minify)
+        if isinstance(split_depth, int) == False or isinstance(min_subtrees, int) == False:
+            raise TypeError
+        if split_depth < 0 or tasks_per_worker <= 0:
+            raise ValueError
+        self.max_workers = max_workers
+        self.split_depth = split_depth
+        self.min_subtrees = min_subtrees
+        self.tasks_per_worker = tasks_per_worker
+        if mp_context == None and "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        self.mp_context = mp_context
+    def render(self, element: IBaseElement, sink: Any = None, depth: int = 0) -> Any:
+        """
+        平行渲染'split_depth'層的所有子樹後，再於主行程渲染其餘部分並依序接上各子樹的字串。
+
+        若未提供'sink'，則回傳完整的字串；否則回傳'sink'本身。
+        """
+        split_points = self._find_split_points(element, depth)
+        if len(split_points) < self.min_subtrees:
+            return HtmlRenderer.render(self, element, sink, depth)
+        max_workers = self.max_workers or os.cpu_count() or 1
+        task_count = min(len(split_points), max_workers*self.tasks_per_worker)
+        batch_size = -(-len(split_points) // task_count)
+        batches = [split_points[index:index + batch_size] for index in range(0, len(split_points), batch_size)]
+        worker_renderer = HtmlRenderer(self.use_cache, self.subtree_cache, self.minify)
+        with ProcessPoolExecutor(
+                max_workers, self.mp_context, _init_parallel_worker, (element, worker_renderer)) as executor:
+            batch_results = list(executor.map(
+                _render_parallel_batch, [[(path, child_depth) for _, path, child_depth in batch] for batch in batches]))
+        fragments: dict[int, str] = dict()
+        for batch, element_strings in zip(batches, batch_results):
+            for (subtree, _, _), element_string in zip(batch, element_strings):
+                fragments[id(subtree)] = element_string
+        structure_ids = self._structure_ids(element)
+        if sink is None:
+            buffer: list[str] = list()
+            self._render_element(element, buffer.append, depth, structure_ids, fragments)
+            return "".join(buffer)
+        self._render_element(element, self._get_write(sink), depth, structure_ids, fragments)
+        return sink
+    def _find_split_points(self, element: IBaseElement, depth: int) -> list[tuple[IBaseElement, tuple[int, ...], int]]:
+        """
+        依照文件順序找出位於'split_depth'層且具有子元素的容器，回傳'(子樹, 從最上層到子樹的索引路徑, 渲染深度)'列表。
+        """
+        split_points = list()
+        stack: list[tuple[IBaseElement, tuple[int, ...], int]] = [(element, (), depth)]
+        while len(stack) > 0:
+            node, path, node_depth = stack.pop()
+            children = getattr(node, "_element_list", ())
+            if len(children) == 0:
+                continue
+            if len(path) == self.split_depth:
+                split_points.append((node, path, node_depth))
+                continue
+            child_depth = node_depth + node._adjust_tab
+            for index in range(len(children) - 1, -1, -1):
+                stack.append((children[index], path + (index,), child_depth))
+        return split_points
+
+
+# 平行渲染時，子行程所使用的網頁元素樹及渲染引擎
+_parallel_root: IBaseElement | None = None
+_parallel_renderer: HtmlRenderer | None = None
+
+
+def _init_parallel_worker(root: IBaseElement, renderer: HtmlRenderer):
+    global _parallel_root, _parallel_renderer
+    _parallel_root = root
+    _parallel_renderer = renderer
+
+
+def _render_parallel_batch(tasks: list[tuple[tuple[int, ...], int]]) -> list[str]:
+    """
+    在子行程中依照索引路徑找到各個子樹，並以指定的深度渲染成字串。
+    """
+    element_strings = list()
+    for path, depth in tasks:
+        element = _parallel_root
+        for index in path:
+            element = element._element_list[index]
+        element_strings.append(_parallel_renderer.render(element, None, depth))
+    return element_strings
+
+
+class StructureTable:
+    """
+    為網頁元素樹由下而上計算'結構編號'的對照表('結構鍵值 ---> 結構編號')。
+
+    類別、標籤、縮排、屬性表(包含各屬性值的型別，例如是否為'Markup')、文字內容('_text'及其是否為'Markup'，或'_content_key')及所有子元素皆相同的網頁元素會被分配到同一個結構編號。
+
+    子元素以結構編號(整數)代表，故每個網頁元素的鍵值大小只與自身的子元素數量有關。
+
+    編號由遞增的計數器產生，淘汰的編號不會再被使用，故淘汰舊鍵值後，新的結構也不會與先前的結構(或其快取)共用編號。
+
+    max_entries ---> 保留的鍵值數量上限，超過時依照'最久未使用'(LRU)的順序淘汰；'None'表示不淘汰(例如'TreeDiff'單次比較使用的對照表)。
+    """
+    def __init__(self, max_entries: int | None = None) -> None:
+        if max_entries != None and max_entries <= 0:
+            raise ValueError
+        self.max_entries = max_entries
+        self._ids: dict[tuple, int] = OrderedDict() if max_entries != None else dict()
+        self._serial = count()
+        self.evictions = 0
+    def __len__(self) -> int:
+        return len(self._ids)
+    def structure_ids(self, element: IBaseElement) -> dict[int, int]:
+        """
+        計算'element'及其所有子元素的結構編號，回傳'id(網頁元素) ---> 結構編號'的對照表。
+
+        屬性值無法雜湊的網頁元素會得到不與其他網頁元素共用的負數編號。
+        """
+        ids = self._ids
+        serial = self._serial
+        max_entries = self.max_entries
+        structure_ids: dict[int, int] = dict()
+        stack: list[tuple[IBaseElement, bool]] = [(element, False)]
+        while len(stack) > 0:
+            node, is_expanded = stack.pop()
+            children = getattr(node, "_element_list", ())
+            if is_expanded == False and len(children) > 0:
+                stack.append((node, True))
+                stack.extend([(child, False) for child in children])
+                continue
+            key = self.structure_key(node, [structure_ids[id(child)] for child in children])
+            try:
+                structure_id = ids.get(key)
+            except TypeError:
+                structure_ids[id(node)] = -1 - next(serial)
+                continue
+            if structure_id == None:
+                structure_id = next(serial)
+                ids[key] = structure_id
+                if max_entries != None and len(ids) > max_entries:
+                    ids.popitem(last=False)
+                    self.evictions += 1
+            elif max_entries != None:
+                try:
+                    ids.move_to_end(key)
+                except KeyError:
+                    # 其他執行緒同時淘汰了該鍵值，編號仍然有效
+                    pass
+            structure_ids[id(node)] = structure_id
+        return structure_ids
+    @staticmethod
+    def structure_key(node: IBaseElement, child_ids: list[int]) -> tuple:
+        return (
+            type(node), node._start_prefix, node.indent_tab, getattr(node, "_adjust_tab", 0),
+            node._attr_table, tuple(map(type, node._attr_table)),
+            getattr(node, "_text", None), type(getattr(node, "_text", None)),
+            getattr(node, "_content_key", None), tuple(child_ids)
+        )
+    def clear(self):
+        self._ids.clear()
+
+
+class SubtreeCache:
+    """
+    以'結構'為鍵值的子樹快取(hash-consing)，可以作為'HtmlRenderer'的'subtree_cache'使用。
+
+    結構完全相同的網頁元素會被分配到同一個'結構編號'(見'StructureTable')，其字串只需渲染一次，之後直接重用。
+
+    由於縮排是在渲染時依照深度計算，快取的鍵值為'(結構編號, depth)'，相同的子樹位於不同深度時會分別快取。
+
+    max_entries ---> 最多保留的子樹字串數量。
+
+    max_size ---> 所有已保留字串的字元總數上限，超過此大小的單一字串不會被保留。
+
+    max_structures ---> 結構編號表保留的鍵值數量上限。整棵樹的網頁元素數量需小於此上限，重新渲染未變更的子樹時才能命中。
+
+    超過上限時，會依照'最久未使用'(LRU)的順序淘汰；可透過'stats'取得命中/未命中的統計以調整上限。
+
+    備註：
+
+    屬性(包含'id')也是結構的一部分，故'id'不同的子樹不會共用字串。'id'不重複的網頁中，
+
+    快取主要用於重新渲染時重用未變更的子樹；不具有'id'的重複片段(例如只設置'class'的導覽區塊、列表項目)則可以在同一次渲染中共用。
+    """
+    def __init__(self, max_entries: int = 1024, max_size: int = 4194304, max_structures: int = 65536) -> None:
+        if isinstance(max_entries, int) == False or isinstance(max_size, int) == False or isinstance(max_structures, int) == False:
+            raise TypeError
+        if max_entries <= 0 or max_size <= 0 or max_structures <= 0:
+            raise ValueError
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._structures = StructureTable(max_structures)
+        self._entries: OrderedDict[tuple[int, int], str] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def structure_ids(self, element: IBaseElement) -> dict[int, int]:
+        """
+        計算'element'及其所有子元素的結構編號，回傳'id(網頁元素) ---> 結構編號'的對照表(見'StructureTable.structure_ids')。
+        """
+        return self._structures.structure_ids(element)
+    def get(self, key: tuple[int, int]) -> str | None:
+        """
+        取得已快取的字串並更新其使用順序，若不存在則回傳'None'。
+        """
+        element_string = self._entries.get(key)
+        if element_string == None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            # 其他執行緒同時淘汰了該項目，已取得的字串仍然有效
+            pass
+        return element_string
+    def put(self, key: tuple[int, int], element_string: str):
+        """
+        儲存渲染完成的字串，並依照LRU順序淘汰超過上限的項目。
+        """
+        if key[0] < 0 or len(element_string) > self.max_size:
+            return
+        previous = self._entries.pop(key, None)
+        if previous != None:
+            self._size -= len(previous)
+        self._entries[key] = element_string
+        self._size += len(element_string)
+        while len(self._entries) > self.max_entries or self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+    def clear(self):
+        """
+        清空結構編號表及所有已快取的字串(統計數據會保留)。
+        """
+        self._structures.clear()
+        self._entries.clear()
+        self._size = 0
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """
+        命中、未命中、淘汰次數，目前的項目數量與字元總數，以及結構編號表的鍵值數量與淘汰次數。
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size": self._size,
+            "structures": len(self._structures),
+            "structure_evictions": self._structures.evictions
+        }
+
+
+class ChunkWriter:
+    """
+    將字串片段暫存起來，累積到'buffer_size'個字元後才一次寫入'writable'的輸出目標，每次寫入的字元數量不超過'buffer_size'。
+
+    可以作為'HtmlRenderer.render'的'sink'使用，使輸出時的記憶體用量維持在固定的大小。
+
+    writable ---> 具有'write'方法的物件(檔案物件、io.BytesIO...)，或具有'sendall'方法的'socket'。
+
+    encoding ---> 若有設置，則會將字串編碼成'bytes'後再寫入；寫入'socket'時必須設置。
+    """
+    def __init__(self, writable: Any, buffer_size: int = 65536, encoding: str | None = None) -> None:
+        write = getattr(writable, "write", None)
+        if callable(write) == False:
+            write = getattr(writable, "sendall", None)
+        if callable(write) == False:
+            raise TypeError
+        self._write: Callable[[Any], Any] = write
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        # 使用遞增式編碼器，避免分段編碼時重複寫入'BOM'(例如'utf-16')
+        self._encode: Callable[[str], bytes] | None = None
+        if encoding != None:
+            self._encode = codecs.getincrementalencoder(encoding)().encode
+        self._buffer: list[str] = list()
+        self._buffer_length = 0
+    def write(self, fragment: str):
+        """
+        暫存字串片段，若暫存的字元數量達到'buffer_size'，則以'buffer_size'個字元為單位寫入'writable'，
+
+        不足'buffer_size'的剩餘字元會留到下次寫入。
+        """
+        self._buffer.append(fragment)
+        self._buffer_length += len(fragment)
+        buffer_size = self.buffer_size
+        if self._buffer_length >= buffer_size:
+            content = "".join(self._buffer)
+            self._buffer.clear()
+            end = len(content) - len(content) % buffer_size
+            for start in range(0, end, buffer_size):
+                self._write_chunk(content[start:start + buffer_size])
+            if end < len(content):
+                self._buffer.append(content[end:])
+            self._buffer_length = len(content) - end
+    def flush(self):
+        """
+        將所有暫存的字串片段串接後寫入'writable'。
+        """
+        if self._buffer_length == 0:
+            return
+        chunk = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffer_length = 0
+        self._write_chunk(chunk)
+    def _write_chunk(self, chunk: str):
+        if self._encode != None:
+            self._write(self._encode(chunk))
+        else:
+            self._write(chunk)
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.flush()
+
+    @property
+    def buffer_size(self) -> int:
+        return self.__buffer_size
+    @buffer_size.setter
+    def buffer_size(self, new_val: int):
+        if isinstance(new_val, int):
+            if new_val > 0:
+                self.__buffer_size = new_val
+            else:
+                raise ValueError
+        else:
+            raise TypeError
+
+
+class CompressedWriter:
+    """
+    將字串片段編碼後送入串流壓縮器，並把壓縮後的資料寫入'writable'(以'wb'開啟的檔案、io.BytesIO...)。
+
+    可以作為'ChunkWriter'的'writable'使用，在渲染的同時產生壓縮檔，不需要先寫出完整的文本再讀回壓縮。
+
+    method ---> 'gzip'(可供'gzip_static'使用的'.gz'檔)、'zlib'或'deflate'(不含標頭的原始deflate資料)。
+
+    level ---> 壓縮等級，0~9。
+
+    備註：
+
+    'gzip'的標頭不包含時間戳記，故相同的網頁每次都會產生相同的壓縮檔。
+    """
+    # 各壓縮方式的'wbits'參數及檔案的副檔名
+    _methods = {
+        "gzip": (31, ".gz"),
+        "zlib": (15, ".zz"),
+        "deflate": (-15, ".deflate")
+    }
+    def __init__(self, writable: Any, method: str = "gzip", level: int = 9, encoding: str = "utf-8") -> None:
+        if method not in self._methods:
+            raise ValueError
+        if isinstance(level, int) == False:
+            raise TypeError
+        if (0 <= level <= 9) == False:
+            raise ValueError
+        write = getattr(writable, "write", None)
+        if callable(write) == False:
+            raise TypeError
+        self._write: Callable[[bytes], Any] = write
+        self.method = method
+        self.encoding = encoding
+        self._encode: Callable[[str], bytes] = codecs.getincrementalencoder(encoding)().encode
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, self._methods[method][0])
+    @classmethod
+    def suffix(cls, method: str) -> str:
+        """
+        取得壓縮方式對應的副檔名(例如'gzip' ---> '.gz')。
+        """
+        if method not in cls._methods:
+            raise ValueError
+        return cls._methods[method][1]
+    def write(self, fragment: str):
+        compressed = self._compressor.compress(self._encode(fragment))
+        if len(compressed) > 0:
+            self._write(compressed)
+    def close(self):
+        """
+        寫入壓縮器中剩餘的資料(不會關閉'writable')。
+        """
+        if self._compressor != None:
+            self._write(self._compressor.flush())
+            self._compressor = None
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+class TeeWriter:
+    """
+    將相同的字串片段依序寫入多個輸出目標，使一次渲染可以同時產生多個檔案(例如'.html'及'.html.gz')。
+    """
+    def __init__(self, *writables: Any) -> None:
+        self._writes: list[Callable[[Any], Any]] = list()
+        for writable in writables:
+            write = getattr(writable, "write", None)
+            if callable(write) == False:
+                raise TypeError
+            self._writes.append(write)
+    def write(self, fragment: Any):
+        for write in self._writes:
+            write(fragment)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+from typing import Any, Iterator
+import re
+from ._module_unit import *
+
+##### CSS選擇器 #####
+
+class CssSelector:
+    """
+    將CSS選擇器解析成可以重複使用的查詢計畫，並透過'ElementIndex'找出符合的網頁元素。
+
+    支援的語法：
+
+    tag、* ---> 標籤名稱(例如'div'、'h2')或任意標籤。
+
+    #id、.class ---> 'id'及'class'。
+
+    [attr]、[attr=value] ---> 具有該屬性、屬性值等於'value'(可加上引號)，屬性名稱為Html的名稱(例如'type'、'data-key')。
+
+    'A B'、'A > B' ---> 後代及子元素組合器；'A, B'則為多個選擇器的聯集。
+
+    查詢時會先以最右側選擇器中的'id'、'class'或標籤名稱從索引取得候選網頁元素，再由右往左檢查其上級容器，
+
+    只有最右側選擇器不具有上述任一條件(例如'*'、'[hidden]')時才會走訪整棵子樹。結果依照文件順序以產生器回傳。
+
+    example:
+
+    CssSelector.compile("form#Form1 > p input[type=submit]").select(doc)
+    """
+    _token_pattern = re.compile(r"""
+        (?P<child>\s*>\s*) |
+        (?P<group>\s*,\s*) |
+        (?P<descendant>\s+) |
+        (?P<universal>\*) |
+        (?P<tag>[A-Za-z][A-Za-z0-9-]*) |
+        \#(?P<id>[\w-]+) |
+        \.(?P<class_name>[\w-]+) |
+        \[\s*(?P<attr>[\w-]+)\s*(?:=\s*(?:"(?P<double>[^"]*)"|'(?P<single>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+    """, re.VERBOSE)
+    # 屬性表中與Html屬性名稱不同的屬性
+    _html_attr_names = {"id_attr": "id", "class_attr": "class", "dir_attr": "dir", "input_type": "type"}
+    # 已解析的選擇器，以選擇器字串為鍵值
+    _compiled: dict[str, CssSelector] = dict()
+    _compiled_limit = 256
+    def __init__(self, selector: str) -> None:
+        """
+        selector: CSS選擇器字串，語法錯誤時拋出'ValueError'。
+        """
+        if isinstance(selector, str) == False:
+            raise TypeError
+        self.selector = selector
+        # 每個選擇器為'[(組合器, (tag, id, classes, attrs)), ...]'，由左往右排列；最左側的組合器為'None'
+        self._groups: list[list[tuple[str | None, tuple]]] = self._parse(selector.strip())
+    @classmethod
+    def compile(cls, selector: str) -> CssSelector:
+        """
+        取得已解析的選擇器，相同的選擇器字串只會解析一次。
+        """
+        compiled = cls._compiled.get(selector)
+        if compiled == None:
+            if len(cls._compiled) >= cls._compiled_limit:
+                cls._compiled.clear()
+            compiled = cls(selector)
+            cls._compiled[selector] = compiled
+        return compiled
+    def _parse(self, selector: str) -> list[list[tuple[str | None, tuple]]]:
+        if selector == "":
+            raise ValueError
+        groups = list()
+        parts: list[tuple[str | None, tuple]] = list()
+        combinator: str | None = None
+        compound: dict[str, Any] | None = None
+        def close_compound():
+            nonlocal compound
+            if compound == None:
+                raise ValueError(f"無法解析的CSS選擇器：{selector}")
+            parts.append((combinator, (
+                compound["tag"], compound["id"], tuple(compound["classes"]), tuple(compound["attrs"])
+            )))
+            compound = None
+        position = 0
+        while position < len(selector):
+            token = self._token_pattern.match(selector, position)
+            if token == None:
+                raise ValueError(f"無法解析的CSS選擇器：{selector}")
+            position = token.end()
+            kind = token.lastgroup
+            if kind in ("child", "descendant", "group"):
+                close_compound()
+                if kind == "group":
+                    groups.append(parts)
+                    parts = list()
+                    combinator = None
+                else:
+                    combinator = ">" if kind == "child" else " "
+                continue
+            if compound == None:
+                compound = {"tag": None, "id": None, "classes": list(), "attrs": list()}
+            if kind == "tag":
+                if compound["tag"] != None or len(compound["classes"]) > 0 or compound["id"] != None:
+                    raise ValueError(f"無法解析的CSS選擇器：{selector}")
+                compound["tag"] = token.group("tag").lower()
+            elif kind == "universal":
+                pass
+            elif kind == "id":
+                compound["id"] = token.group("id")
+            elif kind == "class_name":
+                compound["classes"].append(token.group("class_name"))
+            else:
+                value = token.group("double")
+                if value == None:
+                    value = token.group("single")
+                if value == None:
+                    value = token.group("bare")
+                compound["attrs"].append((token.group("attr").lower(), value))
+        close_compound()
+        groups.append(parts)
+        return groups
+    @classmethod
+    def attribute_value(cls, element: IBaseElement, html_name: str) -> str | None:
+        """
+        以Html的屬性名稱取得網頁元素的屬性值(字串)，未設置時回傳'None'。
+        """
+        attr_table = element._attr_table
+        for index in range(0, len(attr_table), 2):
+            attr_name = attr_table[index]
+            value = attr_table[index + 1]
+            if attr_name == "data":
+                if html_name == "data-" + value[0]:
+                    return value[1]
+            elif cls._html_attr_names.get(attr_name, attr_name) == html_name:
+                if isinstance(value, bool):
+                    return str(value).lower()
+                return str(value)
+        return None
+    def _match_compound(self, element: IBaseElement, compound: tuple) -> bool:
+        tag_name, id_value, classes, attrs = compound
+        if tag_name != None and ElementIndex.tag_name(element) != tag_name:
+            return False
+        if id_value != None and ElementIndex.attr_value(element, "id_attr") != id_value:
+            return False
+        if len(classes) > 0:
+            class_value = ElementIndex.attr_value(element, "class_attr")
+            if class_value == None:
+                return False
+            class_names = class_value.split()
+            for class_name in classes:
+                if class_name not in class_names:
+                    return False
+        for attr_name, expected in attrs:
+            value = self.attribute_value(element, attr_name)
+            if value == None or (expected != None and value != expected):
+                return False
+        return True
+    def _match_parts(self, element: IBaseElement, parts: list[tuple[str | None, tuple]], index: int) -> bool:
+        """
+        由右往左檢查'parts[:index + 1]'：'element'需符合'parts[index]'，其上級容器需符合左側的選擇器。
+        """
+        combinator, compound = parts[index]
+        if self._match_compound(element, compound) == False:
+            return False
+        if index == 0:
+            return True
+        parent = element._parent
+        if combinator == ">":
+            return parent != None and self._match_parts(parent, parts, index - 1)
+        while parent != None:
+            if self._match_parts(parent, parts, index - 1):
+                return True
+            parent = parent._parent
+        return False
+    def match(self, element: IBaseElement) -> bool:
+        """
+        判斷'element'是否符合該選擇器(任一個以','分隔的選擇器)。
+        """
+        for parts in self._groups:
+            if self._match_parts(element, parts, len(parts) - 1):
+                return True
+        return False
+    def _candidates(self, element_index: ElementIndex, compound: tuple) -> list[IBaseElement] | None:
+        """
+        依照'id'、'class'、標籤名稱的優先順序從索引取得候選網頁元素，皆不具有時回傳'None'(需走訪整棵子樹)。
+        """
+        tag_name, id_value, classes, _ = compound
+        if id_value != None:
+            return element_index.get_all_by_id(id_value)
+        if len(classes) > 0:
+            return min([element_index.get_by_class(class_name) for class_name in classes], key=len)
+        if tag_name != None:
+            return element_index.get_by_tag(tag_name)
+        return None
+    def select(self, container: Container) -> Iterator[IBaseElement]:
+        """
+        依照文件順序逐一產生'container'的子孫中符合該選擇器的網頁元素(不包含'container'本身)。
+        """
+        element_index = container.element_index
+        candidates: dict[int, IBaseElement] | None = dict()
+        for parts in self._groups:
+            group_candidates = self._candidates(element_index, parts[-1][1])
+            if group_candidates == None:
+                candidates = None
+                break
+            for element in group_candidates:
+                candidates[id(element)] = element
+        if candidates == None:
+            yield from self._select_by_walking(container)
+            return
+        order = element_index.document_order()
+        is_root = container._parent == None
+        for element in sorted(candidates.values(), key=lambda element: order[id(element)]):
+            if element is container or (is_root == False and container._contains(element) == False):
+                continue
+            if self.match(element):
+                yield element
+    def _select_by_walking(self, container: Container) -> Iterator[IBaseElement]:
+        stack = list(reversed(container._element_list))
+        while len(stack) > 0:
+            element = stack.pop()
+            if element._is_streaming == True:
+                # 串流的子元素只是渲染時的佔位元素，不會被選取
+                continue
+            if self.match(element):
+                yield element
+            stack.extend(reversed(getattr(element, "_element_list", ())))
+
+
+class Selectable:
+    """
+    使容器類型的網頁元素可以透過CSS選擇器查詢其子孫，需與'Container'一起繼承。
+    """
+    __slots__ = ()
+    def select(self, selector: str) -> Iterator[IBaseElement]:
+        """
+        依照文件順序逐一產生符合'selector'的子孫網頁元素(產生器)。
+
+        example:
+
+        for element in doc.select("div.row > p"):
+
+            element.set_global_attr({"style": "color:#f00;"})
+        """
+        return CssSelector.compile(selector).select(self)
+    def select_one(self, selector: str) -> IBaseElement | None:
+        """
+        回傳第一個符合'selector'的子孫網頁元素，若不存在則回傳'None'。
+        """
+        return next(self.select(selector), None)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import Any
+from .base import *
+
+##### 樣板編譯 #####
+
+class Slot(Markup):
+    """
+    標記樣板中會變動的資料欄位，可以作為網頁元素的文字內容或屬性值使用。
+
+    example:
+
+    HtmlParagraph("greeting", Slot("user_name"))
+
+    HtmlInput("input_name").set_individual_attr({"value": Slot("default_name")})
+
+    備註：
+
+    該類別是'str'的子類，故可以通過屬性的型別檢查；其字串內容為'\\x00名稱\\x00'，用於在編譯時找出欄位的位置。
+
+    該類別同時是'Markup'的子類，故編譯時不會被跳脫；填入的值則會在渲染時跳脫(見'HtmlTemplate.render')。
+    """
+    def __new__(cls, name: str) -> Slot:
+        if isinstance(name, str) == False:
+            raise TypeError
+        if "\x00" in name:
+            raise ValueError
+        slot = str.__new__(cls, f"\x00{name}\x00")
+        slot.name = name
+        return slot
+    def __getnewargs__(self) -> tuple[str]:
+        # 序列化(pickle)時以欄位名稱重新建立，而非含有'\x00'的字串內容
+        return (self.name,)
+
+
+class HtmlTemplate:
+    """
+    將已建立好的網頁元素樹編譯成'固定字串片段'及'資料欄位'交錯的渲染計畫。
+
+    編譯只需進行一次，之後每次渲染只需要填入各個'Slot'的值，不需要再建立任何網頁元素。
+
+    example:
+
+    template = HtmlTemplate(doc)
+
+    template.render({"user_name": "Asriel"})
+    """
+    def __init__(self, element: IBaseElement, renderer: HtmlRenderer | None = None) -> None:
+        """
+        element: 欲編譯的網頁元素(通常是'HtmlDocument'或容器類型的網頁元素)。
+
+        renderer: 編譯時使用的'HtmlRenderer'實例。
+        """
+        if renderer == None:
+            renderer = HtmlRenderer()
+        parts = renderer.render(element).split("\x00")
+        # 'parts'為'固定字串、欄位名稱、固定字串...'交錯的列表
+        self._chunks: tuple[str, ...] = tuple(parts[0::2])
+        self._slot_names: tuple[str, ...] = tuple(parts[1::2])
+    def render(self, values: dict[str, Any]) -> str:
+        """
+        依照'values'填入各個欄位並回傳完整的字串，若缺少某個欄位的值則拋出'KeyError'。
+
+        填入的值會以'HtmlEscaper.attr'跳脫(欄位可能位於屬性值中)，'Markup'則原樣填入。
+        """
+        buffer = [self._chunks[0]]
+        for slot_name, chunk in zip(self._slot_names, self._chunks[1:]):
+            buffer.append(HtmlEscaper.attr(values[slot_name]))
+            buffer.append(chunk)
+        return "".join(buffer)
+    def render_to(self, sink: Any, values: dict[str, Any]) -> Any:
+        """
+        依照'values'填入各個欄位，並將字串片段依序寫入'sink'(list或具有'write'方法的物件)後回傳'sink'。
+        """
+        write = HtmlRenderer()._get_write(sink)
+        write(self._chunks[0])
+        for slot_name, chunk in zip(self._slot_names, self._chunks[1:]):
+            write(HtmlEscaper.attr(values[slot_name]))
+            write(chunk)
+        return sink
+
+    @property
+    def slot_names(self) -> tuple[str, ...]:
+        """樣板中出現的欄位名稱(依出現順序，可能重複)。"""
+        return self._slot_names
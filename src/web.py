@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+import codecs
+from .base import *
+
+##### 網頁伺服器 #####
+
+class WsgiResponse:
+    """
+    將網頁元素樹(例如'HtmlDocument'或任何'Container')包裝成WSGI應用程式，邊渲染邊傳送回應。
+
+    回應的內容是每個約'chunk_size'個字元的'bytes'片段(見'HtmlRenderer.iter_chunks_sync')，
+
+    '<!DOCTYPE html>'及'head'會在'body'開始渲染前先送出，故大型網頁的首位元組時間(TTFB)不受網頁大小影響。
+
+    example:
+
+    def application(environ, start_response):
+
+        return WsgiResponse(build_page(environ))(environ, start_response)
+
+    備註：
+
+    回應不含'Content-Length'，伺服器會以分塊(chunked)或關閉連線的方式結束回應。網頁元素樹不能含有'AsyncFragment'。
+    """
+    def __init__(
+            self, element: IBaseElement, status: str = "200 OK", headers: Iterable[tuple[str, str]] = (),
+            chunk_size: int = 16384, renderer: HtmlRenderer | None = None, encoding: str = "utf-8") -> None:
+        """
+        status: HTTP狀態，例如'200 OK'。
+
+        headers: 額外的回應標頭，未指定'Content-Type'時為'text/html; charset=<encoding>'。
+
+        chunk_size: 每個片段的字元數量。
+        """
+        if chunk_size <= 0:
+            raise ValueError
+        if renderer == None:
+            renderer = HtmlRenderer()
+        self.element = element
+        self.status = status
+        self.headers = _with_content_type(list(headers), encoding)
+        self.chunk_size = chunk_size
+        self.renderer = renderer
+        self.encoding = encoding
+    def __call__(self, environ: dict[str, Any], start_response: Callable[..., Any]) -> Iterator[bytes]:
+        start_response(self.status, self.headers)
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return iter(())
+        return iter(self)
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        逐一產生編碼後的片段；伺服器提前結束回應時('close')會停止渲染。
+        """
+        encode = codecs.getincrementalencoder(self.encoding)().encode
+        for chunk in self.renderer.iter_chunks_sync(self.element, self.chunk_size):
+            yield encode(chunk)
+
+
+class AsgiResponse:
+    """
+    將網頁元素樹包裝成ASGI應用程式(HTTP)，以'more_body'分段傳送回應。
+
+    片段由'HtmlRenderer.iter_chunks'產生，渲染期間會定期交出執行權，網頁元素樹可以含有'AsyncFragment'；
+
+    與'WsgiResponse'相同，'<!DOCTYPE html>'及'head'會在'body'開始渲染前先送出。
+
+    example:
+
+    async def app(scope, receive, send):
+
+        await AsgiResponse(await build_page(scope))(scope, receive, send)
+
+    也可以將'body_iterator()'交給其他框架的串流回應使用(例如Starlette的'StreamingResponse')。
+    """
+    def __init__(
+            self, element: IBaseElement, status: int = 200, headers: Iterable[tuple[str, str]] = (),
+            chunk_size: int = 16384, yield_every: int = 256, renderer: HtmlRenderer | None = None,
+            encoding: str = "utf-8") -> None:
+        """
+        status: HTTP狀態碼。
+
+        headers: 額外的回應標頭，未指定'Content-Type'時為'text/html; charset=<encoding>'。
+
+        chunk_size: 每個片段的字元數量。
+
+        yield_every: 每走訪此數量的網頁元素交出一次執行權。
+        """
+        if chunk_size <= 0 or yield_every <= 0:
+            raise ValueError
+        if renderer == None:
+            renderer = HtmlRenderer()
+        self.element = element
+        self.status = status
+        self.headers = _with_content_type(list(headers), encoding)
+        self.chunk_size = chunk_size
+        self.yield_every = yield_every
+        self.renderer = renderer
+        self.encoding = encoding
+    async def __call__(
+            self, scope: dict[str, Any], receive: Callable[[], Awaitable[dict[str, Any]]],
+            send: Callable[[dict[str, Any]], Awaitable[None]]):
+        if scope["type"] != "http":
+            raise ValueError(f"不支援的ASGI scope：{scope['type']}")
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in self.headers]
+        })
+        if scope.get("method") != "HEAD":
+            async for chunk in self.body_iterator():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    async def body_iterator(self) -> AsyncIterator[bytes]:
+        """
+        逐一產生編碼後的片段。
+        """
+        encode = codecs.getincrementalencoder(self.encoding)().encode
+        async for chunk in self.renderer.iter_chunks(self.element, self.chunk_size, self.yield_every):
+            yield encode(chunk)
+
+
+def _with_content_type(headers: list[tuple[str, str]], encoding: str) -> list[tuple[str, str]]:
+    for name, _ in headers:
+        if name.lower() == "content-type":
+            return headers
+    return [("Content-Type", f"text/html; charset={encoding}")] + headers
@@ -0,0 +1,71 @@
+import os
+from src import *
+
+REPO_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_default_html() -> str:
+    with open(os.path.join(REPO_DIRECTORY, "default.html"), "r", encoding="utf-8") as input_file:
+        return input_file.read()
+
+
+def iter_elements(root: IBaseElement):
+    """
+    依照文件順序走訪'root'及其所有子孫網頁元素(不依賴'ElementIndex')。
+    """
+    stack = [root]
+    while len(stack) > 0:
+        element = stack.pop()
+        yield element
+        stack.extend(reversed(getattr(element, "_element_list", ())))
+
+
+def find_element(root: IBaseElement, id_value: str) -> IBaseElement | None:
+    """
+    走訪整棵樹找出'id'為'id_value'的網頁元素。
+    """
+    target = f'id="{id_value}"'
+    for element in iter_elements(root):
+        if getattr(element, "id_attr", None) == target:
+            return element
+    return None
+
+
+def build_example_document() -> HtmlDocument:
+    """
+    與'example.py'相同的網頁，其渲染結果應與'default.html'相同。
+    """
+    with HtmlDocument() as doc:
+        with HtmlHead(parent_container=doc) as head:
+            pass
+        with HtmlBody(parent_container=doc) as body:
+            body.attach(HtmlHeading("title_1", "Title Example"))
+            body.attach(HtmlParagraph("paragraph_1", "I'm Paragraph 1 ~~~~"))
+            with HtmlDivision("div1", parent_container=body) as div1:
+                div1.attach(HtmlParagraph("paragraph_2", "Test div. In div1"))
+                div1.attach(
+                    HtmlParagraph("paragraph_3", "Span for this paragraph").text_modify(
+                        HtmlSpan("Test_span").set_global_attr({"style": "color:#f00;"})))
+            with HtmlDivision("div2", parent_container=body) as div2:
+                div2.attach(HtmlParagraph("paragraph_4", "Test Form"))
+                with HtmlForm("Form1", parent_container=div2) as form1:
+                    with HtmlParagraph("p_test", parent_container=form1) as p_test:
+                        p_test.attach(HtmlInput("input_name").set_individual_attr({"value": "your name"}))
+                    form1.attach(HtmlInput("input_password").set_individual_attr({"value": "your password"}))
+                    form1.attach(HtmlInput("submit_form", HtmlInput.InputType.SUBMIT).set_individual_attr({"value": "submit"}))
+    return doc
+
+
+def build_rows_document(row_count: int, prefix: str = "row") -> HtmlDocument:
+    """
+    每一列為含有段落及輸入欄位的'div'，所有'id'皆不重複。
+    """
+    with HtmlDocument() as doc:
+        HtmlHead(parent_container=doc)
+        with HtmlBody(parent_container=doc) as body:
+            for index in range(row_count):
+                with HtmlDivision(f"{prefix}_{index}", parent_container=body) as row:
+                    row.set_global_attr({"class_attr": "row"})
+                    row.attach(HtmlParagraph(f"{prefix}_{index}_text", f"text {index} <&>"))
+                    row.attach(HtmlInput(f"{prefix}_{index}_input").set_individual_attr({"value": f"value {index}"}))
+    return doc
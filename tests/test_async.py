@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from src import *
+from tests.support import build_example_document, read_default_html
+
+
+async def resolve(element: IBaseElement | None, delay: float = 0) -> IBaseElement | None:
+    await asyncio.sleep(delay)
+    return element
+
+
+class AsyncRenderTest(unittest.IsolatedAsyncioTestCase):
+    async def test_render_async_matches_sync_render(self):
+        doc = build_example_document()
+        for renderer in (HtmlRenderer(), HtmlRenderer(use_cache=True), HtmlRenderer(subtree_cache=SubtreeCache())):
+            self.assertEqual(await renderer.render_async(doc), read_default_html())
+        chunks = [chunk async for chunk in HtmlRenderer().iter_chunks(doc, chunk_size=16, yield_every=1)]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), read_default_html())
+
+    async def test_fragment_result_is_rendered_in_place(self):
+        division = HtmlDivision("wrap")
+        division.attach(HtmlParagraph("first", "f"))
+        division.attach(AsyncFragment(lambda: resolve(HtmlParagraph("loaded", "<l>"))))
+        division.attach(HtmlParagraph("last", "l"))
+        expected = HtmlDivision("wrap")
+        expected.attach(HtmlParagraph("first", "f"))
+        expected.attach(HtmlParagraph("loaded", "<l>"))
+        expected.attach(HtmlParagraph("last", "l"))
+        self.assertEqual(await HtmlRenderer().render_async(division), expected.render())
+        self.assertEqual(await HtmlRenderer(minify=True).render_async(division), HtmlRenderer(minify=True).render(expected))
+
+    async def test_empty_fragment_as_first_child(self):
+        for source in (lambda: resolve(None), lambda: resolve(LazyChildren(()))):
+            division = HtmlDivision("wrap")
+            division.attach(AsyncFragment(source))
+            division.attach(HtmlParagraph("last", "l"))
+            self.assertEqual(
+                await HtmlRenderer().render_async(division),
+                '<div id="wrap">\n\t<p id="last">l</p>\n</div>')
+
+    async def test_empty_fragments_around_children(self):
+        division = HtmlDivision("wrap")
+        division.attach(AsyncFragment(lambda: resolve(None)))
+        division.attach(HtmlParagraph("middle", "m"))
+        division.attach(AsyncFragment(lambda: resolve(None)))
+        expected = HtmlDivision("wrap")
+        expected.attach(HtmlParagraph("middle", "m"))
+        self.assertEqual(await HtmlRenderer().render_async(division), expected.render())
+
+    async def test_fragments_are_awaited_concurrently(self):
+        # 第一個片段需等待第二個片段執行後才能完成，依序等待時會逾時
+        second_started = asyncio.Event()
+        async def first():
+            await second_started.wait()
+            return HtmlParagraph("first", "1")
+        async def second():
+            second_started.set()
+            return HtmlParagraph("second", "2")
+        body = HtmlBody()
+        body.attach(AsyncFragment(first))
+        body.attach(AsyncFragment(second))
+        result = await asyncio.wait_for(HtmlRenderer().render_async(body), 5)
+        self.assertEqual(result, '<body>\n\t<p id="first">1</p>\n\t<p id="second">2</p>\n</body>')
+
+    async def test_nested_fragments(self):
+        inner = HtmlDivision("inner")
+        inner.attach(AsyncFragment(lambda: resolve(HtmlParagraph("deep", "d"))))
+        body = HtmlBody()
+        body.attach(AsyncFragment(lambda: resolve(inner)))
+        self.assertEqual(
+            await HtmlRenderer().render_async(body),
+            '<body>\n\t<div id="inner">\n\t\t<p id="deep">d</p>\n\t</div>\n</body>')
+
+    async def test_sync_render_rejects_fragment(self):
+        body = HtmlBody()
+        body.attach(AsyncFragment(lambda: resolve(None)))
+        with self.assertRaises(TypeError):
+            HtmlRenderer().render(body)
+
+    async def test_invalid_result(self):
+        body = HtmlBody()
+        body.attach(AsyncFragment(lambda: resolve("text")))
+        with self.assertRaises(TypeError):
+            await HtmlRenderer().render_async(body)
+
+    async def test_write_async_to_stream_writer(self):
+        doc = build_example_document()
+        received = asyncio.get_running_loop().create_future()
+        async def handle(reader, writer):
+            received.set_result(await reader.read())
+            writer.close()
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await doc.stream_async(writer, 64)
+        writer.close()
+        await writer.wait_closed()
+        self.assertEqual((await received).decode("utf-8"), read_default_html())
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    unittest.main()
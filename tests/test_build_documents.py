@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from src import *
+from tests.support import build_example_document, build_rows_document, read_default_html
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as input_file:
+        return input_file.read()
+
+
+def broken_document() -> HtmlDocument:
+    raise RuntimeError("broken")
+
+
+class BuildDocumentsTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_paths_and_sizes(self):
+        jobs = [(partial(build_rows_document, index + 1), f"page_{index}.html") for index in range(6)]
+        with ThreadPoolExecutor(4) as executor:
+            results = build_documents(jobs, self.directory, executor=executor)
+        self.assertEqual([result.index for result in results], list(range(6)))
+        for index, result in enumerate(results):
+            self.assertTrue(result.ok)
+            self.assertEqual(result.html_name, f"page_{index}.html")
+            self.assertEqual(result.path, os.path.join(self.directory, f"page_{index}.html"))
+            expected = build_rows_document(index + 1).render().encode("utf-8")
+            self.assertEqual(read_bytes(result.path), expected)
+            self.assertEqual(result.size, len(expected))
+
+    def test_process_pool_with_document_and_factory(self):
+        jobs = [(build_example_document(), "instance.html"), (build_example_document, "factory.html")]
+        results = build_documents(jobs, self.directory, max_workers=2)
+        expected = read_default_html().encode("utf-8")
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(read_bytes(result.path), expected)
+
+    def test_errors_are_captured_per_document(self):
+        jobs = [
+            (build_example_document, "first.html"),
+            (broken_document, "broken.html"),
+            (lambda: HtmlDivision("not_a_document"), "wrong_type.html"),
+            (build_example_document, os.path.join("missing", "unwritable.html")),
+            (build_example_document, "last.html")]
+        progress = list()
+        with ThreadPoolExecutor(2) as executor:
+            results = build_documents(
+                jobs, self.directory, executor=executor,
+                progress=lambda result, done: progress.append((result.html_name, done)))
+        self.assertEqual([result.ok for result in results], [True, False, False, False, True])
+        self.assertIsInstance(results[1].error, RuntimeError)
+        self.assertIsInstance(results[2].error, TypeError)
+        self.assertIsInstance(results[3].error, FileNotFoundError)
+        self.assertEqual(results[1].size, 0)
+        self.assertIn("error=", repr(results[1]))
+        self.assertEqual(sorted(os.listdir(self.directory)), ["first.html", "last.html"])
+        # 每個檔案(包含失敗的)都只回報一次進度
+        self.assertEqual(sorted(name for name, _ in progress), sorted(name for _, name in jobs))
+        self.assertEqual([done for _, done in progress], list(range(1, 6)))
+
+    def test_max_in_flight_limits_concurrent_renders(self):
+        lock = threading.Lock()
+        active = [0, 0]
+        def factory(index: int) -> HtmlDocument:
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return build_rows_document(index)
+        jobs = ((partial(factory, index), f"page_{index}.html") for index in range(12))
+        with ThreadPoolExecutor(8) as executor:
+            results = build_documents(jobs, self.directory, io_workers=1, max_in_flight=2, executor=executor)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLessEqual(active[1], 2)
+        self.assertEqual(len(os.listdir(self.directory)), 12)
+
+    def test_caller_executor_is_not_shut_down(self):
+        with ThreadPoolExecutor(1) as executor:
+            build_documents([(build_example_document, "page.html")], self.directory, max_workers=1, executor=executor)
+            self.assertEqual(executor.submit(lambda: 1).result(), 1)
+
+    def test_encoding_and_renderer(self):
+        with ThreadPoolExecutor(1) as executor:
+            (result,) = build_documents(
+                [(build_example_document, "page.html")], self.directory,
+                encoding="utf-16", renderer=HtmlRenderer(minify=True), executor=executor)
+        expected = HtmlRenderer(minify=True).render(build_example_document())
+        self.assertEqual(read_bytes(result.path).decode("utf-16"), expected)
+
+    def test_invalid_arguments(self):
+        jobs = [(build_example_document, "page.html")]
+        with self.assertRaises(NotADirectoryError):
+            build_documents(jobs, os.path.join(self.directory, "missing"))
+        with self.assertRaises(ValueError):
+            build_documents(jobs, self.directory, max_in_flight=0)
+        with self.assertRaises(ValueError):
+            build_documents(jobs, self.directory, io_workers=0)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
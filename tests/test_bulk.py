@@ -0,0 +1,61 @@
+import unittest
+from src import *
+
+
+def build_eager_table(columns: list[list], headers: list[str]) -> str:
+    rows = "".join(
+        "\n\t\t<tr>" + "".join(f"<td>{HtmlEscaper.text(value)}</td>" for value in row) + "</tr>"
+        for row in zip(*columns))
+    header_cells = "".join(f"<th>{header}</th>" for header in headers)
+    return (f'<table id="t">\n\t<thead>\n\t\t<tr>{header_cells}</tr>\n\t</thead>\n\t<tbody>{rows}\n\t</tbody>\n</table>')
+
+
+class BulkElementTest(unittest.TestCase):
+    def test_table_from_columns_and_rows(self):
+        columns = [[1, 2, 3], ["a", "<b>", "c & d"]]
+        table = HtmlBulkTable("t", columns={"id": columns[0], "name": columns[1]})
+        self.assertEqual(table.render(), build_eager_table(columns, ["id", "name"]))
+        from_rows = HtmlBulkTable("t", rows=list(zip(*columns)), headers=("id", "name"))
+        self.assertEqual(from_rows.render(), table.render())
+
+    def test_list_items(self):
+        bulk_list = HtmlBulkList("l", ["x", "<y>"], item_attrs={"class_attr": "item"})
+        self.assertEqual(
+            bulk_list.render(), '<ul id="l">\n\t<li class="item">x</li>\n\t<li class="item">&lt;y&gt;</li>\n</ul>')
+
+    def test_in_place_change_with_content_changed(self):
+        ids = [1, 2, 3]
+        names = ["a", "b", "c"]
+        with HtmlDivision("root") as root:
+            table = root.attach(HtmlBulkTable("t", columns={"id": ids, "name": names}))
+            bulk_list = root.attach(HtmlBulkList("l", names))
+        renderers = (HtmlRenderer(subtree_cache=SubtreeCache()), HtmlRenderer(use_cache=True))
+        for renderer in renderers:
+            renderer.render(root)
+        old = HtmlDivision("root")
+        old.attach(HtmlBulkTable("t", columns={"id": list(ids), "name": list(names)}))
+        old.attach(HtmlBulkList("l", list(names)))
+        names[1] = "changed"
+        ids.append(4)
+        names.append("d")
+        table.content_changed()
+        bulk_list.content_changed()
+        for renderer in renderers:
+            self.assertEqual(renderer.render(root), HtmlRenderer().render(root))
+        self.assertIn("<td>changed</td>", HtmlRenderer().render(root))
+        patch = TreeDiff().compare(old, root)
+        self.assertEqual([operation["op"] for operation in patch], ["replace", "replace"])
+
+    def test_reassigning_data(self):
+        table = HtmlBulkTable("t", columns=[[1, 2]])
+        renderer = HtmlRenderer(subtree_cache=SubtreeCache())
+        with HtmlDivision("root") as root:
+            root.attach(table)
+        renderer.render(root)
+        table.columns = [[3, 4]]
+        self.assertEqual(renderer.render(root), HtmlRenderer().render(root))
+        self.assertIn("<td>3</td>", renderer.render(root))
+
+
+if __name__ == "__main__":
+    unittest.main()
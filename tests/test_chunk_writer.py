@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+import unittest
+from src import *
+from tests.support import build_example_document, build_rows_document, read_default_html
+
+
+class _Recorder:
+    """
+    記錄每次寫入的片段。
+    """
+    def __init__(self) -> None:
+        self.chunks: list = list()
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+class _Socket:
+    """
+    只具有'sendall'方法的輸出目標。
+    """
+    def __init__(self) -> None:
+        self.received = bytearray()
+    def sendall(self, data: bytes):
+        self.received += data
+
+
+def build_text(doc: HtmlDocument, encoding: str = "utf-8") -> bytes:
+    with tempfile.TemporaryDirectory() as directory:
+        doc.build(directory, encoding=encoding)
+        with open(os.path.join(directory, "default.html"), "rb") as input_file:
+            return input_file.read()
+
+
+class ChunkWriterTest(unittest.TestCase):
+    def test_chunks_respect_buffer_size(self):
+        doc = build_rows_document(50)
+        expected = doc.render()
+        for buffer_size in (1, 7, 64, 1000, len(expected), 65536):
+            recorder = _Recorder()
+            doc.stream(recorder, buffer_size)
+            self.assertEqual("".join(recorder.chunks), expected)
+            # 除了最後一段之外，每段都恰好是'buffer_size'個字元
+            self.assertTrue(all(len(chunk) == buffer_size for chunk in recorder.chunks[:-1]))
+            self.assertTrue(0 < len(recorder.chunks[-1]) <= buffer_size)
+
+    def test_fragment_longer_than_buffer_is_split(self):
+        recorder = _Recorder()
+        with ChunkWriter(recorder, 4) as writer:
+            writer.write("ab")
+            writer.write("cdefghijk")
+            self.assertEqual(recorder.chunks, ["abcd", "efgh"])
+            writer.write("lm")
+        self.assertEqual(recorder.chunks, ["abcd", "efgh", "ijkl", "m"])
+
+    def test_stream_is_identical_to_build(self):
+        doc = build_example_document()
+        expected = build_text(doc)
+        self.assertEqual(expected, read_default_html().encode("utf-8"))
+        for buffer_size in (1, 13, 65536):
+            output = io.BytesIO()
+            doc.stream(output, buffer_size, "utf-8")
+            self.assertEqual(output.getvalue(), expected)
+            text_output = io.StringIO()
+            doc.stream(text_output, buffer_size)
+            self.assertEqual(text_output.getvalue().encode("utf-8"), expected)
+
+    def test_encoding(self):
+        doc = build_rows_document(20)
+        doc.get_element_by_id("row_3_text").text = "中文內容 <&>"
+        for encoding in ("utf-8", "big5", "utf-16"):
+            expected = build_text(doc, encoding)
+            output = io.BytesIO()
+            doc.stream(output, 16, encoding)
+            # 分段編碼時'utf-16'的'BOM'只會出現在開頭
+            self.assertEqual(output.getvalue(), expected)
+            self.assertEqual(output.getvalue().decode(encoding), doc.render())
+
+    def test_socket_writable(self):
+        doc = build_example_document()
+        sock = _Socket()
+        doc.stream(sock, 32, "utf-8")
+        self.assertEqual(bytes(sock.received), read_default_html().encode("utf-8"))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            ChunkWriter(object())
+        with self.assertRaises(ValueError):
+            ChunkWriter(_Recorder(), 0)
+        with self.assertRaises(TypeError):
+            ChunkWriter(_Recorder(), "64")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+import zlib
+from src import *
+from tests.support import build_example_document, build_rows_document, read_default_html
+
+# 各壓縮方式的解壓縮函式
+DECOMPRESS = {
+    "gzip": gzip.decompress,
+    "zlib": zlib.decompress,
+    "deflate": lambda data: zlib.decompress(data, -15)
+}
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as input_file:
+        return input_file.read()
+
+
+class CompressedBuildTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_round_trip_matches_plain_render(self):
+        doc = build_example_document()
+        expected = read_default_html().encode("utf-8")
+        for method in ("gzip", "zlib", "deflate"):
+            for buffer_size in (16, 65536):
+                paths = doc.build(self.directory, buffer_size=buffer_size, compression=method, write_plain=False)
+                suffix = CompressedWriter.suffix(method)
+                self.assertEqual(paths, [os.path.join(self.directory, "default.html" + suffix)])
+                self.assertEqual(DECOMPRESS[method](read_bytes(paths[0])), expected)
+
+    def test_write_plain_with_several_methods(self):
+        doc = build_rows_document(200)
+        paths = doc.build(self.directory, buffer_size=100, compression=("gzip", "deflate"))
+        full_path = os.path.join(self.directory, "default.html")
+        self.assertEqual(paths, [full_path, full_path + ".gz", full_path + ".deflate"])
+        plain = read_bytes(full_path)
+        self.assertEqual(plain, doc.render().encode("utf-8"))
+        self.assertEqual(gzip.decompress(read_bytes(paths[1])), plain)
+        self.assertEqual(zlib.decompress(read_bytes(paths[2]), -15), plain)
+
+    def test_write_plain_false_skips_plain_file(self):
+        doc = build_example_document()
+        paths = doc.build(self.directory, compression="gzip", write_plain=False)
+        self.assertEqual(os.listdir(self.directory), ["default.html.gz"])
+        self.assertEqual(len(paths), 1)
+
+    def test_gzip_output_is_reproducible(self):
+        doc = build_example_document()
+        first = read_bytes(doc.build(self.directory, compression="gzip", write_plain=False)[0])
+        second = read_bytes(doc.build(self.directory, compression="gzip", write_plain=False)[0])
+        self.assertEqual(first, second)
+
+    def test_encoding(self):
+        doc = build_rows_document(20)
+        doc.get_element_by_id("row_3_text").text = "中文內容 <&>"
+        for encoding in ("big5", "utf-16"):
+            paths = doc.build(self.directory, buffer_size=16, encoding=encoding, compression="gzip")
+            plain = read_bytes(paths[0])
+            # 分段壓縮時'utf-16'的'BOM'只會出現在開頭
+            self.assertEqual(gzip.decompress(read_bytes(paths[1])), plain)
+            self.assertEqual(plain.decode(encoding), doc.render())
+
+    def test_invalid_arguments(self):
+        doc = build_example_document()
+        with self.assertRaises(ValueError):
+            doc.build(self.directory, compression="brotli")
+        with self.assertRaises(ValueError):
+            doc.build(self.directory, write_plain=False)
+        # 不支援的壓縮方式不會留下任何檔案
+        self.assertEqual(os.listdir(self.directory), [])
+        with self.assertRaises(ValueError):
+            CompressedWriter(io.BytesIO(), "gzip", 10)
+        with self.assertRaises(TypeError):
+            CompressedWriter(object())
+
+
+class TeeWriterTest(unittest.TestCase):
+    def test_writes_to_every_target(self):
+        first = io.StringIO()
+        second = io.StringIO()
+        compressed = io.BytesIO()
+        with CompressedWriter(compressed, "zlib") as compressed_writer:
+            tee = TeeWriter(first, second, compressed_writer)
+            build_example_document().stream(tee, 32)
+        expected = read_default_html()
+        self.assertEqual(first.getvalue(), expected)
+        self.assertEqual(second.getvalue(), expected)
+        self.assertEqual(zlib.decompress(compressed.getvalue()).decode("utf-8"), expected)
+
+    def test_rejects_target_without_write(self):
+        with self.assertRaises(TypeError):
+            TeeWriter(io.StringIO(), object())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+import random
+import unittest
+from html.parser import HTMLParser
+from src import *
+
+
+class _Node:
+    """
+    測試用的簡易DOM節點，用於套用'TreeDiff'產生的操作。
+    """
+    def __init__(self, tag: str, attrs: dict[str, str]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        # 網頁元素節點及文字交錯的列表
+        self.children: list = list()
+    def elements(self) -> list["_Node"]:
+        return [child for child in self.children if isinstance(child, _Node)]
+    def canonical(self) -> tuple:
+        children = list()
+        for child in self.children:
+            if isinstance(child, _Node):
+                children.append(child.canonical())
+            elif len(children) > 0 and isinstance(children[-1], str):
+                children[-1] += child
+            else:
+                children.append(child)
+        return (self.tag, tuple(sorted(self.attrs.items())), tuple(children))
+
+
+class _TreeBuilder(HTMLParser):
+    _void_tags = frozenset(("input", "br", "img", "hr", "meta", "link"))
+    def __init__(self) -> None:
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.root = _Node("#fragment", dict())
+        self.stack = [self.root]
+    def handle_starttag(self, tag, attrs):
+        node = _Node(tag, {name: value if value != None else "" for name, value in attrs})
+        self.stack[-1].children.append(node)
+        if tag not in self._void_tags:
+            self.stack.append(node)
+    def handle_endtag(self, tag):
+        self.stack.pop()
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_fragment(source: str) -> list:
+    builder = _TreeBuilder()
+    builder.feed(source)
+    builder.close()
+    return builder.root.children
+
+
+def to_dom(element: IBaseElement) -> _Node:
+    (node,) = [child for child in parse_fragment(HtmlRenderer(minify=True).render(element)) if isinstance(child, _Node)]
+    return node
+
+
+def apply_patch(root: _Node, patch: list[dict]) -> _Node:
+    holder = _Node("#holder", dict())
+    holder.children.append(root)
+    for operation in patch:
+        path = [0] + operation["path"]
+        parent = holder
+        for index in path[:-1]:
+            parent = parent.elements()[index]
+        siblings = parent.elements()
+        position = path[-1]
+        if operation["op"] == "remove":
+            parent.children.remove(siblings[position])
+        elif operation["op"] == "insert":
+            (node,) = parse_fragment(operation["html"])
+            if position < len(siblings):
+                parent.children.insert(parent.children.index(siblings[position]), node)
+            else:
+                parent.children.append(node)
+        elif operation["op"] == "replace":
+            (node,) = parse_fragment(operation["html"])
+            parent.children[parent.children.index(siblings[position])] = node
+        elif operation["op"] == "set_attr":
+            if operation["value"] == None:
+                del siblings[position].attrs[operation["name"]]
+            else:
+                siblings[position].attrs[operation["name"]] = operation["value"]
+        elif operation["op"] == "set_text":
+            siblings[position].children = parse_fragment(operation["text"])
+    return holder.elements()[0]
+
+
+def build_body(rows: list[tuple[str, str]]) -> HtmlBody:
+    with HtmlBody() as body:
+        for id_value, text in rows:
+            with HtmlDivision(id_value, parent_container=body) as division:
+                division.attach(HtmlParagraph(f"{id_value}_text", text))
+    return body
+
+
+class TreeDiffTest(unittest.TestCase):
+    def assert_patch_applies(self, old: IBaseElement, new: IBaseElement) -> list[dict]:
+        patch = TreeDiff().compare(old, new)
+        self.assertEqual(apply_patch(to_dom(old), patch).canonical(), to_dom(new).canonical())
+        return patch
+
+    def test_identical_trees(self):
+        rows = [(f"row_{index}", f"text {index}") for index in range(5)]
+        self.assertEqual(TreeDiff().compare(build_body(rows), build_body(rows)), [])
+
+    def test_single_text_change_in_large_document(self):
+        # 網頁元素數量超過'SubtreeCache'結構編號表的預設上限
+        def build(changed: bool) -> HtmlDocument:
+            with HtmlDocument() as doc:
+                with HtmlBody(parent_container=doc) as body:
+                    for index in range(20000):
+                        text = "changed" if changed == True and index == 12345 else f"paragraph {index}"
+                        body.attach(HtmlParagraph(f"p_{index}", text))
+            return doc
+        patch = TreeDiff().compare(build(False), build(True))
+        self.assertEqual(patch, [{"op": "set_text", "path": [0, 12345], "text": "changed"}])
+
+    def test_attribute_changes(self):
+        old = build_body([("a", "x"), ("b", "y")])
+        new = build_body([("a", "x"), ("b", "y")])
+        new.get_element_by_id("a").set_global_attr({"title": "t \"q\"", "class_attr": "c"})
+        old.get_element_by_id("b").set_global_attr({"title": "removed"})
+        patch = self.assert_patch_applies(old, new)
+        self.assertEqual(set(operation["op"] for operation in patch), {"set_attr"})
+
+    def test_attributes_are_read_from_the_attribute_table(self):
+        # 'HtmlInput.value'輸出時不含屬性名稱，不能由輸出字串解析
+        old = HtmlInput("field").set_individual_attr({"value": "old value"})
+        new = HtmlInput("field").set_individual_attr({"value": "new value"})
+        self.assertEqual(TreeDiff().compare(old, new), [{"op": "set_attr", "path": [], "name": "value", "value": "new value"}])
+        new.input_type = HtmlInput.InputType.EMAIL
+        new.set_global_attr({"hidden": True, "data": ("key", "a&b"), "spellcheck": False, "tabindex": 3})
+        self.assertEqual(TreeDiff.html_attributes(new), {
+            "type": "email", "value": "new value", "data-key": "a&b",
+            "hidden": "", "spellcheck": "false", "id": "field", "tabindex": "3"})
+        new.set_global_attr({"title": Markup("a &amp; b")})
+        self.assertEqual(TreeDiff.html_attributes(new)["title"], "a & b")
+
+    def test_insert_remove_and_reorder(self):
+        old = build_body([("a", "1"), ("b", "2"), ("c", "3"), ("d", "4")])
+        new = build_body([("d", "4"), ("a", "1"), ("e", "5"), ("c", "3 <changed>")])
+        self.assert_patch_applies(old, new)
+
+    def test_replace_on_type_change(self):
+        old = build_body([("a", "1")])
+        new = HtmlBody()
+        new.attach(HtmlParagraph("a", "1"))
+        patch = self.assert_patch_applies(old, new)
+        self.assertEqual([operation["op"] for operation in patch], ["replace"])
+
+    def test_escaped_text(self):
+        old = build_body([("a", "1 & 2")])
+        new = build_body([("a", "1 < 2")])
+        patch = self.assert_patch_applies(old, new)
+        self.assertEqual(patch, [{"op": "set_text", "path": [0, 0], "text": "1 &lt; 2"}])
+
+    def test_switch_from_children_to_text(self):
+        old = HtmlBody()
+        old.attach(HtmlParagraph("p", "t")).attach(HtmlSpan("s"))
+        new = HtmlBody()
+        new.attach(HtmlParagraph("p", "t"))
+        patch = self.assert_patch_applies(old, new)
+        self.assertEqual([operation["op"] for operation in patch], ["replace"])
+        new.get_element_by_id("p").text = "changed"
+        self.assert_patch_applies(old, new)
+
+    def test_switch_from_text_to_children(self):
+        old = HtmlBody()
+        old.attach(HtmlParagraph("p", "t"))
+        new = HtmlBody()
+        new.attach(HtmlParagraph("p", "other")).attach(HtmlDivision("d"))
+        patch = self.assert_patch_applies(old, new)
+        self.assertEqual([operation["op"] for operation in patch], ["replace"])
+
+    def test_random_edits(self):
+        generator = random.Random(20240601)
+        texts = ("x", "y", "<z>", "x & y")
+        titles = (None, "a", "b & c", "\"q\"")
+        def build(spec: list) -> HtmlBody:
+            body = HtmlBody()
+            stack = [(body, spec)]
+            while len(stack) > 0:
+                parent, children = stack.pop()
+                for id_value, kind, value, title in children:
+                    if kind == "div":
+                        element = parent.attach(HtmlDivision(id_value))
+                    else:
+                        element = parent.attach(HtmlParagraph(id_value, value if isinstance(value, str) else "ignored"))
+                    if isinstance(value, list):
+                        stack.append((element, value))
+                    if title != None:
+                        element.set_global_attr({"title": title})
+            return body
+        def random_spec(depth: int, prefix: str) -> list:
+            spec = list()
+            for index in range(generator.randint(0, 4)):
+                id_value = f"{prefix}{index}"
+                roll = generator.random()
+                if depth < 3 and roll < 0.3:
+                    value = random_spec(depth + 1, id_value + "_")
+                    spec.append((id_value, "div", value, generator.choice(titles)))
+                elif depth < 3 and roll < 0.45:
+                    value = random_spec(depth + 1, id_value + "_")
+                    spec.append((id_value, "p", value, generator.choice(titles)))
+                else:
+                    spec.append((id_value, "p", generator.choice(texts), generator.choice(titles)))
+            return spec
+        def mutate(spec: list) -> list:
+            spec = list(spec)
+            if generator.random() < 0.2:
+                generator.shuffle(spec)
+            if len(spec) > 0 and generator.random() < 0.3:
+                del spec[generator.randrange(len(spec))]
+            if generator.random() < 0.3:
+                spec.insert(generator.randint(0, len(spec)), (f"n{generator.randrange(1000)}", "p", "new", None))
+            result = list()
+            for id_value, kind, value, title in spec:
+                roll = generator.random()
+                if kind == "p" and roll < 0.15:
+                    # 在文字內容與子元素之間切換
+                    value = generator.choice(texts) if isinstance(value, list) else [(id_value + "_c", "p", "child", None)]
+                elif isinstance(value, list):
+                    value = mutate(value)
+                elif roll < 0.4:
+                    value = generator.choice(texts)
+                if generator.random() < 0.1:
+                    title = generator.choice(titles)
+                result.append((id_value, kind, value, title))
+            return result
+        for _ in range(300):
+            old_spec = random_spec(0, "e")
+            self.assert_patch_applies(build(old_spec), build(mutate(old_spec)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from src import *
+
+
+class AttributeMarkupTest(unittest.TestCase):
+    def test_switch_attribute_between_str_and_markup(self):
+        with HtmlDivision("root") as root:
+            with HtmlDivision("inner", parent_container=root) as inner:
+                inner.attach(HtmlParagraph("text", "t"))
+        renderers = (HtmlRenderer(subtree_cache=SubtreeCache()), HtmlRenderer(use_cache=True))
+        for value in ("a&amp;b", Markup("a&amp;b"), "a&amp;b"):
+            inner.set_global_attr({"title": value})
+            expected = HtmlRenderer().render(root)
+            for renderer in renderers:
+                self.assertEqual(renderer.render(root), expected)
+        self.assertIn('title="a&amp;amp;b"', HtmlRenderer().render(root))
+        inner.title = Markup("a&amp;b")
+        self.assertIn('title="a&amp;b"', renderers[0].render(root))
+
+    def test_diff_reports_markup_attribute(self):
+        def build(value: str) -> HtmlDivision:
+            division = HtmlDivision("d")
+            division.set_global_attr({"title": value})
+            return division
+        patch = TreeDiff().compare(build("a&amp;b"), build(Markup("a&amp;b")))
+        self.assertEqual(patch, [{"op": "set_attr", "path": [], "name": "title", "value": "a&b"}])
+
+    def test_text_and_attributes_are_escaped(self):
+        paragraph = HtmlParagraph("p", "<b> & \"x\"")
+        paragraph.set_global_attr({"title": "\"<quoted>\" & more"})
+        self.assertEqual(
+            paragraph.render(),
+            '<p id="p" title="&quot;&lt;quoted&gt;&quot; &amp; more">&lt;b&gt; &amp; "x"</p>')
+        self.assertEqual(HtmlParagraph("p", Markup("<b>bold</b>")).render(), '<p id="p"><b>bold</b></p>')
+
+
+if __name__ == "__main__":
+    unittest.main()
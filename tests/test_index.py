@@ -0,0 +1,58 @@
+import unittest
+from src import *
+from tests.support import build_rows_document
+
+
+class ElementIndexTest(unittest.TestCase):
+    def test_index_of_one_tree_does_not_reach_other_trees(self):
+        indexed = build_rows_document(5)
+        self.assertIsNotNone(indexed.get_element_by_id("row_2_text"))
+        other = build_rows_document(5, prefix="other")
+        # 不透過查詢取得'body'，避免為該樹建立索引
+        body = other._element_list[-1]
+        with HtmlDivision("extra", parent_container=body) as extra:
+            extra.attach(HtmlParagraph("extra_text", "text"))
+        self.assertIsNone(ElementIndex.find(extra))
+        self.assertIsNone(ElementIndex.find(extra._element_list[0]))
+
+    def test_attach_and_attribute_changes_update_the_index(self):
+        doc = build_rows_document(5)
+        body = doc.get_element_by_id("row_0")._parent
+        with HtmlDivision("added", parent_container=body) as added:
+            added.attach(HtmlParagraph("added_text", "text").set_global_attr({"class_attr": "note"}))
+        self.assertIs(doc.get_element_by_id("added_text"), added._element_list[0])
+        self.assertEqual(doc.get_elements_by_class("note"), [added._element_list[0]])
+        paragraph = doc.get_element_by_id("row_3_text")
+        paragraph.id_attr = "renamed"
+        paragraph.set_global_attr({"class_attr": "note"})
+        self.assertIsNone(doc.get_element_by_id("row_3_text"))
+        self.assertIs(doc.get_element_by_id("renamed"), paragraph)
+        self.assertEqual(list(doc.select(".note")), [paragraph, added._element_list[0]])
+        heading = body.attach(HtmlHeading("heading", "title", 2))
+        heading.style_number = 3
+        self.assertEqual(list(doc.select("h3")), [heading])
+        self.assertEqual(list(doc.select("h2")), [])
+
+    def test_indexed_subtree_attached_to_other_trees(self):
+        subtree = HtmlDivision("subtree")
+        inner = subtree.attach(HtmlDivision("inner"))
+        inner.attach(HtmlParagraph("inner_text", "text"))
+        self.assertIsNotNone(subtree.get_element_by_id("inner_text"))
+        # 附加到未建立索引的樹後，子樹不再持有原本的索引
+        plain = HtmlDivision("plain")
+        plain.attach(subtree)
+        self.assertIsNone(ElementIndex.find(inner))
+        inner.attach(HtmlParagraph("late_text", "text"))
+        self.assertIs(plain.get_element_by_id("late_text"), inner._element_list[1])
+        # 附加到已建立索引的樹後，改由該樹的索引維護
+        doc = build_rows_document(3)
+        doc.get_element_by_id("row_0")
+        doc.get_element_by_id("row_1").attach(plain)
+        self.assertIs(ElementIndex.find(inner), doc.element_index)
+        inner.attach(HtmlParagraph("later_text", "text"))
+        self.assertIs(doc.get_element_by_id("later_text"), inner._element_list[2])
+        self.assertIs(inner.get_element_by_id("inner_text"), inner._element_list[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import multiprocessing
+import unittest
+from src import *
+from tests.support import build_example_document, build_rows_document, find_element, read_default_html
+
+
+class ParallelRendererTest(unittest.TestCase):
+    def test_matches_serial_renderer(self):
+        doc = build_rows_document(40)
+        cases = (
+            (ParallelRenderer(max_workers=2), HtmlRenderer()),
+            (ParallelRenderer(max_workers=2, minify=True), HtmlRenderer(minify=True)),
+            (ParallelRenderer(max_workers=2, use_cache=True), HtmlRenderer()),
+            (ParallelRenderer(max_workers=2, subtree_cache=SubtreeCache()), HtmlRenderer()),
+        )
+        for parallel, serial in cases:
+            self.assertEqual(parallel.render(doc), serial.render(doc))
+        self.assertEqual(ParallelRenderer(max_workers=2, split_depth=1).render(build_example_document()), read_default_html())
+
+    def test_render_to_sink(self):
+        doc = build_rows_document(20)
+        sink = ParallelRenderer(max_workers=2).render(doc, list())
+        self.assertEqual("".join(sink), HtmlRenderer().render(doc))
+
+    def test_spawn_context(self):
+        doc = build_rows_document(10)
+        renderer = ParallelRenderer(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+        self.assertEqual(renderer.render(doc), HtmlRenderer().render(doc))
+
+    def test_edit_after_parallel_render_with_cache(self):
+        doc = build_rows_document(20)
+        parallel = ParallelRenderer(max_workers=2, use_cache=True)
+        serial = HtmlRenderer(use_cache=True)
+        parallel.render(doc)
+        serial.render(doc)
+        # 子樹是在子行程渲染的，主行程中的變更仍須傳遞至上級容器
+        find_element(doc, "row_3_text").text = "CHANGED"
+        expected = HtmlRenderer().render(doc)
+        self.assertIn("CHANGED", expected)
+        self.assertEqual(serial.render(doc), expected)
+        self.assertEqual(parallel.render(doc), expected)
+        find_element(doc, "row_15").set_global_attr({"title": "edited"})
+        expected = HtmlRenderer().render(doc)
+        self.assertEqual(parallel.render(doc), expected)
+        self.assertEqual(serial.render(doc), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from src import *
+from tests.support import build_example_document, build_rows_document, read_default_html
+
+
+def feed_in_pieces(text: str, size: int) -> IBaseElement:
+    parser = HtmlParser()
+    for index in range(0, len(text), size):
+        parser.feed(text[index:index + size])
+    return parser.close()
+
+
+class HtmlParserTest(unittest.TestCase):
+    def test_round_trip_default_html(self):
+        source = read_default_html()
+        self.assertEqual(parse_html(source).render(), source)
+        minified = HtmlRenderer(minify=True).render(build_example_document())
+        self.assertEqual(HtmlRenderer(minify=True).render(parse_html(minified)), minified)
+
+    def test_feed_one_character_at_a_time(self):
+        source = read_default_html()
+        self.assertEqual(feed_in_pieces(source, 1).render(), source)
+        for size in (2, 3, 7, 64):
+            self.assertEqual(feed_in_pieces(source, size).render(), source)
+
+    def test_comment_containing_greater_than(self):
+        source = (
+            '<!DOCTYPE html>\n<html>\n\t<body>\n\t\t<div id="d">\n\t\t\t<!-- a > b -- c -->\n'
+            '\t\t\t<p id="p" title="x &gt; y">t</p>\n\t\t</div>\n\t</body>\n</html>')
+        expected = parse_html(source).render()
+        self.assertNotIn("<!--", expected)
+        for size in (1, 2, 5, 13):
+            self.assertEqual(feed_in_pieces(source, size).render(), expected)
+
+    def test_attribute_quotes_containing_greater_than(self):
+        source = '<div id="d" title="a > b"><p id="p" title=\'<x>\'>t</p></div>'
+        expected = parse_html(source)
+        self.assertEqual(expected.get_element_by_id("d")._attr_table[-1], "a > b")
+        self.assertEqual(feed_in_pieces(source, 1).render(), expected.render())
+
+    def test_text_and_attribute_escaping_round_trip(self):
+        doc = build_rows_document(20)
+        doc.get_element_by_id("row_3").set_global_attr({"title": "\"quoted\" & <tag>"})
+        source = doc.render()
+        parsed = parse_html(source)
+        self.assertEqual(parsed.render(), source)
+        self.assertEqual(parsed.get_element_by_id("row_3_text").text, "text 3 &lt;&amp;&gt;")
+        self.assertIsInstance(parsed.get_element_by_id("row_3_text").text, Markup)
+
+    def test_parse_file(self):
+        doc = build_rows_document(50)
+        with tempfile.TemporaryDirectory() as directory:
+            doc.build(directory)
+            path = os.path.join(directory, "default.html")
+            for chunk_size in (1, 100, 65536):
+                self.assertEqual(parse_file(path, chunk_size=chunk_size).render(), doc.render())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            parse_html("<table></table>")
+        with self.assertRaises(ValueError):
+            parse_html("<div id=\"d\"></p>")
+        with self.assertRaises(ValueError):
+            parse_html("<div id=\"d\">")
+        with self.assertRaises(ValueError):
+            parse_html("<div id=\"a\"></div><div id=\"b\"></div>")
+        parser = HtmlParser()
+        parser.feed("<div id=\"d\"></div>")
+        parser.close()
+        with self.assertRaises(ValueError):
+            parser.feed("<div></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
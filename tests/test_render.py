@@ -0,0 +1,185 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src import *
+from tests.support import build_example_document, build_rows_document, find_element, iter_elements, read_default_html
+
+
+class RepeatedRenderTest(unittest.TestCase):
+    def test_render_matches_default_html(self):
+        self.assertEqual(build_example_document().render(), read_default_html())
+
+    def test_repeated_render_is_identical(self):
+        doc = build_example_document()
+        expected = read_default_html()
+        renderers = (HtmlRenderer(), HtmlRenderer(use_cache=True), HtmlRenderer(subtree_cache=SubtreeCache()))
+        for renderer in renderers:
+            for _ in range(5):
+                self.assertEqual(renderer.render(doc), expected)
+        minified = HtmlRenderer(minify=True)
+        first = minified.render(doc)
+        for _ in range(5):
+            self.assertEqual(minified.render(doc), first)
+        # 壓縮輸出不會影響一般格式的快取
+        self.assertEqual(HtmlRenderer(use_cache=True).render(doc), expected)
+
+    def test_render_does_not_mutate_indent_tab(self):
+        doc = build_example_document()
+        before = [element.indent_tab for element in iter_elements(doc)]
+        for _ in range(3):
+            doc.render()
+        self.assertEqual([element.indent_tab for element in iter_elements(doc)], before)
+
+    def test_build_twice_writes_same_file(self):
+        doc = build_example_document()
+        with tempfile.TemporaryDirectory() as directory:
+            contents = list()
+            for _ in range(2):
+                doc.build(directory)
+                with open(os.path.join(directory, "default.html"), "r", encoding="utf-8") as input_file:
+                    contents.append(input_file.read())
+        self.assertEqual(contents, [read_default_html()]*2)
+
+    def test_subtree_render_at_depth(self):
+        doc = build_example_document()
+        division = find_element(doc, "div1")
+        expected = HtmlRenderer().render(division, depth=2)
+        self.assertEqual(division.render(depth=2), expected)
+        self.assertEqual(division.render(depth=2, renderer=HtmlRenderer(use_cache=True)), expected)
+        # 以不同深度渲染後，原本深度的快取不能被沿用
+        cached = HtmlRenderer(use_cache=True)
+        self.assertEqual(cached.render(division, depth=1), HtmlRenderer().render(division, depth=1))
+        self.assertEqual(cached.render(doc), read_default_html())
+
+    def test_prebuilt_subtree_attached_later(self):
+        # 先建立完成的子樹之後再附加到其他容器，縮排應與直接在容器中建立時相同
+        with HtmlDivision("outer") as outer:
+            pass
+        with HtmlDivision("inner") as inner:
+            inner.attach(HtmlParagraph("inner_text", "text"))
+        outer.attach(inner)
+        with HtmlDivision("outer") as expected:
+            with HtmlDivision("inner", parent_container=expected) as expected_inner:
+                expected_inner.attach(HtmlParagraph("inner_text", "text"))
+        for _ in range(2):
+            self.assertEqual(outer.render(), expected.render())
+
+
+    def test_eager_build_snapshot_is_not_used_for_rendering(self):
+        Container.lazy_build = False
+        try:
+            doc = build_example_document()
+        finally:
+            Container.lazy_build = True
+        division = find_element(doc, "div1")
+        snapshot = division.container_content
+        find_element(doc, "paragraph_2").text = "changed"
+        # 快照不會更新，但渲染的結果會反映變更
+        self.assertEqual(division.container_content, snapshot)
+        self.assertIn("changed", doc.render())
+        self.assertEqual(doc.render(), HtmlRenderer().render(doc))
+
+
+class ConcurrentRenderTest(unittest.TestCase):
+    def test_concurrent_render_of_one_tree(self):
+        doc = build_rows_document(200)
+        expected = HtmlRenderer().render(doc)
+        for renderer in (HtmlRenderer(), HtmlRenderer(use_cache=True)):
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(lambda _: renderer.render(doc), range(64)))
+            self.assertEqual(results, [expected]*64)
+
+    def test_concurrent_render_with_separate_renderers(self):
+        doc = build_rows_document(200)
+        expected = HtmlRenderer().render(doc)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda _: HtmlRenderer(use_cache=True).render(doc), range(32)))
+        self.assertEqual(results, [expected]*32)
+
+
+class MutateThenRerenderTest(unittest.TestCase):
+    def assert_fresh(self, renderer: HtmlRenderer, doc: HtmlDocument):
+        self.assertEqual(renderer.render(doc), HtmlRenderer().render(doc))
+
+    def test_mutations_are_reflected_by_cached_render(self):
+        doc = build_rows_document(20)
+        renderer = HtmlRenderer(use_cache=True)
+        renderer.render(doc)
+        paragraph = find_element(doc, "row_7_text")
+        paragraph.text = "changed <text>"
+        self.assert_fresh(renderer, doc)
+        find_element(doc, "row_3").set_global_attr({"title": "third", "class_attr": "row odd"})
+        self.assert_fresh(renderer, doc)
+        find_element(doc, "row_5_input").set_individual_attr({"value": "new \"value\""})
+        self.assert_fresh(renderer, doc)
+        find_element(doc, "row_9").attach(HtmlParagraph("extra", "appended"))
+        self.assert_fresh(renderer, doc)
+        find_element(doc, "row_11").indent_tab = 2
+        self.assert_fresh(renderer, doc)
+        paragraph.text_modify(HtmlSpan("mark"))
+        self.assert_fresh(renderer, doc)
+        # 將已有子元素的段落附加到其他容器
+        moved = HtmlDivision("moved")
+        moved.attach(HtmlParagraph("moved_text", "moved"))
+        renderer.render(moved)
+        find_element(doc, "row_0").attach(moved)
+        self.assert_fresh(renderer, doc)
+
+    def test_mutated_tree_matches_tree_built_with_same_values(self):
+        doc = build_rows_document(10)
+        renderer = HtmlRenderer(use_cache=True)
+        renderer.render(doc)
+        for index in range(10):
+            find_element(doc, f"row_{index}_text").text = f"text {index} <&>"
+        # 設置相同的值後輸出不變
+        self.assertEqual(renderer.render(doc), HtmlRenderer().render(build_rows_document(10)))
+        find_element(doc, "row_4_text").text = "changed"
+        expected_doc = build_rows_document(10)
+        find_element(expected_doc, "row_4_text").text = "changed"
+        self.assertEqual(renderer.render(doc), HtmlRenderer().render(expected_doc))
+
+    def test_attribute_edits_in_any_order(self):
+        renderer = HtmlRenderer(use_cache=True)
+        paragraph = HtmlParagraph("p", "text")
+        renderer.render(paragraph)
+        # 屬性值恰好與其他屬性的名稱相同
+        paragraph.set_global_attr({"title": "class_attr", "tabindex": 2})
+        paragraph.set_global_attr({"class_attr": "title"})
+        self.assert_fresh(renderer, paragraph)
+        paragraph.set_global_attr({"title": "title", "class_attr": "row"})
+        self.assert_fresh(renderer, paragraph)
+        expected = HtmlParagraph("p", "text").set_global_attr({"class_attr": "row", "tabindex": 2, "title": "title"})
+        self.assertEqual(renderer.render(paragraph), HtmlRenderer().render(expected))
+        input_element = HtmlInput("i").set_individual_attr({"value": "v"})
+        input_element.input_type = HtmlInput.InputType.EMAIL
+        self.assertEqual(input_element.render(), HtmlInput("i", HtmlInput.InputType.EMAIL).set_individual_attr({"value": "v"}).render())
+
+    def test_invalid_heading_level_leaves_tree_clean(self):
+        doc = build_example_document()
+        renderer = HtmlRenderer(use_cache=True)
+        renderer.render(doc)
+        heading = find_element(doc, "title_1")
+        for new_val, error in ((7, ValueError), ("2", TypeError)):
+            with self.assertRaises(error):
+                heading.style_number = new_val
+            self.assertEqual(heading.style_number, 1)
+            self.assertFalse(heading._dirty)
+            self.assertFalse(doc._dirty)
+        heading.style_number = 2
+        self.assertTrue(doc._dirty)
+        self.assert_fresh(renderer, doc)
+
+    def test_mutation_between_renders_of_two_renderers(self):
+        doc = build_rows_document(10)
+        first = HtmlRenderer(use_cache=True)
+        second = HtmlRenderer(use_cache=True, minify=True)
+        first.render(doc)
+        second.render(doc)
+        find_element(doc, "row_2_text").text = "changed"
+        self.assertEqual(first.render(doc), HtmlRenderer().render(doc))
+        self.assertEqual(second.render(doc), HtmlRenderer(minify=True).render(doc))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from src import *
+from tests.support import build_example_document, build_rows_document, find_element, iter_elements
+
+
+def ids(elements) -> list[str]:
+    return [ElementIndex.attr_value(element, "id_attr") for element in elements]
+
+
+class CssSelectorTest(unittest.TestCase):
+    def setUp(self):
+        self.doc = build_example_document()
+
+    def test_tag_id_and_class(self):
+        self.assertEqual(ids(self.doc.select("div")), ["div1", "div2"])
+        self.assertEqual(ids(self.doc.select("#paragraph_3")), ["paragraph_3"])
+        self.assertEqual(ids(self.doc.select("p#paragraph_3")), ["paragraph_3"])
+        self.assertEqual(ids(self.doc.select("span")), [])
+        rows = build_rows_document(3)
+        self.assertEqual(ids(rows.select(".row")), ["row_0", "row_1", "row_2"])
+        self.assertEqual(ids(rows.select("div.row.missing")), [])
+
+    def test_attributes(self):
+        self.assertEqual(ids(self.doc.select("input[type=submit]")), ["submit_form"])
+        self.assertEqual(ids(self.doc.select("[type='text']")), ["input_name", "input_password"])
+        self.assertEqual(ids(self.doc.select("input[value]")), ["input_name", "input_password", "submit_form"])
+        self.assertEqual(ids(self.doc.select("[style]")), [])
+
+    def test_combinators(self):
+        self.assertEqual(ids(self.doc.select("div p")), ["paragraph_2", "paragraph_3", "paragraph_4", "p_test"])
+        self.assertEqual(ids(self.doc.select("form > input")), ["input_password", "submit_form"])
+        self.assertEqual(ids(self.doc.select("form input")), ["input_name", "input_password", "submit_form"])
+        self.assertEqual(ids(self.doc.select("#div2 > p")), ["paragraph_4"])
+        self.assertEqual(ids(self.doc.select("h1, #div1 > p")), ["title_1", "paragraph_2", "paragraph_3"])
+        self.assertIs(self.doc.select_one("form#Form1 > p input"), find_element(self.doc, "input_name"))
+        self.assertIsNone(self.doc.select_one("form > span"))
+
+    def test_scoped_to_container(self):
+        div2 = find_element(self.doc, "div2")
+        self.assertEqual(ids(div2.select("p")), ["paragraph_4", "p_test"])
+        self.assertEqual(ids(div2.select("div")), [])
+
+    def test_universal(self):
+        elements = list(self.doc.select("*"))
+        self.assertEqual(elements, list(iter_elements(self.doc))[1:])
+
+    def test_streaming_placeholders_are_not_selected(self):
+        doc = build_rows_document(2)
+        body = find_element(doc, "row_0")._parent
+        body.attach(LazyChildren(lambda: (f"lazy {index}" for index in range(3))))
+        self.assertEqual(len(list(doc.select("*"))), len(list(build_rows_document(2).select("*"))))
+        self.assertEqual(ids(doc.select("body > *")), ["row_0", "row_1"])
+        self.assertEqual(doc.element_index.get_by_tag(""), [])
+
+    def test_invalid_selector(self):
+        with self.assertRaises(ValueError):
+            CssSelector.compile("div >")
+
+
+if __name__ == "__main__":
+    unittest.main()
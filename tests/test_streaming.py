@@ -0,0 +1,66 @@
+import unittest
+from src import *
+
+
+def build_division(first_source, last_source=()) -> HtmlDivision:
+    division = HtmlDivision("wrap")
+    division.attach(LazyChildren(first_source))
+    division.attach(HtmlParagraph("middle", "m"))
+    division.attach(LazyChildren(last_source))
+    return division
+
+
+def build_eager_division(first_texts, last_texts=()) -> HtmlDivision:
+    division = HtmlDivision("wrap")
+    for text in first_texts:
+        division.attach(HtmlParagraph("", text))._set_attr_value("id_attr", None)
+    division.attach(HtmlParagraph("middle", "m"))
+    for text in last_texts:
+        division.attach(HtmlParagraph("", text))._set_attr_value("id_attr", None)
+    return division
+
+
+class LazyChildrenTest(unittest.TestCase):
+    def assert_same_as_eager(self, first_texts, last_texts=()):
+        lazy = build_division(lambda: iter(first_texts), lambda: iter(last_texts))
+        eager = build_eager_division(first_texts, last_texts)
+        for renderer in (HtmlRenderer(), HtmlRenderer(minify=True), HtmlRenderer(use_cache=True),
+                         HtmlRenderer(subtree_cache=SubtreeCache())):
+            self.assertEqual(renderer.render(lazy), renderer.render(eager))
+            self.assertEqual(renderer.render(lazy), renderer.render(eager))
+
+    def test_empty_first_child(self):
+        self.assert_same_as_eager([])
+        self.assertEqual(
+            build_division(lambda: iter(())).render(),
+            '<div id="wrap">\n\t<p id="middle">m</p>\n</div>')
+
+    def test_empty_first_and_last_children(self):
+        self.assert_same_as_eager([], [])
+
+    def test_non_empty_children(self):
+        self.assert_same_as_eager(["a", "b"], ["c"])
+        self.assert_same_as_eager(["a"], [])
+
+    def test_nested_empty_streams(self):
+        division = HtmlDivision("wrap")
+        division.attach(LazyChildren(lambda: iter([LazyChildren(lambda: iter(()))])))
+        division.attach(LazyChildren(lambda: iter(())))
+        division.attach(HtmlParagraph("last", "l"))
+        self.assertEqual(division.render(), '<div id="wrap">\n\t<p id="last">l</p>\n</div>')
+
+    def test_only_empty_stream(self):
+        division = HtmlDivision("wrap")
+        division.attach(LazyChildren(lambda: iter(())))
+        self.assertEqual(division.render(), HtmlDivision("wrap").render())
+
+    def test_items_with_attributes(self):
+        body = HtmlBody()
+        body.attach(LazyChildren(lambda: [("line <1>", {"class_attr": "log"}), "line 2"]))
+        self.assertEqual(
+            body.render(),
+            '<body>\n\t<p class="log">line &lt;1&gt;</p>\n\t<p>line 2</p>\n</body>')
+
+
+if __name__ == "__main__":
+    unittest.main()
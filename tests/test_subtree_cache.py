@@ -0,0 +1,77 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src import *
+from tests.support import build_example_document, build_rows_document, find_element, iter_elements, read_default_html
+
+
+class SubtreeCacheTest(unittest.TestCase):
+    def test_output_matches_plain_render(self):
+        doc = build_example_document()
+        renderer = HtmlRenderer(subtree_cache=SubtreeCache())
+        for _ in range(3):
+            self.assertEqual(renderer.render(doc), read_default_html())
+
+    def test_identical_subtrees_are_rendered_once(self):
+        with HtmlDivision("root") as root:
+            for _ in range(10):
+                with HtmlDivision("", parent_container=root) as block:
+                    block.set_global_attr({"class_attr": "nav"})
+                    block.attach(HtmlParagraph("", "link"))
+        subtree_cache = SubtreeCache()
+        self.assertEqual(HtmlRenderer(subtree_cache=subtree_cache).render(root), HtmlRenderer().render(root))
+        self.assertEqual(subtree_cache.stats["hits"], 9)
+
+    def test_large_page_is_not_cleared_between_renders(self):
+        # 網頁元素數量超過預設'max_entries'的16倍(舊版本會在此時清空整個快取)
+        doc = build_rows_document(7000)
+        subtree_cache = SubtreeCache(max_entries=16384, max_size=1 << 26)
+        renderer = HtmlRenderer(subtree_cache=subtree_cache)
+        expected = HtmlRenderer().render(doc)
+        self.assertEqual(renderer.render(doc), expected)
+        self.assertGreater(subtree_cache.stats["structures"], 16384)
+        subtree_cache.hits = subtree_cache.misses = 0
+        self.assertEqual(renderer.render(doc), expected)
+        self.assertEqual(subtree_cache.stats["hit_rate"], 1.0)
+        find_element(doc, "row_3500_text").text = "changed"
+        subtree_cache.hits = subtree_cache.misses = 0
+        self.assertEqual(renderer.render(doc), HtmlRenderer().render(doc))
+        self.assertGreater(subtree_cache.stats["hit_rate"], 0.99)
+
+    def test_structure_eviction_does_not_reuse_ids(self):
+        structures = StructureTable(max_entries=8)
+        first = build_rows_document(30, "first")
+        second = build_rows_document(30, "second")
+        elements: dict[int, list[int]] = dict()
+        for doc in (first, second, first):
+            for element_id, structure_id in structures.structure_ids(doc).items():
+                elements.setdefault(structure_id, list()).append(element_id)
+        self.assertGreater(structures.evictions, 0)
+        self.assertLessEqual(len(structures), 8)
+        # 淘汰後的編號不會分配給其他結構，相同編號的網頁元素渲染結果必定相同
+        by_id = {id(element): element for doc in (first, second) for element in iter_elements(doc)}
+        for element_ids in elements.values():
+            strings = set(HtmlRenderer().render(by_id[element_id]) for element_id in element_ids)
+            self.assertEqual(len(strings), 1)
+
+    def test_small_cache_evicts_but_stays_correct(self):
+        doc = build_rows_document(300)
+        subtree_cache = SubtreeCache(max_entries=16, max_size=4096, max_structures=64)
+        renderer = HtmlRenderer(subtree_cache=subtree_cache)
+        expected = HtmlRenderer().render(doc)
+        for _ in range(3):
+            self.assertEqual(renderer.render(doc), expected)
+        self.assertLessEqual(subtree_cache.stats["entries"], 16)
+        self.assertGreater(subtree_cache.stats["structure_evictions"], 0)
+
+    def test_concurrent_render_with_shared_cache(self):
+        doc = build_rows_document(200)
+        expected = HtmlRenderer().render(doc)
+        for subtree_cache in (SubtreeCache(), SubtreeCache(max_entries=32, max_structures=256)):
+            renderer = HtmlRenderer(subtree_cache=subtree_cache)
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(lambda _: renderer.render(doc), range(64)))
+            self.assertEqual(results, [expected]*64)
+
+
+if __name__ == "__main__":
+    unittest.main()
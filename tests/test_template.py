@@ -0,0 +1,53 @@
+import os
+import pickle
+import tempfile
+import unittest
+from src import *
+
+
+def build_template_document() -> HtmlDocument:
+    with HtmlDocument() as doc:
+        with HtmlBody(parent_container=doc) as body:
+            body.attach(HtmlParagraph("greeting", Slot("user_name")))
+            body.attach(HtmlInput("input_name").set_individual_attr({"value": Slot("default_name")}))
+    return doc
+
+
+class HtmlTemplateTest(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = HtmlTemplate(build_template_document())
+        self.assertEqual(template.slot_names, ("user_name", "default_name"))
+        expected = HtmlDocument()
+        with HtmlBody(parent_container=expected) as body:
+            body.attach(HtmlParagraph("greeting", "<Asriel>"))
+            body.attach(HtmlInput("input_name").set_individual_attr({"value": "a \"b\""}))
+        self.assertEqual(template.render({"user_name": "<Asriel>", "default_name": "a \"b\""}), expected.render())
+        self.assertEqual("".join(template.render_to(list(), {"user_name": "x", "default_name": "y"})),
+                         template.render({"user_name": "x", "default_name": "y"}))
+        with self.assertRaises(KeyError):
+            template.render({"user_name": "x"})
+
+    def test_slot_pickle_round_trip(self):
+        slot = Slot("user_name")
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(slot, protocol))
+            self.assertIs(type(restored), Slot)
+            self.assertEqual(restored, slot)
+            self.assertEqual(restored.name, "user_name")
+
+    def test_pickled_tree_with_slots_compiles_to_same_template(self):
+        doc = build_template_document()
+        restored = pickle.loads(pickle.dumps(doc))
+        values = {"user_name": "u", "default_name": "d"}
+        self.assertEqual(HtmlTemplate(restored).render(values), HtmlTemplate(doc).render(values))
+
+    def test_build_documents_with_slots_in_process_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = build_documents([(build_template_document(), "slots.html")], directory, max_workers=1)
+            self.assertTrue(results[0].ok, results[0].error)
+            with open(os.path.join(directory, "slots.html"), "r", encoding="utf-8") as input_file:
+                self.assertEqual(input_file.read(), build_template_document().render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+from src import *
+from tests.support import build_example_document, build_rows_document, read_default_html
+
+
+class _StartResponse:
+    """
+    記錄WSGI的'start_response'呼叫。
+    """
+    def __init__(self) -> None:
+        self.calls: list = list()
+    def __call__(self, status, headers, exc_info=None):
+        self.calls.append((status, headers))
+
+
+class WsgiResponseTest(unittest.TestCase):
+    def test_status_headers_and_body(self):
+        doc = build_example_document()
+        start_response = _StartResponse()
+        chunks = list(WsgiResponse(doc)({"REQUEST_METHOD": "GET"}, start_response))
+        self.assertEqual(start_response.calls, [("200 OK", [("Content-Type", "text/html; charset=utf-8")])])
+        self.assertTrue(all(isinstance(chunk, bytes) for chunk in chunks))
+        self.assertEqual(b"".join(chunks), read_default_html().encode("utf-8"))
+        # 'head'會在'body'開始渲染前先送出
+        self.assertGreater(len(chunks), 1)
+        self.assertNotIn(b"<body", chunks[0])
+        self.assertIn(b"</head>", chunks[0])
+
+    def test_chunk_size_and_custom_headers(self):
+        doc = build_rows_document(100)
+        start_response = _StartResponse()
+        response = WsgiResponse(
+            doc, "404 Not Found", [("Content-Type", "text/plain"), ("X-Test", "1")], chunk_size=256)
+        chunks = list(response({"REQUEST_METHOD": "GET"}, start_response))
+        self.assertEqual(start_response.calls, [("404 Not Found", [("Content-Type", "text/plain"), ("X-Test", "1")])])
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b"".join(chunks), doc.render().encode("utf-8"))
+
+    def test_head_request_has_no_body(self):
+        start_response = _StartResponse()
+        self.assertEqual(list(WsgiResponse(build_example_document())({"REQUEST_METHOD": "HEAD"}, start_response)), [])
+        self.assertEqual(start_response.calls[0][0], "200 OK")
+
+    def test_encoding(self):
+        doc = build_rows_document(20)
+        doc.get_element_by_id("row_3_text").text = "中文內容"
+        start_response = _StartResponse()
+        chunks = list(WsgiResponse(doc, chunk_size=16, encoding="utf-16")({}, start_response))
+        self.assertEqual(start_response.calls[0][1], [("Content-Type", "text/html; charset=utf-16")])
+        self.assertEqual(b"".join(chunks), doc.render().encode("utf-16"))
+
+    def test_close_stops_rendering(self):
+        body = build_rows_document(100)
+        chunks = WsgiResponse(body, chunk_size=64)({}, _StartResponse())
+        next(chunks)
+        chunks.close()
+        self.assertEqual(list(chunks), [])
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            WsgiResponse(build_example_document(), chunk_size=0)
+
+
+class AsgiResponseTest(unittest.IsolatedAsyncioTestCase):
+    async def call(self, response: AsgiResponse, method: str = "GET") -> list[dict]:
+        messages = list()
+        async def receive():
+            return {"type": "http.disconnect"}
+        async def send(message):
+            messages.append(message)
+        await response({"type": "http", "method": method}, receive, send)
+        return messages
+
+    async def test_start_and_body_messages(self):
+        messages = await self.call(AsgiResponse(build_example_document()))
+        self.assertEqual(messages[0], {
+            "type": "http.response.start", "status": 200,
+            "headers": [(b"content-type", b"text/html; charset=utf-8")]})
+        bodies = messages[1:]
+        self.assertTrue(all(message["type"] == "http.response.body" for message in bodies))
+        self.assertEqual([message["more_body"] for message in bodies], [True]*(len(bodies) - 1) + [False])
+        self.assertEqual(bodies[-1]["body"], b"")
+        self.assertEqual(b"".join(message["body"] for message in bodies), read_default_html().encode("utf-8"))
+        self.assertNotIn(b"<body", bodies[0]["body"])
+
+    async def test_custom_status_headers_and_chunks(self):
+        doc = build_rows_document(100)
+        response = AsgiResponse(doc, 201, [("X-Test", "1")], chunk_size=256, yield_every=4)
+        messages = await self.call(response)
+        self.assertEqual(messages[0]["status"], 201)
+        self.assertEqual(messages[0]["headers"], [(b"content-type", b"text/html; charset=utf-8"), (b"x-test", b"1")])
+        self.assertGreater(len(messages), 10)
+        self.assertEqual(b"".join(message["body"] for message in messages[1:]), doc.render().encode("utf-8"))
+
+    async def test_head_request_has_no_body(self):
+        messages = await self.call(AsgiResponse(build_example_document()), "HEAD")
+        self.assertEqual([message["type"] for message in messages], ["http.response.start", "http.response.body"])
+        self.assertEqual(messages[1], {"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def test_async_fragment(self):
+        async def load():
+            await asyncio.sleep(0)
+            return HtmlParagraph("loaded", "loaded")
+        division = HtmlDivision("wrap")
+        division.attach(AsyncFragment(load))
+        expected = HtmlDivision("wrap")
+        expected.attach(HtmlParagraph("loaded", "loaded"))
+        messages = await self.call(AsgiResponse(division))
+        self.assertEqual(b"".join(message["body"] for message in messages[1:]), expected.render().encode("utf-8"))
+
+    async def test_encoding(self):
+        doc = build_rows_document(20)
+        doc.get_element_by_id("row_3_text").text = "中文內容"
+        response = AsgiResponse(doc, chunk_size=16, encoding="utf-16")
+        self.assertEqual(b"".join([chunk async for chunk in response.body_iterator()]), doc.render().encode("utf-16"))
+
+    async def test_unsupported_scope(self):
+        with self.assertRaises(ValueError):
+            await AsgiResponse(build_example_document())({"type": "websocket"}, None, None)
+
+
+if __name__ == "__main__":
+    unittest.main()